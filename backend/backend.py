@@ -1,13 +1,31 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import os
-import io
+import asyncio
 import uuid
 import logging
-from PIL import Image
-from typing import List
-from ultralytics import YOLO
-from fastapi.responses import JSONResponse
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import shutil
+import numpy as np
+from typing import List, Tuple, Optional, Union
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, Response
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from executor import InferenceExecutor, QueueFullError
+from batching import MicroBatchScheduler
+from cache import ResultCache, file_fingerprint
+from uploads import UploadTooLargeError, read_upload, remove_files, spool_to_file
+from jobs import JobStore, JobRunner, spool_upload
+from engines import load_engine
+from decoding import DecodedImage, decode_to_array, scale_boxes
+from detections import Detections, Thresholds, filter_detections, from_dict, from_result, to_dict
+from dicom import DicomSeries, DicomSlice, is_dicom, is_dicom_file, looks_like_dicom
+from volume import aggregate_volume
+from tiling import TileConfig, decode_tiled, merge_tiles, split_tiles
+from workers import ProcessWorkerPool
+from registry import ModelEntry, ModelRegistry, UnknownModelError, estimate_footprint, parse_model_specs
+import metrics
+import encoding
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,12 +49,282 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ============================
+# Metrics
+# ============================
+metrics_registry = metrics.Registry()
+
+REQUESTS_TOTAL = metrics_registry.counter(
+    "brain_tumor_requests_total", "HTTP requests handled", ("method", "path", "status")
+)
+REQUEST_LATENCY = metrics_registry.histogram(
+    "brain_tumor_request_seconds", "End-to-end HTTP request latency", ("method", "path")
+)
+REQUESTS_IN_FLIGHT = metrics_registry.gauge(
+    "brain_tumor_requests_in_flight", "HTTP requests currently being handled"
+)
+STAGE_LATENCY = metrics_registry.histogram(
+    "brain_tumor_stage_seconds",
+    "Latency of each prediction stage (upload_read, cache_lookup, decode, "
+    "queue_wait, inference, postprocess, serialize)",
+    ("stage",)
+)
+IMAGES_TOTAL = metrics_registry.counter(
+    "brain_tumor_images_total", "Images processed by outcome", ("outcome",)
+)
+ERRORS_TOTAL = metrics_registry.counter(
+    "brain_tumor_errors_total", "Errors by stage", ("stage",)
+)
+BATCH_SIZE = metrics_registry.histogram(
+    "brain_tumor_batch_size", "Images per model forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+SCHEDULER_QUEUE_DEPTH = metrics_registry.gauge(
+    "brain_tumor_scheduler_queue_depth", "Images waiting for the micro-batcher"
+)
+EXECUTOR_PENDING = metrics_registry.gauge(
+    "brain_tumor_executor_pending", "Images admitted to the inference executor"
+)
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    """Count requests and observe their latency, labelled by route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        with REQUESTS_IN_FLIGHT.track_inprogress():
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUESTS_TOTAL.inc(method=request.method, path=path, status=status)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, method=request.method, path=path)
+
 # ============================
 # Model Loading
 # ============================
 MODEL_PATH =  "./backend/models/model_yolov8s.pt"
-model = YOLO(MODEL_PATH)
-logger.info(f"✅ Model loaded successfully from: {MODEL_PATH}")
+CONFIDENCE_THRESHOLD = 0.80
+
+# The model keeps every box above CONFIDENCE_FLOOR; requests then filter those,
+# so any conf >= floor and any iou <= INFERENCE_IOU is served without re-running it
+CONFIDENCE_FLOOR = float(os.getenv("CONFIDENCE_FLOOR", "0.05"))
+INFERENCE_IOU = float(os.getenv("INFERENCE_IOU", "0.7"))
+MAX_DETECTIONS = int(os.getenv("MAX_DETECTIONS", "300"))
+PREDICT_ARGS = {"conf": CONFIDENCE_FLOOR, "iou": INFERENCE_IOU, "max_det": MAX_DETECTIONS}
+DEFAULT_THRESHOLDS = Thresholds(conf=CONFIDENCE_THRESHOLD, iou=None, max_det=MAX_DETECTIONS)
+
+# torch | onnx | openvino | openvino-int8 (exported once, then cached)
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "torch")
+ENGINE_CACHE_DIR = os.getenv("ENGINE_CACHE_DIR", "./backend/models/exports")
+INT8_CALIBRATION_DATA = os.getenv("INT8_CALIBRATION_DATA") or None
+
+# Named model variants, e.g. "yolov8n=./backend/models/yolov8n.pt,yolov8s=./backend/models/model_yolov8s.pt".
+# Requests pick one with ?model=<name>; without MODEL_REGISTRY only MODEL_PATH is served.
+MODELS_DIR = os.path.dirname(MODEL_PATH)
+MODEL_SPECS = parse_model_specs(os.getenv("MODEL_REGISTRY", ""), "yolov8s", MODEL_PATH)
+DEFAULT_MODEL = os.getenv("DEFAULT_MODEL") or next(iter(MODEL_SPECS))
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "2048"))
+
+# Models are loaded in the background after the server binds (see Startup)
+startup_state = {
+    "status": "loading",
+    "error": None,
+    "timings": {}
+}
+
+def model_ready() -> bool:
+    return startup_state["status"] == "ready"
+
+# ============================
+# Inference Executor
+# ============================
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "40"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+# Images of one request that may be read/decoded/inferred at the same time
+REQUEST_PIPELINE_DEPTH = int(os.getenv("REQUEST_PIPELINE_DEPTH", "2"))
+MAX_FILE_SIZE = 10 * 1024 * 1024
+# DICOM series are larger than single images; their frames are read lazily
+MAX_DICOM_SIZE = int(os.getenv("MAX_DICOM_SIZE_MB", "512")) * 1024 * 1024
+# Frames of one DICOM file /predict accepts (longer series should go through /jobs)
+MAX_DICOM_FRAMES = int(os.getenv("MAX_DICOM_FRAMES", "500"))
+# Images are decoded straight to this size (long side); 0 keeps full resolution
+DECODE_SIZE = int(os.getenv("DECODE_SIZE", "640"))
+MAX_FILES_PER_REQUEST = 20
+
+# "off": images are always inferred whole (unless a request asks for tiles)
+# "auto": images whose long side exceeds TILE_MIN_SIDE are split into overlapping tiles
+TILED_INFERENCE = os.getenv("TILED_INFERENCE", "off")
+TILE_CONFIG = TileConfig(
+    tile_size=int(os.getenv("TILE_SIZE", "640")),
+    overlap=int(os.getenv("TILE_OVERLAP", "128")),
+    max_tiles=int(os.getenv("TILE_MAX_TILES", "16")),
+    min_side=int(os.getenv("TILE_MIN_SIDE", "1280")),
+).validate()
+
+# "thread": forward passes run in this process, one at a time per model
+# "process": this process decodes and dispatches to INFERENCE_PROCESSES workers
+SERVING_MODE = os.getenv("SERVING_MODE", "thread")
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "2"))
+TORCH_THREADS_PER_WORKER = int(os.getenv("TORCH_THREADS_PER_WORKER", "1"))
+
+inference_executor = InferenceExecutor(
+    # In process mode each busy worker also ties up one dispatching thread
+    max_workers=INFERENCE_WORKERS + (INFERENCE_PROCESSES if SERVING_MODE == "process" else 0),
+    max_queue=INFERENCE_QUEUE_SIZE,
+)
+# Every DICOM frame takes an executor slot, so a request can't expand to more than fit
+MAX_REQUEST_FRAMES = min(MAX_DICOM_FRAMES, inference_executor.capacity)
+
+# ============================
+# Result Cache
+# ============================
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "86400"))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "")
+
+result_cache = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    ttl_seconds=RESULT_CACHE_TTL,
+    disk_dir=RESULT_CACHE_DIR,
+)
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    await job_runner.stop()
+    await batch_scheduler.stop()
+    inference_executor.shutdown()
+    model_registry.close()
+
+# ============================
+# Startup: Lazy Model Loading & Warm-up
+# ============================
+# Batch sizes to run dummy inferences at, so real requests skip graph warm-up
+WARMUP_BATCH_SIZES = [
+    int(size) for size in os.getenv("WARMUP_BATCH_SIZES", f"1,{MAX_BATCH_SIZE}").split(",") if size
+]
+
+STARTUP_SECONDS = metrics_registry.gauge(
+    "brain_tumor_startup_seconds", "Duration of each cold-start phase", ("phase",)
+)
+
+def record_timing(phase: str, seconds: float):
+    startup_state["timings"][phase] = round(seconds, 3)
+    STARTUP_SECONDS.set(seconds, phase=phase)
+    logger.info(f"Startup phase {phase}: {seconds:.2f}s")
+
+def close_model_entry(entry: ModelEntry):
+    if entry.pool is not None:
+        entry.pool.shutdown()
+
+def load_model_entry(name: str, path: str) -> ModelEntry:
+    """Load and warm up one model version (blocking); used by the registry"""
+    start = time.perf_counter()
+    version = file_fingerprint(path)
+    loaded = load_engine(
+        path,
+        INFERENCE_ENGINE,
+        cache_dir=ENGINE_CACHE_DIR,
+        model_version=version,
+        int8_data=INT8_CALIBRATION_DATA,
+    )
+    entry = ModelEntry(
+        name, path, version, loaded,
+        footprint_bytes=estimate_footprint(loaded, path),
+        close=close_model_entry,
+    )
+    entry.timings["load"] = time.perf_counter() - start
+    
+    side = DECODE_SIZE or 640
+    if SERVING_MODE == "process":
+        # Fork before this process runs any inference: the workers share the
+        # loaded weights copy-on-write and each warms up on its own
+        start = time.perf_counter()
+        entry.pool = ProcessWorkerPool(
+            loaded,
+            num_workers=INFERENCE_PROCESSES,
+            max_batch_size=MAX_BATCH_SIZE,
+            image_side=side,
+            predict_args=PREDICT_ARGS,
+            torch_threads=TORCH_THREADS_PER_WORKER,
+        )
+        entry.pool.start()
+        entry.timings["worker_pool_start"] = time.perf_counter() - start
+    else:
+        dummy = np.zeros((side, side, 3), dtype=np.uint8)
+        for batch_size in WARMUP_BATCH_SIZES:
+            start = time.perf_counter()
+            with entry.lock:
+                loaded([dummy] * batch_size, verbose=False, **PREDICT_ARGS)
+            entry.timings[f"warmup_batch_{batch_size}"] = time.perf_counter() - start
+    
+    logger.info(
+        f"✅ Model {name} loaded successfully from: {path} "
+        f"(version {version}, engine {INFERENCE_ENGINE})"
+    )
+    return entry
+
+model_registry = ModelRegistry(
+    MODEL_SPECS,
+    default=DEFAULT_MODEL,
+    loader=load_model_entry,
+    memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+)
+
+def load_model():
+    """Import the inference stack, then load and warm up the default model (blocking)"""
+    start = time.perf_counter()
+    import ultralytics  # noqa: F401  (torch and friends load here)
+    record_timing("import_ultralytics", time.perf_counter() - start)
+    
+    startup_state["status"] = "loading_model"
+    entry = model_registry.checkout(DEFAULT_MODEL)
+    entry.release()
+    for phase, seconds in entry.timings.items():
+        record_timing(f"model_{phase}", seconds)
+
+async def load_model_in_background():
+    try:
+        await asyncio.to_thread(load_model)
+    except Exception as e:
+        startup_state["status"] = "failed"
+        startup_state["error"] = str(e)
+        logger.error(f"❌ Model loading failed: {e}")
+        return
+    
+    startup_state["status"] = "ready"
+    record_timing("ready_after_import", time.perf_counter() - IMPORT_STARTED)
+    # Jobs left over from a previous run can only resume with a model
+    job_runner.start()
+
+@app.on_event("startup")
+async def start_model_loading():
+    asyncio.get_running_loop().create_task(load_model_in_background())
+
+# ============================
+# Liveness & Readiness
+# ============================
+@app.get("/health/live")
+async def liveness():
+    """The process is up and serving HTTP (the model may still be loading)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """The model is loaded and warmed up; 503 until then"""
+    body = {
+        "status": startup_state["status"],
+        "model_loaded": model_ready(),
+        "timings": startup_state["timings"]
+    }
+    if startup_state["error"]:
+        body["error"] = startup_state["error"]
+    return JSONResponse(content=body, status_code=200 if model_ready() else 503)
 
 # ============================
 # Health Check Endpoint
@@ -47,79 +335,544 @@ async def root():
         "status": "online",
         "service": "Brain Tumor Detection API",
         "version": "1.0.0",
-        "model_loaded": model is not None,
-        "model_path": MODEL_PATH if model else "Not loaded"
+        "model_loaded": model_ready(),
+        "model_path": model_registry.specs[DEFAULT_MODEL] if model_ready() else "Not loaded",
+        "model_status": startup_state["status"],
+        "inference": inference_executor.stats()
     }
 
 # ============================
 # Helper Functions
 # ============================
+# Raw upload bytes, or one frame of a DICOM series
+ImageSource = Union[bytes, DicomSlice]
+
 def validate_image(file: UploadFile) -> bool:
     """Validate uploaded file is an image"""
     valid_types = ["image/jpeg", "image/jpg", "image/png"]
-    return file.content_type in valid_types
+    return file.content_type in valid_types or looks_like_dicom(file.filename, file.content_type)
+
+async def read_valid_upload(file: UploadFile, failed_files: list) -> Union[bytes, str, None]:
+    """
+    Validate and read one upload, recording the reason if it is rejected.
+
+    Images are returned as bytes. DICOM files are copied to a temporary file
+    and returned as its path, so their frames are memory-mapped; the caller
+    removes it with remove_files when the request is done.
+    """
+    # Validate file type
+    if not validate_image(file):
+        logger.warning(f"Invalid file type for {file.filename}: {file.content_type}")
+        failed_files.append({
+            "filename": file.filename,
+            "reason": f"Invalid file type: {file.content_type}"
+        })
+        return None
+    
+    try:
+        # Read image bytes in chunks, rejecting oversized files early
+        with STAGE_LATENCY.time(stage="upload_read"):
+            if looks_like_dicom(file.filename, file.content_type):
+                upload = await spool_to_file(file, MAX_DICOM_SIZE, suffix=".dcm")
+            else:
+                upload = await read_upload(file, MAX_FILE_SIZE)
+        await file.close()
+        return upload
+    except UploadTooLargeError as e:
+        failed_files.append({"filename": file.filename, "reason": str(e)})
+    except Exception as e:
+        ERRORS_TOTAL.inc(stage="upload_read")
+        logger.error(f"Failed to read {file.filename}: {e}")
+        failed_files.append({"filename": file.filename, "reason": str(e)})
+    return None
+
+def tiling_for(tiled: Optional[bool]) -> Optional[TileConfig]:
+    """Tile settings for a request, or None to infer images whole"""
+    if tiled is None:
+        return TILE_CONFIG if TILED_INFERENCE == "auto" else None
+    # An explicit request tiles anything larger than a single tile
+    return TILE_CONFIG._replace(min_side=TILE_CONFIG.tile_size) if tiled else None
+
+def expand_upload(source: Union[bytes, str], filename: str, failed_files: list,
+                  max_frames: Optional[int] = MAX_REQUEST_FRAMES) -> List[ImageSource]:
+    """
+    The images in one upload: the bytes themselves, or every frame of a DICOM file.
+
+    `source` is the file's bytes or its path on disk; a DICOM file given by
+    path is memory-mapped instead of read. `max_frames=None` lifts the
+    per-request frame limit.
+    """
+    if isinstance(source, str):
+        if not is_dicom_file(source):
+            with open(source, "rb") as f:
+                return [f.read()]
+    elif not is_dicom(source):
+        return [source]
+    try:
+        # Only the header is parsed here; frames are windowed when decoded
+        series = DicomSeries(source)
+    except Exception as e:
+        ERRORS_TOTAL.inc(stage="decode")
+        logger.error(f"Failed to read DICOM file {filename}: {e}")
+        failed_files.append({"filename": filename, "reason": f"Unreadable DICOM file: {e}"})
+        return []
+    if max_frames is not None and len(series) > max_frames:
+        failed_files.append({
+            "filename": filename,
+            "reason": f"{len(series)} frames exceed the {max_frames}-frame limit; submit it as a job"
+        })
+        return []
+    return [DicomSlice(series, index) for index in range(len(series))]
+
+def reserve_frames(count: int, filename: str, failed_files: list) -> bool:
+    """
+    Reserve executor slots for the extra images of a multi-frame upload.
+
+    Requests reserve one slot per file up front; a DICOM series needs one per
+    frame. A series that doesn't fit right now is recorded as failed.
+    """
+    if count <= 1:
+        return True
+    try:
+        inference_executor.reserve(count - 1)
+        return True
+    except QueueFullError as e:
+        logger.warning(f"Rejecting {filename}: {e}")
+        failed_files.append({"filename": filename, "reason": "Server is busy. Please retry later."})
+        return False
+
+def with_slice_index(result: dict, source: Optional[ImageSource]) -> dict:
+    """Tag a result with its frame number when it came from a DICOM series"""
+    if isinstance(source, DicomSlice):
+        result["slice_index"] = source.index
+    return result
+
+def decode_image(source: ImageSource, filename: str,
+                 tiling: Optional[TileConfig] = None) -> DecodedImage:
+    """Decode raw upload bytes into a model-sized array (or tiles of a large one)"""
+    with STAGE_LATENCY.time(stage="decode"):
+        if isinstance(source, DicomSlice):
+            decoded = source.decode(DECODE_SIZE)
+        elif tiling is not None:
+            decoded = decode_tiled(source, tiling, DECODE_SIZE)
+        else:
+            # Large scans are decoded at reduced size instead of at full resolution
+            decoded = decode_to_array(source, DECODE_SIZE)
+    if decoded.tile_origins is not None:
+        logger.info(f"Image {filename} ({decoded.original_size}) split into {len(decoded.tile_origins)} tiles")
+    elif max(decoded.original_size) > 4096:
+        logger.info(f"Image {filename} is large ({decoded.original_size}); decoded at {decoded.array.shape[1::-1]}")
+    return decoded
+
+def run_model(images: list, entry: ModelEntry) -> List[Detections]:
+    """Run a model on a list of images, at most MAX_BATCH_SIZE per forward pass"""
+    results = []
+    for start in range(0, len(images), MAX_BATCH_SIZE):
+        batch = images[start:start + MAX_BATCH_SIZE]
+        BATCH_SIZE.observe(len(batch))
+        with STAGE_LATENCY.time(stage="inference"):
+            if entry.pool is not None:
+                results.extend(entry.pool.infer(batch))
+            else:
+                with entry.lock:
+                    outputs = entry.model(batch, verbose=False, **PREDICT_ARGS)
+                results.extend(from_result(output) for output in outputs)
+    return results
+
+def make_thresholds(conf: Optional[float] = None, iou: Optional[float] = None,
+                    max_det: Optional[int] = None) -> Thresholds:
+    """Request thresholds, falling back to the defaults"""
+    return Thresholds(
+        conf=CONFIDENCE_THRESHOLD if conf is None else conf,
+        # NMS at inference already used INFERENCE_IOU; only a stricter value re-runs it
+        iou=iou if iou is not None and iou < INFERENCE_IOU else None,
+        max_det=MAX_DETECTIONS if max_det is None else min(max_det, MAX_DETECTIONS),
+    )
+
+def to_original(result: Detections, scale: Tuple[float, float]) -> Detections:
+    """Map detections of a decoded image back to original-image coordinates"""
+    return Detections(scale_boxes(result.xyxy, scale), result.conf, result.cls)
+
+def model_inputs(image: DecodedImage) -> List[np.ndarray]:
+    """The arrays to run the model on for one image: its tiles, or itself"""
+    if image.tile_origins is None:
+        return [image.array]
+    return split_tiles(image, TILE_CONFIG.tile_size)
 
-def process_image(image_bytes: bytes, filename: str) -> dict:
+def merge_outputs(image: DecodedImage, results: List[Detections]) -> Detections:
+    """One image's detections in original coordinates, merging tiles if it was tiled"""
+    if image.tile_origins is None:
+        return to_original(results[0], image.scale)
+    with STAGE_LATENCY.time(stage="tile_merge"):
+        merged = merge_tiles(results, image.tile_origins, TILE_CONFIG.tile_size, INFERENCE_IOU)
+    return to_original(merged, image.scale)
+
+def extract_detections(result: Detections, names: dict) -> list:
+    """Convert one image's detection arrays into dicts"""
+    # Convert each array to Python once instead of once per box
+    class_ids = result.cls.tolist()
+    confidences = result.conf.tolist()
+    bboxes = result.xyxy.tolist()
+    
+    return [
+        {
+            "class_id": class_id,
+            "class_name": names[class_id],
+            "confidence": confidence,
+            "bbox_xyxy": bbox
+        }
+        for class_id, confidence, bbox in zip(class_ids, confidences, bboxes)
+    ]
+
+def build_result(filename: str, image_size: Tuple[int, int], raw: Detections,
+                 entry: ModelEntry, thresholds: Thresholds, cache_hit: bool = False) -> dict:
+    """Filter an image's raw detections for this request and build its payload"""
+    IMAGES_TOTAL.inc(outcome="cache_hit" if cache_hit else "success")
+    with STAGE_LATENCY.time(stage="postprocess"):
+        detections = extract_detections(filter_detections(raw, thresholds), entry.names)
+    return {
+        "image_id": str(uuid.uuid4()),
+        "filename": filename,
+        "image_size": {"width": image_size[0], "height": image_size[1]},
+        "detections": detections,
+        "detection_count": len(detections),
+        "status": "success",
+        "model": entry.name,
+        "model_version": entry.version,
+        "thresholds": {
+            "conf": thresholds.conf,
+            "iou": INFERENCE_IOU if thresholds.iou is None else thresholds.iou,
+            "max_det": thresholds.max_det
+        },
+        "cache_hit": cache_hit
+    }
+
+def build_error(filename: str, error: Exception) -> dict:
+    """Build the error payload for one image"""
+    IMAGES_TOTAL.inc(outcome="error")
+    logger.error(f"Error processing {filename}: {error}")
+    return {
+        "image_id": str(uuid.uuid4()),
+        "filename": filename,
+        "detections": [],
+        "detection_count": 0,
+        "status": "error",
+        "error": str(error)
+    }
+
+def lookup_cached(source: ImageSource, entry: ModelEntry, tiling: Optional[TileConfig] = None
+                  ) -> Tuple[str, Optional[Tuple[Tuple[int, int], Detections]]]:
+    """Return the cache key for an image and its cached (size, raw detections), if any"""
+    with STAGE_LATENCY.time(stage="cache_lookup"):
+        # Request thresholds are not part of the key: the raw detections serve them all
+        params = [entry.version, INFERENCE_ENGINE,
+                  CONFIDENCE_FLOOR, INFERENCE_IOU, MAX_DETECTIONS, DECODE_SIZE, tiling]
+        content = source
+        if isinstance(source, DicomSlice):
+            # A frame's stored values plus the windowing that turns them into pixels
+            content = source.pixels()
+            params.append(source.series.window)
+        key = result_cache.make_key(content, *params)
+        cached = result_cache.get(key)
+    if cached is None:
+        return key, None
+    return key, (tuple(cached["image_size"]), from_dict(cached["detections"]))
+
+def store_raw(key: str, image_size: Tuple[int, int], raw: Detections):
+    """Cache the raw detections of an image (errors are never cached)"""
+    result_cache.put(key, {"image_size": list(image_size), "detections": to_dict(raw)})
+
+def process_images(items: List[Tuple[ImageSource, str]], model_name: Optional[str] = None,
+                   thresholds: Thresholds = DEFAULT_THRESHOLDS,
+                   tiling: Optional[TileConfig] = None) -> List[dict]:
+    """Process several images with batched forward passes, keeping input order"""
+    entry = model_registry.checkout(model_name)
+    try:
+        return _process_images(items, entry, thresholds, tiling)
+    finally:
+        entry.release()
+
+def _process_images(items: List[Tuple[ImageSource, str]], entry: ModelEntry,
+                    thresholds: Thresholds, tiling: Optional[TileConfig]) -> List[dict]:
+    outputs = [None] * len(items)
+    keys = [None] * len(items)
+    
+    # Decode every uncached image first; a broken file only fails itself
+    decoded = []
+    for index, (source, filename) in enumerate(items):
+        keys[index], cached = lookup_cached(source, entry, tiling)
+        if cached is not None:
+            outputs[index] = build_result(filename, *cached, entry, thresholds, cache_hit=True)
+            continue
+        try:
+            decoded.append((index, decode_image(source, filename, tiling)))
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="decode")
+            outputs[index] = build_error(filename, e)
+    
+    try:
+        # Tiles of every image go through the model together
+        inputs = [model_inputs(image) for _, image in decoded]
+        results = run_model([array for arrays in inputs for array in arrays], entry)
+        start = 0
+        for (index, image), arrays in zip(decoded, inputs):
+            raw = merge_outputs(image, results[start:start + len(arrays)])
+            start += len(arrays)
+            store_raw(keys[index], image.original_size, raw)
+            outputs[index] = build_result(
+                items[index][1], image.original_size, raw, entry, thresholds
+            )
+    except Exception as e:
+        ERRORS_TOTAL.inc(stage="inference")
+        for index, _ in decoded:
+            outputs[index] = build_error(items[index][1], e)
+    
+    return [with_slice_index(output, source) for output, (source, _) in zip(outputs, items)]
+
+def process_image(image_bytes: ImageSource, filename: str, model_name: Optional[str] = None,
+                  thresholds: Thresholds = DEFAULT_THRESHOLDS,
+                  tiling: Optional[TileConfig] = None) -> dict:
     """Process a single image and return detections"""
+    return process_images([(image_bytes, filename)], model_name, thresholds, tiling)[0]
+
+# ============================
+# Cross-Request Micro-Batching
+# ============================
+batch_scheduler = MicroBatchScheduler(
+    forward=run_model,
+    runner=inference_executor.run,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    on_wait=lambda seconds: STAGE_LATENCY.observe(seconds, stage="queue_wait"),
+    concurrency=INFERENCE_PROCESSES if SERVING_MODE == "process" else 1,
+)
+
+@app.on_event("startup")
+async def start_scheduler():
+    batch_scheduler.start()
+
+async def infer_image(source: ImageSource, filename: str, entry: ModelEntry,
+                      thresholds: Thresholds = DEFAULT_THRESHOLDS,
+                      tiling: Optional[TileConfig] = None) -> dict:
+    """Decode one image off the event loop and run it through the shared batcher"""
+    # Kept to tag the result; plain upload bytes are still released before inference
+    frame = source if isinstance(source, DicomSlice) else None
     try:
-        # Open and validate image
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        # Hashing and the disk tier are blocking, so they run on the executor too
+        key, cached = await inference_executor.run(lookup_cached, source, entry, tiling)
+        if cached is not None:
+            return with_slice_index(
+                build_result(filename, *cached, entry, thresholds, cache_hit=True), frame
+            )
         
-        # Check image size (optional: resize if too large)
-        max_size = 4096
-        if max(image.size) > max_size:
-            logger.warning(f"Image {filename} is large ({image.size}). Consider resizing.")
+        try:
+            image = await inference_executor.run(decode_image, source, filename, tiling)
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="decode")
+            return with_slice_index(build_error(filename, e), frame)
+        # The raw bytes are no longer needed; don't keep them alive during inference
+        del source
+        # Images (and tiles) only share a forward pass with others for the same model version
+        results = await asyncio.gather(*(
+            batch_scheduler.submit(array, key=entry) for array in model_inputs(image)
+        ))
+        raw = merge_outputs(image, results)
+        await inference_executor.run(store_raw, key, image.original_size, raw)
+        return with_slice_index(
+            build_result(filename, image.original_size, raw, entry, thresholds), frame
+        )
+    except Exception as e:
+        ERRORS_TOTAL.inc(stage="inference")
+        return with_slice_index(build_error(filename, e), frame)
+
+# ============================
+# Streaming Responses
+# ============================
+STREAM_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
+
+def negotiate_stream(accept: str) -> Optional[str]:
+    """Pick a streaming media type from the Accept header, if one was asked for"""
+    for media_type in STREAM_MEDIA_TYPES:
+        if media_type in accept:
+            return media_type
+    return None
+
+def encode_record(record: dict, media_type: str) -> bytes:
+    """Frame one record as an NDJSON line or a Server-Sent Event"""
+    with STAGE_LATENCY.time(stage="serialize"):
+        data = encoding.encode_json(record)
+    if media_type == "text/event-stream":
+        return f"event: {record['type']}\ndata: ".encode() + data + b"\n\n"
+    return data + b"\n"
+
+def render(payload: dict, request: Request) -> Response:
+    """Serialize a response body in the format the client asked for"""
+    media_type = encoding.negotiate_format(request.headers.get("accept", ""))
+    with STAGE_LATENCY.time(stage="serialize"):
+        body = encoding.encode(payload, media_type)
+    return Response(content=body, media_type=media_type)
+
+def build_summary(results: list, failed_files: list) -> dict:
+    """Totals shared by the JSON response and the final streamed record"""
+    return {
+        "count": len(results),
+        "successful": len([r for r in results if r["status"] == "success"]),
+        "failed": len(failed_files)
+    }
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """A streaming response that runs `on_close` once it is over, even if the body never started"""
+    
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # A disconnect can leave the body suspended (or never started); close it here
+            await self.body_iterator.aclose()
+            self.on_close()
+
+async def predict_stream(files: List[UploadFile], media_type: str, entry: ModelEntry,
+                         thresholds: Thresholds, tiling: Optional[TileConfig]) -> StreamingResponse:
+    """Emit each image's result as soon as it is ready, then a summary record"""
+    # Slots (and the model) stay reserved until the response is over, not until we return
+    try:
+        inference_executor.reserve(len(files))
+    except QueueFullError as e:
+        entry.release()
+        logger.warning(f"Rejecting request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy. Please retry later.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    
+    reserved = len(files)
+    spooled = []
+    
+    def release():
+        inference_executor.release(reserved)
+        remove_files(spooled)
+        entry.release()
+    
+    async def events():
+        failed_files = []
+        tasks = []
+        finished = asyncio.Queue()
+        # Bounds how many images of this request are held in memory at once
+        pipeline = asyncio.Semaphore(REQUEST_PIPELINE_DEPTH)
         
-        # Run inference
-        results = model(image, conf=0.80, verbose=False)
+        async def indexed(index, source, filename):
+            return index, await infer_image(source, filename, entry, thresholds, tiling)
         
-        # Extract detections
-        detections = []
-        for box in results[0].boxes:
-            class_id = int(box.cls)
-            detections.append({
-                "class_id": class_id,
-                "class_name": model.names[class_id],
-                "confidence": float(box.conf),
-                "bbox_xyxy": [float(coord) for coord in box.xyxy.tolist()[0]]
-            })
+        async def submit_all():
+            nonlocal reserved
+            # Uploads stay open until the response is over, so they are read lazily here
+            try:
+                for file in files:
+                    await pipeline.acquire()
+                    upload = await read_valid_upload(file, failed_files)
+                    pipeline.release()
+                    if upload is None:
+                        continue
+                    if isinstance(upload, str):
+                        spooled.append(upload)
+                    
+                    sources = expand_upload(upload, file.filename, failed_files)
+                    del upload
+                    if not reserve_frames(len(sources), file.filename, failed_files):
+                        continue
+                    reserved += max(len(sources) - 1, 0)
+                    for source in sources:
+                        await pipeline.acquire()
+                        task = asyncio.create_task(indexed(len(tasks), source, file.filename))
+                        task.add_done_callback(lambda _: pipeline.release())
+                        task.add_done_callback(finished.put_nowait)
+                        tasks.append(task)
+                    del sources
+                await asyncio.gather(*tasks)
+            finally:
+                finished.put_nowait(None)
         
-        return {
-            "image_id": str(uuid.uuid4()),
-            "filename": filename,
-            "image_size": {"width": image.size[0], "height": image.size[1]},
-            "detections": detections,
-            "detection_count": len(detections),
-            "status": "success"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error processing {filename}: {e}")
-        return {
-            "image_id": str(uuid.uuid4()),
-            "filename": filename,
-            "detections": [],
-            "detection_count": 0,
-            "status": "error",
-            "error": str(e)
-        }
+        producer = asyncio.create_task(submit_all())
+        results = []
+        try:
+            while True:
+                task = await finished.get()
+                if task is None:
+                    break
+                index, result = task.result()
+                results.append(result)
+                yield encode_record({"type": "result", "index": index, **result}, media_type)
+            await producer
+            
+            summary = {"type": "summary", **build_summary(results, failed_files)}
+            if failed_files:
+                summary["failed_files"] = failed_files
+            yield encode_record(summary, media_type)
+        finally:
+            # Client went away or we finished: stop leftover work
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+    
+    return ReleasingStreamingResponse(events(), on_close=release, media_type=media_type)
 
 # ============================
 # Main Prediction Endpoint
 # ============================
+async def checkout_model(name: Optional[str]) -> ModelEntry:
+    """Check out a registered model, loading it off the event loop if needed"""
+    try:
+        entry = model_registry.try_checkout(name)
+        if entry is None:
+            entry = await asyncio.to_thread(model_registry.checkout, name)
+        return entry
+    except UnknownModelError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown model '{name}'. Available: {', '.join(model_registry.specs)}"
+        )
+
 @app.post("/predict")
-async def predict(files: List[UploadFile] = File(...)):
+async def predict(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    model: Optional[str] = Query(None, description="Registered model name (default model if omitted)"),
+    conf: Optional[float] = Query(None, ge=0.0, le=1.0, description="Minimum confidence (default 0.80)"),
+    iou: Optional[float] = Query(None, gt=0.0, le=1.0, description="NMS IoU threshold"),
+    max_det: Optional[int] = Query(None, ge=1, description="Maximum detections per image"),
+    tiled: Optional[bool] = Query(None, description="Split large images into overlapping tiles")
+):
     """
     Process one or multiple MRI images for tumor detection
     
     Args:
         files: List of image files (JPG, PNG)
+        model: Name of a registered model variant
+        conf: Minimum confidence of returned detections
+        iou: NMS IoU threshold (values above INFERENCE_IOU behave like it)
+        max_det: Maximum detections returned per image
+        tiled: Force tiled inference on or off (TILED_INFERENCE decides if omitted)
     
     Returns:
-        JSON with detection results for each image
+        JSON with detection results for each image. Send
+        `Accept: application/x-ndjson` or `Accept: text/event-stream` to
+        receive each result as soon as it is ready, followed by a summary,
+        or `Accept: application/msgpack` /
+        `application/vnd.brain-tumor.columnar+msgpack` for a compact body.
     """
     # Check if model is loaded
-    if model is None:
+    if not model_ready():
+        if startup_state["status"] in ("loading", "loading_model"):
+            raise HTTPException(
+                status_code=503,
+                detail="Model is still loading. Please retry shortly.",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
         raise HTTPException(
             status_code=503,
             detail="Model is not loaded. Please check server logs."
@@ -129,73 +882,286 @@ async def predict(files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
-    if len(files) > 20:
+    if len(files) > MAX_FILES_PER_REQUEST:
         raise HTTPException(
             status_code=400,
-            detail="Maximum 20 files allowed per request"
+            detail=f"Maximum {MAX_FILES_PER_REQUEST} files allowed per request"
         )
     
-    results_response = []
+    thresholds = make_thresholds(conf, iou, max_det)
+    tiling = tiling_for(tiled)
+    entry = await checkout_model(model)
+    stream_type = negotiate_stream(request.headers.get("accept", ""))
+    if stream_type is not None:
+        return await predict_stream(files, stream_type, entry, thresholds, tiling)
+    
     failed_files = []
+    tasks = []
+    # Bounds how many images of this request are held in memory at once
+    pipeline = asyncio.Semaphore(REQUEST_PIPELINE_DEPTH)
     
-    for file in files:
-        # Validate file type
-        if not validate_image(file):
-            logger.warning(f"Invalid file type for {file.filename}: {file.content_type}")
-            failed_files.append({
-                "filename": file.filename,
-                "reason": f"Invalid file type: {file.content_type}"
-            })
-            continue
-        
-        try:
-            # Read image bytes
-            image_bytes = await file.read()
-            
-            # Validate file size (max 10MB)
-            if len(image_bytes) > 10 * 1024 * 1024:
-                failed_files.append({
-                    "filename": file.filename,
-                    "reason": "File size exceeds 10MB"
-                })
+    # Reserve an executor slot per file up front (back-pressure); DICOM frames add theirs below
+    try:
+        inference_executor.reserve(len(files))
+    except QueueFullError as e:
+        entry.release()
+        logger.warning(f"Rejecting request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy. Please retry later.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    
+    reserved = len(files)
+    spooled = []
+    try:
+        for file in files:
+            await pipeline.acquire()
+            upload = await read_valid_upload(file, failed_files)
+            pipeline.release()
+            if upload is None:
                 continue
+            if isinstance(upload, str):
+                spooled.append(upload)
             
-            # Process image
-            result = process_image(image_bytes, file.filename)
-            results_response.append(result)
-            
-        except Exception as e:
-            logger.error(f"Failed to process {file.filename}: {e}")
-            failed_files.append({
-                "filename": file.filename,
-                "reason": str(e)
-            })
+            # A DICOM file expands to one image per frame, each with its own slot
+            sources = expand_upload(upload, file.filename, failed_files)
+            del upload
+            if not reserve_frames(len(sources), file.filename, failed_files):
+                continue
+            reserved += max(len(sources) - 1, 0)
+            for source in sources:
+                await pipeline.acquire()
+                # Images from this and concurrent requests share forward passes
+                task = asyncio.create_task(
+                    infer_image(source, file.filename, entry, thresholds, tiling)
+                )
+                task.add_done_callback(lambda _: pipeline.release())
+                tasks.append(task)
+            del sources
+        
+        results_response = list(await asyncio.gather(*tasks))
+    finally:
+        inference_executor.release(reserved)
+        remove_files(spooled)
+        entry.release()
     
     # Prepare response
     response = {
-        "count": len(results_response),
-        "successful": len([r for r in results_response if r["status"] == "success"]),
-        "failed": len(failed_files),
+        **build_summary(results_response, failed_files),
         "results": results_response
     }
     
     if failed_files:
         response["failed_files"] = failed_files
     
-    return response
+    return render(response, request)
+
+# ============================
+# Asynchronous Job API
+# ============================
+JOBS_DIR = os.getenv("JOBS_DIR", "./jobs")
+
+# Opened at startup, so importing this module (tests, score.py) writes nothing
+job_store: Optional[JobStore] = None
+job_runner = JobRunner(
+    store=None,
+    jobs_dir=JOBS_DIR,
+    # Jobs follow TILED_INFERENCE; there is no per-job override
+    process_batch=lambda items: process_images(items, tiling=tiling_for(None)),
+    runner=inference_executor.run,
+    chunk_size=MAX_BATCH_SIZE,
+)
+
+@app.on_event("startup")
+async def open_job_store():
+    global job_store
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    job_store = JobStore(os.path.join(JOBS_DIR, "jobs.sqlite3"))
+    job_runner.store = job_store
+
+@app.post("/jobs", status_code=202)
+async def submit_job(files: List[UploadFile] = File(...)):
+    """
+    Submit a large study for background processing
+    
+    Args:
+        files: Image files (JPG, PNG) and/or zip/tar archives of images
+    
+    Returns:
+        The job ID to poll with GET /jobs/{job_id}
+    """
+    if not model_ready():
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+    
+    job_id = uuid.uuid4().hex
+    job_dir = job_runner.job_dir(job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    
+    # Spool images to disk so the job survives restarts and RAM stays flat
+    items = []
+    try:
+        for file in files:
+            items.extend(await asyncio.to_thread(
+                spool_upload, file.file, file.filename or "upload",
+                job_dir, len(items), MAX_FILE_SIZE, MAX_DICOM_SIZE
+            ))
+            await file.close()
+    except Exception as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        logger.error(f"Failed to spool job {job_id}: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not read upload: {e}")
+    
+    if not items:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail="No images found in upload")
+    
+    job_store.create_job(job_id, items)
+    job_runner.submit(job_id)
+    logger.info(f"Job {job_id} queued with {len(items)} image(s)")
+    
+    return {"job_id": job_id, "status": "queued", "total": len(items)}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Get the status and progress of a job"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(
+    request: Request,
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Page through the processed results of a job, in submission order"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return render({
+        "job_id": job_id,
+        "status": job["status"],
+        "total": job["total"],
+        "processed": job["processed"],
+        "offset": offset,
+        "limit": limit,
+        "results": job_store.get_results(job_id, offset, limit)
+    }, request)
+
+@app.get("/jobs/{job_id}/lesions")
+async def job_lesions(
+    request: Request,
+    job_id: str,
+    iou: float = Query(0.3, gt=0.0, le=1.0, description="Minimum IoU to link boxes on adjacent slices"),
+    max_skip: int = Query(1, ge=0, description="Slices without a detection a lesion may skip"),
+    min_slices: int = Query(1, ge=1, description="Drop lesions seen on fewer slices"),
+    conf: float = Query(0.0, ge=0.0, le=1.0, description="Ignore detections below this confidence")
+):
+    """
+    Link a completed job's per-slice detections into per-lesion 3D findings
+    
+    Returns:
+        One record per lesion with its slice range, peak slice, max/mean
+        confidence and the 2D box enclosing it on every slice
+    """
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; lesions need every slice")
+    
+    results = await asyncio.to_thread(job_store.get_results, job_id, 0, -1)
+    lesions = await asyncio.to_thread(aggregate_volume, results, iou, max_skip, min_slices, conf)
+    return render({
+        "job_id": job_id,
+        "slices": len(results),
+        "lesion_count": len(lesions),
+        "lesions": lesions
+    }, request)
+
+# ============================
+# Metrics Endpoint
+# ============================
+def collect_queue_gauges():
+    SCHEDULER_QUEUE_DEPTH.set(batch_scheduler.stats()["queue_depth"])
+    EXECUTOR_PENDING.set(inference_executor.pending)
+
+metrics_registry.add_collector(collect_queue_gauges)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text-format metrics from the in-process registry"""
+    return PlainTextResponse(metrics_registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# ============================
+# Scheduler Stats Endpoint
+# ============================
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """Queue depth, batch size histogram and wait times of the micro-batcher"""
+    return {
+        "scheduler": batch_scheduler.stats(),
+        "executor": inference_executor.stats(),
+        "workers": model_registry.worker_stats(),
+        "cache": result_cache.stats()
+    }
 
 # ============================
 # Model Info Endpoint
 # ============================
 @app.get("/model/info")
 async def model_info():
-    """Get information about the loaded model"""
-    if model is None:
+    """Get information about the loaded models"""
+    entry = model_registry.try_checkout() if model_ready() else None
+    if entry is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    return {
-        "model_type": "YOLOv8",
-        "model_path": MODEL_PATH,
-        "classes": model.names,
-        "num_classes": len(model.names)
-    }
\ No newline at end of file
+    try:
+        return {
+            "model_type": "YOLOv8",
+            "model_name": entry.name,
+            "model_path": entry.path,
+            "model_version": entry.version,
+            "engine": INFERENCE_ENGINE,
+            "startup_timings": startup_state["timings"],
+            "classes": entry.names,
+            "num_classes": len(entry.names),
+            "registry": model_registry.info()
+        }
+    finally:
+        entry.release()
+
+@app.post("/models/{name}/reload")
+async def reload_model(name: str, path: Optional[str] = Query(None)):
+    """
+    Hot-swap a model: load the new weights fully, then switch requests over
+    
+    Args:
+        name: Registered model name (a new name registers a new model)
+        path: Weights file under the models directory (defaults to the current one)
+    """
+    if path is not None:
+        path = os.path.abspath(path)
+        if os.path.commonpath([path, os.path.abspath(MODELS_DIR)]) != os.path.abspath(MODELS_DIR):
+            raise HTTPException(status_code=400, detail="Model path must be inside the models directory")
+    elif name not in model_registry.specs:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'")
+    if path is not None and not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"Model file not found: {path}")
+    
+    try:
+        entry = await asyncio.to_thread(model_registry.swap, name, path)
+    except Exception as e:
+        logger.error(f"❌ Failed to reload model {name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to load model: {e}")
+    
+    return {"status": "reloaded", **entry.info()}
+
+record_timing("app_import", time.perf_counter() - IMPORT_STARTED)
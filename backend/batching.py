@@ -0,0 +1,173 @@
+import time
+import asyncio
+import logging
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+
+# ============================
+# Micro-Batching Scheduler
+# ============================
+class MicroBatchScheduler:
+    """
+    Gather images from concurrent requests into shared forward passes.
+
+    A batch is dispatched as soon as it holds `max_batch_size` images or the
+    oldest image has waited `max_wait_ms`, whichever comes first. Each caller
+    awaits its own future and receives only its own result. Up to
+    `concurrency` batches run at once (one per inference process).
+
+    Images are submitted with a key (e.g. the model they must run on) and a
+    batch only ever holds images of one key; others wait for the next batch.
+    """
+
+    def __init__(self, forward, runner, max_batch_size: int, max_wait_ms: float,
+                 on_wait=None, concurrency: int = 1):
+        # forward: sync callable, (list of images, key) -> list of results (same order)
+        # runner: async callable used to run `forward` off the event loop
+        # on_wait: optional callable receiving each image's queue wait in seconds
+        self.forward = forward
+        self.runner = runner
+        self.on_wait = on_wait
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.concurrency = concurrency
+        self._queue = None
+        self._deferred = deque()
+        self._task = None
+        self._slots = None
+        self._running = set()
+
+        # Tuning statistics
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._images = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def start(self):
+        """Start the dispatch loop on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._task = asyncio.get_running_loop().create_task(self._dispatch_loop())
+            logger.info(
+                f"Micro-batching started (max batch {self.max_batch_size}, "
+                f"max wait {self.max_wait * 1000:.0f} ms)"
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, image, key=None):
+        """Queue one image and wait for its model result"""
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((image, future, time.perf_counter(), key))
+        return await future
+
+    def _add(self, batch: list, entry: tuple):
+        """Put an entry in the batch if its key matches, otherwise defer it"""
+        if entry[3] is batch[0][3]:
+            batch.append(entry)
+        else:
+            self._deferred.append(entry)
+
+    async def _collect_batch(self) -> list:
+        """Wait for the first image, then fill the batch until full or timed out"""
+        first = self._deferred.popleft() if self._deferred else await self._queue.get()
+        batch = [first]
+
+        # Earlier images deferred for having another key go first
+        for entry in list(self._deferred):
+            if len(batch) >= self.max_batch_size:
+                break
+            if entry[3] is first[3]:
+                self._deferred.remove(entry)
+                batch.append(entry)
+
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                self._add(batch, await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Anything that arrived while we were waiting rides along for free
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            self._add(batch, self._queue.get_nowait())
+
+        return batch
+
+    async def _dispatch_loop(self):
+        while True:
+            # Don't start collecting until a batch slot is free, so images
+            # keep accumulating into the next batch meanwhile
+            await self._slots.acquire()
+            batch = await self._collect_batch()
+            self._record(batch)
+
+            # Callers that gave up (e.g. client disconnected) are skipped
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list):
+        try:
+            key = batch[0][3]
+            results = await self.runner(self.forward, [entry[0] for entry in batch], key)
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} failed: {e}")
+            for entry in batch:
+                if not entry[1].done():
+                    entry[1].set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for entry, result in zip(batch, results):
+            if not entry[1].done():
+                entry[1].set_result(result)
+
+    def _record(self, batch: list):
+        now = time.perf_counter()
+        self._batches += 1
+        self._images += len(batch)
+        self._batch_sizes[len(batch)] += 1
+        for entry in batch:
+            waited = now - entry[2]
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            if self.on_wait is not None:
+                self.on_wait(waited)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "concurrency": self.concurrency,
+            "batches_running": len(self._running),
+            "queue_depth": (self._queue.qsize() if self._queue is not None else 0) + len(self._deferred),
+            "batches": self._batches,
+            "images": self._images,
+            "mean_batch_size": self._images / self._batches if self._batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "mean_wait_ms": self._wait_total / self._images * 1000 if self._images else 0.0,
+            "max_wait_observed_ms": self._wait_max * 1000,
+        }
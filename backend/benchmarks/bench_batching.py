@@ -0,0 +1,65 @@
+"""
+Compare per-image and batched inference throughput.
+
+Run from the repository root so the relative MODEL_PATH resolves:
+
+    python backend/benchmarks/bench_batching.py --sizes 1 4 8 20
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend  # noqa: E402
+
+DEFAULT_IMAGE = os.path.join("notebook-test", "test-image.jpg")
+
+
+def time_call(func, repeats: int) -> float:
+    """Best wall-clock time of `repeats` calls on a cold result cache, in seconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        # Otherwise every repeat after the first only measures cache lookups
+        backend.result_cache.clear()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--image", default=DEFAULT_IMAGE)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 8, 20])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        image_bytes = f.read()
+
+    # The API loads the model after startup; here we load (and warm up) directly
+    backend.load_model()
+
+    print(f"max batch size: {backend.MAX_BATCH_SIZE}")
+    print(f"{'images':>6} | {'per-image img/s':>15} | {'batched img/s':>13} | {'speedup':>7}")
+    for size in args.sizes:
+        # Trailing bytes after the image are ignored by the decoder but give each
+        # item its own cache key, so the per-image loop cannot hit the cache either
+        items = [(image_bytes + i.to_bytes(4, "little"), f"image_{i}.jpg") for i in range(size)]
+
+        per_image = time_call(
+            lambda: [backend.process_image(b, name) for b, name in items],
+            args.repeats,
+        )
+        batched = time_call(lambda: backend.process_images(items), args.repeats)
+
+        print(
+            f"{size:>6} | {size / per_image:>15.2f} | {size / batched:>13.2f} | "
+            f"{per_image / batched:>6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare full-resolution decoding with the fast decode path over image sizes.
+
+Synthetic JPEG and PNG scans are decoded both ways; the table reports the
+median decode time and the peak memory of one decode.
+
+    python backend/benchmarks/bench_decode.py --sizes 512 1024 2048 4096 8192
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import statistics
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from decoding import decode_to_array  # noqa: E402
+
+
+def make_scan(side: int, image_format: str) -> bytes:
+    """Smooth gradient plus noise, roughly the statistics of an MRI slice"""
+    rng = np.random.default_rng(side)
+    y, x = np.mgrid[0:side, 0:side]
+    base = (np.sin(x / side * 6) + np.cos(y / side * 4)) * 60 + 128
+    gray = np.clip(base + rng.normal(0, 12, (side, side)), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(gray).convert("RGB").save(buffer, format=image_format, quality=92)
+    return buffer.getvalue()
+
+
+def full_decode(image_bytes: bytes) -> np.ndarray:
+    """Previous behaviour: full-resolution RGB decode"""
+    return np.asarray(Image.open(io.BytesIO(image_bytes)).convert("RGB"))
+
+
+def measure(func, image_bytes: bytes, repeats: int) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(image_bytes)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(image_bytes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times) * 1000, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 2048, 4096, 8192])
+    parser.add_argument("--formats", nargs="+", default=["JPEG", "PNG"])
+    parser.add_argument("--target", type=int, default=640)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'format':>6} | {'side':>5} | {'full ms':>8} | {'fast ms':>8} | {'speedup':>7} | "
+          f"{'full MB':>8} | {'fast MB':>8}")
+    for image_format in args.formats:
+        for side in args.sizes:
+            image_bytes = make_scan(side, image_format)
+            full_ms, full_mb = measure(full_decode, image_bytes, args.repeats)
+            fast_ms, fast_mb = measure(
+                lambda data: decode_to_array(data, args.target), image_bytes, args.repeats
+            )
+            print(f"{image_format:>6} | {side:>5} | {full_ms:>8.1f} | {fast_ms:>8.1f} | "
+                  f"{full_ms / fast_ms:>6.1f}x | {full_mb:>8.1f} | {fast_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Measure DICOM slice extraction: memory-mapped frames vs. decoding the whole file.
+
+A synthetic multi-frame MR series (uint16, bright ellipsoid on noise) is
+written to a temporary file, so no PACS or real study is needed. The table
+reports the time to open the series, the median time to window and size one
+slice, and the peak Python memory of each path. Use --write to keep a
+synthetic file for trying the API by hand.
+
+    python backend/benchmarks/bench_dicom.py --frames 32 128 --side 512
+    python backend/benchmarks/bench_dicom.py --write synthetic_series.dcm
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dicom import DicomSeries, pydicom, window_frames  # noqa: E402
+
+
+def make_volume(frames: int, side: int) -> np.ndarray:
+    """uint16 volume: noisy background plus one ellipsoid 'lesion'"""
+    rng = np.random.default_rng(frames * side)
+    z, y, x = np.ogrid[0:frames, 0:side, 0:side]
+    lesion = (((z - frames / 2) / max(frames / 6, 1)) ** 2
+              + ((y - side / 2) / (side / 10)) ** 2
+              + ((x - side / 3) / (side / 12)) ** 2) <= 1
+    volume = rng.normal(300, 40, (frames, side, side)) + lesion * 900
+    return np.clip(volume, 0, 4095).astype("<u2")
+
+
+def write_synthetic_dicom(path: str, frames: int, side: int):
+    """Write a multi-frame Explicit VR Little Endian MR file with pydicom"""
+    from pydicom.dataset import FileDataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, MRImageStorage, generate_uid
+
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = MRImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = FileDataset(path, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = MRImageStorage
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Modality = "MR"
+    ds.Rows = ds.Columns = side
+    ds.NumberOfFrames = frames
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 12
+    ds.HighBit = 11
+    ds.PixelRepresentation = 0
+    ds.WindowCenter = 700
+    ds.WindowWidth = 1400
+    ds.PixelData = make_volume(frames, side).tobytes()
+
+    try:
+        ds.save_as(path, enforce_file_format=True)   # pydicom >= 3
+    except TypeError:
+        ds.is_little_endian = True
+        ds.is_implicit_VR = False
+        ds.save_as(path, write_like_original=False)
+
+
+def full_decode(path: str, index: int) -> np.ndarray:
+    """Baseline: let pydicom decode every frame, then window one"""
+    ds = pydicom.dcmread(path)
+    frames = ds.pixel_array
+    return window_frames(frames[index], float(ds.WindowCenter), float(ds.WindowWidth))
+
+
+def measure(func, repeats: int) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times) * 1000, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, nargs="+", default=[32, 128])
+    parser.add_argument("--side", type=int, default=512)
+    parser.add_argument("--target", type=int, default=640)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--write", help="Only write a synthetic series to this path")
+    args = parser.parse_args()
+
+    if pydicom is None:
+        sys.exit("pydicom is not installed (pip install pydicom)")
+
+    if args.write:
+        write_synthetic_dicom(args.write, args.frames[0], args.side)
+        print(f"Wrote {args.frames[0]} frames of {args.side}x{args.side} to {args.write}")
+        return
+
+    print(f"{'frames':>6} | {'file MB':>7} | {'open ms':>7} | {'slice ms':>8} | "
+          f"{'full ms':>8} | {'slice MB':>8} | {'full MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for frames in args.frames:
+            path = os.path.join(tmp, f"series_{frames}.dcm")
+            write_synthetic_dicom(path, frames, args.side)
+            middle = frames // 2
+
+            open_ms, _ = measure(lambda: DicomSeries(path), args.repeats)
+            series = DicomSeries(path)
+            slice_ms, slice_mb = measure(lambda: series.decode(middle, args.target), args.repeats)
+            full_ms, full_mb = measure(lambda: full_decode(path, middle), args.repeats)
+            print(f"{frames:>6} | {os.path.getsize(path) / 1024 / 1024:>7.1f} | {open_ms:>7.1f} | "
+                  f"{slice_ms:>8.1f} | {full_ms:>8.1f} | {slice_mb:>8.1f} | {full_mb:>8.1f}")
+            del series
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Compare latency/throughput across inference engines, with a parity column.
+
+Every engine's boxes are matched by IoU against the PyTorch model on the same
+images, and any missed box or drift beyond the tolerances is listed. The
+enforced ONNX parity check is tests/test_engine_parity.py. Run from the
+repository root:
+
+    python backend/benchmarks/bench_engines.py --engines torch onnx openvino
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import file_fingerprint  # noqa: E402
+from detections import pairwise_iou  # noqa: E402
+from engines import available_engines, load_engine  # noqa: E402
+
+MODEL_PATH = "./backend/models/model_yolov8s.pt"
+DEFAULT_IMAGES = [os.path.join("notebook-test", "test-image.jpg")]
+
+
+def detections(model, images: list, conf: float) -> list:
+    """(boxes, confidences, class ids) arrays per image"""
+    outputs = []
+    for result in model(images, conf=conf, verbose=False):
+        boxes = result.boxes
+        outputs.append((
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy().astype(int),
+        ))
+    return outputs
+
+
+def compare(reference: list, candidate: list, min_iou: float, max_conf_diff: float) -> list:
+    """Human-readable parity problems (empty when the engines agree)"""
+    problems = []
+    for index, ((ref_boxes, ref_conf, ref_cls), (boxes, conf, cls)) in enumerate(zip(reference, candidate)):
+        if len(ref_boxes) != len(boxes):
+            problems.append(f"image {index}: {len(ref_boxes)} boxes vs {len(boxes)}")
+            continue
+        if not len(boxes):
+            continue
+        ious = pairwise_iou(ref_boxes, boxes)
+        best = ious.argmax(axis=1)
+        for i, j in enumerate(best):
+            if ious[i, j] < min_iou:
+                problems.append(f"image {index} box {i}: IoU {ious[i, j]:.3f}")
+            elif ref_cls[i] != cls[j]:
+                problems.append(f"image {index} box {i}: class {ref_cls[i]} vs {cls[j]}")
+            elif abs(ref_conf[i] - conf[j]) > max_conf_diff:
+                problems.append(f"image {index} box {i}: conf {ref_conf[i]:.3f} vs {conf[j]:.3f}")
+    return problems
+
+
+def benchmark(model, image, batch_sizes: list, repeats: int) -> dict:
+    """Median single-image latency and throughput per batch size"""
+    model([image], verbose=False)  # warm-up
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model([image], verbose=False)
+        latencies.append(time.perf_counter() - start)
+
+    throughput = {}
+    for size in batch_sizes:
+        batch = [image] * size
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model(batch, verbose=False)
+        throughput[size] = size * repeats / (time.perf_counter() - start)
+    return {"latency_ms": statistics.median(latencies) * 1000, "throughput": throughput}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engines", nargs="+", default=["torch", "onnx"], choices=available_engines())
+    parser.add_argument("--images", nargs="+", default=DEFAULT_IMAGES)
+    parser.add_argument("--cache-dir", default="./backend/models/exports")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--max-conf-diff", type=float, default=0.05)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    images = [Image.open(path).convert("RGB") for path in args.images]
+    version = file_fingerprint(MODEL_PATH)
+    engines = ["torch"] + [engine for engine in args.engines if engine != "torch"]
+
+    reference = None
+    header = f"{'engine':>14} | {'latency ms':>10} | " + " | ".join(
+        f"{'b=' + str(size) + ' img/s':>10}" for size in args.batch_sizes
+    ) + " | parity"
+    print(header)
+
+    for engine in engines:
+        model = load_engine(MODEL_PATH, engine, cache_dir=args.cache_dir, model_version=version)
+        outputs = detections(model, images, args.conf)
+        if reference is None:
+            reference = outputs
+            problems = []
+        else:
+            problems = compare(reference, outputs, args.min_iou, args.max_conf_diff)
+
+        timing = benchmark(model, images[0], args.batch_sizes, args.repeats)
+        print(
+            f"{engine:>14} | {timing['latency_ms']:>10.1f} | "
+            + " | ".join(f"{timing['throughput'][size]:>10.2f}" for size in args.batch_sizes)
+            + f" | {'ok' if not problems else 'FAIL'}"
+        )
+        for problem in problems:
+            print(f"{'':>16} {problem}")
+
+
+if __name__ == "__main__":
+    main()
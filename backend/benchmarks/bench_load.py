@@ -0,0 +1,400 @@
+"""
+Load-test /predict: latency percentiles, images/sec and peak RSS per concurrency level.
+
+Requests are driven with httpx against the FastAPI app in-process (ASGI
+transport, no sockets) or against a local uvicorn started for the run.
+--stub swaps ultralytics.YOLO for a deterministic fake, so the suite runs
+without the weights file or torch (e.g. in CI) and measures the service
+around the model. Every upload gets unique trailing bytes so the result
+cache is not hit unless --repeat-images is given. Results go to a JSON file
+that a later run can compare against with --baseline.
+
+    python backend/benchmarks/bench_load.py --stub --concurrency 1 4 16 --output load.json
+    python backend/benchmarks/bench_load.py --server uvicorn --files 4 --sizes 512 2048 --baseline load.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import types
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUB_NAMES = {0: "glioma", 1: "meningioma", 2: "pituitary"}
+
+
+# ============================
+# Stub Model
+# ============================
+class _Array:
+    """Stands in for a torch tensor: .cpu().numpy()"""
+
+    def __init__(self, array: np.ndarray):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self._array
+
+
+class StubYOLO:
+    """
+    Deterministic fake of ultralytics.YOLO.
+
+    Boxes are derived from the image's own pixels, so the same image always
+    gives the same detections. `STUB_LATENCY_MS` adds a sleep per image to
+    stand in for the forward pass.
+    """
+
+    def __init__(self, path: str, task: str = None):
+        self.path = path
+        self.names = dict(STUB_NAMES)
+        self.latency = float(os.getenv("STUB_LATENCY_MS", "0")) / 1000
+
+    def __call__(self, images, verbose: bool = False, conf: float = 0.25,
+                 iou: float = 0.7, max_det: int = 300, **kwargs) -> list:
+        if self.latency:
+            time.sleep(self.latency * len(images))
+        return [self._predict(np.asarray(image), conf, max_det) for image in images]
+
+    def _predict(self, image: np.ndarray, conf: float, max_det: int):
+        height, width = image.shape[:2]
+        rng = np.random.default_rng(int(image[::16, ::16].sum()))
+        count = int(rng.integers(0, 6))
+        corners = rng.uniform(0, 0.8, (count, 2)) * (width, height)
+        sizes = rng.uniform(0.05, 0.2, (count, 2)) * (width, height)
+        xyxy = np.hstack([corners, corners + sizes]).astype(np.float32)
+        scores = rng.uniform(0.05, 1.0, count).astype(np.float32)
+        classes = rng.integers(0, len(self.names), count).astype(np.float32)
+
+        keep = np.argsort(-scores)[:max_det]
+        keep = keep[scores[keep] >= conf]
+        boxes = types.SimpleNamespace(
+            xyxy=_Array(xyxy[keep]), conf=_Array(scores[keep]), cls=_Array(classes[keep])
+        )
+        return types.SimpleNamespace(boxes=boxes, names=self.names)
+
+
+def install_stub(latency_ms: float) -> str:
+    """Register the fake ultralytics module and a fake weights file; returns its path"""
+    module = types.ModuleType("ultralytics")
+    module.YOLO = StubYOLO
+    sys.modules["ultralytics"] = module
+
+    weights = os.path.join(tempfile.gettempdir(), "bench_load_stub.pt")
+    with open(weights, "wb") as f:
+        f.write(b"stub-model-v1")
+    os.environ["MODEL_REGISTRY"] = f"stub={weights}"
+    os.environ["DEFAULT_MODEL"] = "stub"
+    os.environ["STUB_LATENCY_MS"] = str(latency_ms)
+    return weights
+
+
+# ============================
+# Payloads
+# ============================
+def make_image(side: int, seed: int) -> bytes:
+    """A JPEG scan look-alike: noise with one bright blob"""
+    rng = np.random.default_rng(seed)
+    y, x = np.ogrid[0:side, 0:side]
+    blob = ((y - side * 0.4) ** 2 + (x - side * 0.6) ** 2) <= (side * 0.08) ** 2
+    pixels = np.clip(rng.normal(60, 20, (side, side)) + blob * 150, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).convert("RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class Payloads:
+    """Multipart file lists for /predict, cycling through the image sizes"""
+
+    def __init__(self, sizes: list, files_per_request: int, repeat: bool):
+        self.images = [make_image(side, side) for side in sizes]
+        self.files_per_request = files_per_request
+        self.repeat = repeat
+        self.counter = 0
+
+    def next(self) -> list:
+        files = []
+        for _ in range(self.files_per_request):
+            data = self.images[self.counter % len(self.images)]
+            if not self.repeat:
+                # Bytes after the JPEG end marker change the cache key, not the pixels
+                data = data + self.counter.to_bytes(8, "little")
+            files.append(("files", (f"scan_{self.counter}.jpg", data, "image/jpeg")))
+            self.counter += 1
+        return files
+
+
+# ============================
+# Servers
+# ============================
+def peak_rss_mb(pid: int = None) -> float:
+    """
+    Peak RSS of a process plus its child processes (Linux), in MB.
+
+    Children that share pages copy-on-write are counted in full, so with
+    SERVING_MODE=process this is an upper bound.
+    """
+    pids = [pid or os.getpid()]
+    total = 0.0
+    try:
+        while pids:
+            current = pids.pop()
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1]) / 1024
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        return total
+    except OSError:
+        if pid is not None:
+            return float("nan")
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class InProcessServer:
+    """The app itself behind httpx's ASGI transport; startup handlers run by hand"""
+
+    def __init__(self):
+        import backend
+        self.backend = backend
+        self.pid = None
+
+    async def __aenter__(self):
+        for handler in self.backend.app.router.on_startup:
+            await handler()
+        while not self.backend.model_ready():
+            if self.backend.startup_state["status"] == "failed":
+                raise RuntimeError(f"Model failed to load: {self.backend.startup_state['error']}")
+            await asyncio.sleep(0.1)
+        return self
+
+    async def __aexit__(self, *exc):
+        for handler in self.backend.app.router.on_shutdown:
+            await handler()
+
+    def client(self, timeout: float):
+        import httpx
+        transport = httpx.ASGITransport(app=self.backend.app)
+        return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout)
+
+
+class UvicornServer:
+    """A local uvicorn subprocess running this script with --serve"""
+
+    def __init__(self, port: int, stub: bool, stub_latency_ms: float):
+        self.port = port
+        self.command = [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+                        "--stub-latency-ms", str(stub_latency_ms)] + (["--stub"] if stub else [])
+        self.process = None
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    async def __aenter__(self):
+        import httpx
+        self.process = subprocess.Popen(self.command)
+        deadline = time.monotonic() + 600
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{self.port}") as client:
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {self.process.returncode}")
+                try:
+                    if (await client.get("/health/ready")).status_code == 200:
+                        return self
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.5)
+        raise RuntimeError("Server did not become ready in time")
+
+    async def __aexit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+    def client(self, timeout: float):
+        import httpx
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        return httpx.AsyncClient(base_url=f"http://127.0.0.1:{self.port}", timeout=timeout,
+                                 limits=limits)
+
+
+def serve(port: int):
+    import uvicorn
+    import backend
+    uvicorn.run(backend.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ============================
+# Load Generation
+# ============================
+async def run_level(server, payloads: Payloads, concurrency: int, requests: int,
+                    accept: str, timeout: float) -> dict:
+    """Send `requests` /predict calls with `concurrency` in flight"""
+    latencies = []
+    errors = 0
+    images = 0
+    remaining = requests
+
+    async def user(client):
+        nonlocal remaining, errors, images
+        while remaining > 0:
+            remaining -= 1
+            files = payloads.next()
+            start = time.perf_counter()
+            try:
+                response = await client.post("/predict", files=files, headers={"Accept": accept})
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if ok:
+                images += len(files)
+            else:
+                errors += 1
+
+    async with server.client(timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "images": images,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_sec": round(requests / elapsed, 2),
+        "images_per_sec": round(images / elapsed, 2),
+        "latency_ms": {
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "mean": round(float(latencies_ms.mean()), 2),
+            "max": round(float(latencies_ms.max()), 2),
+        },
+        "peak_rss_mb": round(peak_rss_mb(server.pid), 1),
+    }
+
+
+def compare(runs: list, baseline_path: str, tolerance: float) -> bool:
+    """Print throughput and p95 changes against a previous run; False on a regression"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {run["concurrency"]: run for run in json.load(f)["runs"]}
+
+    ok = True
+    print(f"\nvs. {baseline_path} (tolerance {tolerance:.0%})")
+    print(f"{'conc':>5} | {'img/s':>8} | {'change':>7} | {'p95 ms':>8} | {'change':>7}")
+    for run in runs:
+        before = baseline.get(run["concurrency"])
+        if before is None:
+            continue
+        throughput = run["images_per_sec"] / before["images_per_sec"] - 1
+        p95 = run["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1
+        regressed = throughput < -tolerance or p95 > tolerance
+        ok = ok and not regressed
+        print(f"{run['concurrency']:>5} | {run['images_per_sec']:>8.1f} | {throughput:>+7.1%} | "
+              f"{run['latency_ms']['p95']:>8.1f} | {p95:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> list:
+    if args.server == "uvicorn":
+        server = UvicornServer(args.port, args.stub, args.stub_latency_ms)
+    else:
+        server = InProcessServer()
+    payloads = Payloads(args.sizes, args.files, args.repeat_images)
+
+    runs = []
+    print(f"{'conc':>5} | {'reqs':>5} | {'errors':>6} | {'img/s':>8} | {'p50 ms':>8} | "
+          f"{'p95 ms':>8} | {'p99 ms':>8} | {'peak RSS MB':>11}")
+    async with server:
+        if args.warmup:
+            await run_level(server, payloads, 1, args.warmup, args.accept, args.timeout)
+        for concurrency in args.concurrency:
+            result = await run_level(server, payloads, concurrency, args.requests,
+                                     args.accept, args.timeout)
+            latency = result["latency_ms"]
+            print(f"{concurrency:>5} | {result['requests']:>5} | {result['errors']:>6} | "
+                  f"{result['images_per_sec']:>8.1f} | {latency['p50']:>8.1f} | "
+                  f"{latency['p95']:>8.1f} | {latency['p99']:>8.1f} | {result['peak_rss_mb']:>11.1f}")
+            runs.append(result)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="Requests before measuring")
+    parser.add_argument("--files", type=int, default=1, help="Files per request")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512], help="Image sides in pixels")
+    parser.add_argument("--repeat-images", action="store_true", help="Allow result-cache hits")
+    parser.add_argument("--accept", default="application/json", help="Response media type")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--stub", action="store_true", help="Use a deterministic fake YOLO")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Fake inference time per image")
+    parser.add_argument("--output", help="Write results as JSON here")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed img/s drop or p95 rise vs. the baseline (fraction)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stub:
+        install_stub(args.stub_latency_ms)
+    if args.serve:
+        serve(args.port)
+        return
+
+    runs = asyncio.run(run(args))
+
+    if args.output:
+        report = {
+            "config": {key: value for key, value in vars(args).items()
+                       if key not in ("output", "baseline", "serve")},
+            "environment": {
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "runs": runs,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline and not compare(runs, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare serialization time and payload size of the /predict response formats.
+
+A synthetic response shaped like /predict's is encoded with the stdlib JSON
+encoder (the previous default), the fast JSON path, MessagePack and the
+columnar MessagePack layout. No model is needed.
+
+    python backend/benchmarks/bench_serialization.py --images 20 --detections 1 10 100
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import encoding  # noqa: E402
+
+
+def make_response(images: int, detections: int) -> dict:
+    """A /predict response with random boxes in a 512x512 image"""
+    rng = np.random.default_rng(detections)
+    results = []
+    for index in range(images):
+        corners = rng.uniform(0, 400, (detections, 2))
+        boxes = np.hstack([corners, corners + rng.uniform(10, 100, (detections, 2))])
+        results.append({
+            "image_id": str(uuid.uuid4()),
+            "filename": f"scan_{index:04d}.jpg",
+            "image_size": {"width": 512, "height": 512},
+            "detections": [
+                {
+                    "class_id": int(class_id),
+                    "class_name": f"class_{class_id}",
+                    "confidence": float(conf),
+                    "bbox_xyxy": box.tolist()
+                }
+                for class_id, conf, box in zip(
+                    rng.integers(0, 3, detections), rng.uniform(0.05, 1.0, detections), boxes
+                )
+            ],
+            "detection_count": detections,
+            "status": "success",
+            "model": "yolov8s",
+            "model_version": "0123456789ab",
+            "thresholds": {"conf": 0.05, "iou": 0.7, "max_det": 300},
+            "cache_hit": False
+        })
+    return {"count": images, "successful": images, "failed": 0, "results": results}
+
+
+def stdlib_json(payload: dict) -> bytes:
+    """Previous behaviour: what JSONResponse renders"""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def measure(func, payload: dict, repeats: int) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = func(payload)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, len(body) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--detections", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    encoders = {"json (stdlib)": stdlib_json}
+    if encoding.orjson is not None:
+        encoders["json (orjson)"] = encoding.encode_json
+    else:
+        print("orjson is not installed; skipping the fast JSON path")
+    if encoding.msgpack is not None:
+        encoders["msgpack"] = lambda payload: encoding.encode(payload, encoding.MSGPACK)
+        encoders["columnar"] = lambda payload: encoding.encode(payload, encoding.COLUMNAR)
+    else:
+        print("msgpack is not installed; skipping the binary formats")
+
+    print(f"{args.images} images per response")
+    print(f"{'dets/img':>8} | {'format':>13} | {'ms':>7} | {'KB':>8} | {'vs stdlib':>9}")
+    for detections in args.detections:
+        payload = make_response(args.images, detections)
+        base_ms = None
+        for name, func in encoders.items():
+            ms, kb = measure(func, payload, args.repeats)
+            base_ms = base_ms or ms
+            print(f"{detections:>8} | {name:>13} | {ms:>7.2f} | {kb:>8.1f} | "
+                  f"{base_ms / ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare tiled and whole-image inference latency on high-resolution scans.
+
+The test image is upscaled to each size and JPEG-encoded. Whole-image mode
+decodes to 640 and runs one forward pass; tiled mode decodes within the tile
+budget, runs all tiles as one batch and merges them with cross-tile NMS.
+
+    python backend/benchmarks/bench_tiling.py --sizes 1024 2048 4096 --tile-size 640
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import statistics
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import file_fingerprint  # noqa: E402
+from engines import load_engine  # noqa: E402
+from decoding import decode_to_array  # noqa: E402
+from detections import from_result  # noqa: E402
+from tiling import TileConfig, decode_tiled, merge_tiles, split_tiles  # noqa: E402
+
+MODEL_PATH = "./backend/models/model_yolov8s.pt"
+DEFAULT_IMAGE = os.path.join("notebook-test", "test-image.jpg")
+
+
+def make_scan(path: str, side: int) -> bytes:
+    image = Image.open(path).convert("RGB").resize((side, side), Image.BICUBIC)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def whole(model, image_bytes: bytes, conf: float) -> int:
+    image = decode_to_array(image_bytes, 640)
+    return len(from_result(model([image.array], conf=conf, verbose=False)[0]).conf)
+
+
+def tiled(model, image_bytes: bytes, conf: float, config: TileConfig) -> int:
+    image = decode_tiled(image_bytes, config, 640)
+    if image.tile_origins is None:
+        return len(from_result(model([image.array], conf=conf, verbose=False)[0]).conf)
+    tiles = split_tiles(image, config.tile_size)
+    results = [from_result(r) for r in model(tiles, conf=conf, verbose=False)]
+    return len(merge_tiles(results, image.tile_origins, config.tile_size, 0.7).conf)
+
+
+def measure(func, repeats: int) -> tuple:
+    count = func()  # warm-up for this input shape
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--image", default=DEFAULT_IMAGE)
+    parser.add_argument("--engine", default="torch")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--overlap", type=int, default=128)
+    parser.add_argument("--max-tiles", type=int, default=16)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    config = TileConfig(args.tile_size, args.overlap, args.max_tiles, min_side=args.tile_size).validate()
+    model = load_engine(
+        MODEL_PATH, args.engine,
+        cache_dir="./backend/models/exports", model_version=file_fingerprint(MODEL_PATH),
+    )
+
+    print(f"tile {config.tile_size}px, overlap {config.overlap}px, budget {config.max_tiles} tiles")
+    print(f"{'side':>5} | {'tiles':>5} | {'whole ms':>8} | {'tiled ms':>8} | "
+          f"{'slowdown':>8} | {'whole dets':>10} | {'tiled dets':>10}")
+    for side in args.sizes:
+        image_bytes = make_scan(args.image, side)
+        origins = decode_tiled(image_bytes, config, 640).tile_origins
+        tile_count = 1 if origins is None else len(origins)
+        whole_ms, whole_dets = measure(lambda: whole(model, image_bytes, args.conf), args.repeats)
+        tiled_ms, tiled_dets = measure(
+            lambda: tiled(model, image_bytes, args.conf, config), args.repeats
+        )
+        print(f"{side:>5} | {tile_count:>5} | {whole_ms:>8.1f} | {tiled_ms:>8.1f} | "
+              f"{tiled_ms / whole_ms:>7.1f}x | {whole_dets:>10} | {tiled_dets:>10}")
+
+
+if __name__ == "__main__":
+    main()
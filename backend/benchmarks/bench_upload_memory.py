@@ -0,0 +1,123 @@
+"""
+Measure peak memory of a max-size /predict request through the real endpoint.
+
+The app is served by uvicorn in this process and the request is streamed from
+files on disk, so the whole server path is measured: multipart parsing,
+chunked upload reads, decoding, batching and inference, for both the JSON and
+the NDJSON streaming response. Peak Python heap is measured with tracemalloc
+(the client only holds one chunk at a time); peak RSS is reported alongside
+where available. --stub uses bench_load.py's fake YOLO, so no weights are needed.
+Run from the repository root so the relative MODEL_PATH resolves:
+
+    python backend/benchmarks/bench_upload_memory.py --files 20
+    python backend/benchmarks/bench_upload_memory.py --files 20 --stub
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+
+import httpx
+import numpy as np
+import uvicorn
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_load import install_stub  # noqa: E402
+
+
+def make_payload(size_bytes: int, side: int) -> bytes:
+    """A valid JPEG of noise padded with trailing bytes up to `size_bytes`"""
+    pixels = np.random.default_rng(0).integers(0, 256, (side, side, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=95)
+    data = buffer.getvalue()
+    # Decoders stop at the JPEG end marker, so padding keeps the file valid
+    return data + b"\0" * max(0, size_bytes - len(data))
+
+
+def write_uploads(payload: bytes, count: int, directory: str) -> list:
+    """One file per upload, each with a unique suffix so the result cache cannot answer it"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"scan_{i}.jpg")
+        with open(path, "wb") as f:
+            f.write(payload + i.to_bytes(4, "little"))
+        paths.append(path)
+    return paths
+
+
+def serve(backend, port: int) -> uvicorn.Server:
+    """Run the app on a background thread and wait until its model is loaded"""
+    server = uvicorn.Server(uvicorn.Config(backend.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="server", daemon=True).start()
+    while not (server.started and backend.model_ready()):
+        if backend.startup_state["status"] == "failed":
+            raise RuntimeError(f"Model failed to load: {backend.startup_state['error']}")
+        time.sleep(0.1)
+    return server
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return float("nan")
+
+
+def measure(url: str, paths: list, accept: str) -> tuple:
+    """Peak heap (MB) while one request is served, and its HTTP status"""
+    handles = [open(path, "rb") for path in paths]
+    try:
+        files = [("files", (os.path.basename(path), f, "image/jpeg")) for path, f in zip(paths, handles)]
+        tracemalloc.start()
+        response = httpx.post(url, files=files, headers={"Accept": accept}, timeout=None)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        for f in handles:
+            f.close()
+    return peak / (1024 * 1024), response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--side", type=int, default=2048, help="Image side in pixels")
+    parser.add_argument("--size-mb", type=float, default=10.0, help="Bytes per upload")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stub", action="store_true", help="Use a deterministic fake YOLO")
+    args = parser.parse_args()
+
+    if args.stub:
+        install_stub(latency_ms=0.0)
+    # The backend reads its configuration (and the stub) at import time
+    import backend
+
+    # Just under the per-file limit, leaving room for the unique suffix
+    payload = make_payload(int(args.size_mb * 1024 * 1024) - 8, args.side)
+    print(f"{args.files} uploads of {len(payload) / 1024 / 1024:.1f} MB ({args.side}px), "
+          f"REQUEST_PIPELINE_DEPTH={backend.REQUEST_PIPELINE_DEPTH}")
+
+    server = serve(backend, args.port)
+    url = f"http://127.0.0.1:{args.port}/predict"
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_uploads(payload, args.files, directory)
+            for name, accept in (("json", "application/json"), ("ndjson", "application/x-ndjson")):
+                # Each run decodes and infers every file again
+                backend.result_cache.clear()
+                peak, status = measure(url, paths, accept)
+                print(f"{name:>7}: HTTP {status} | peak heap {peak:8.1f} MB | peak RSS {peak_rss_mb():8.1f} MB")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure 3D lesion aggregation time against the number of slices.
+
+Synthetic studies are generated as per-slice /predict results: lesions span
+a few consecutive slices with jittered boxes (sometimes missed on a slice),
+plus isolated false positives. The table reports aggregation time, time per
+slice (flat when scaling is near-linear) and recovered vs. true lesions.
+
+    python backend/benchmarks/bench_volume.py --slices 1000 5000 20000
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from volume import aggregate_volume  # noqa: E402
+
+
+def make_study(slices: int, lesion_every: int, seed: int = 0) -> tuple:
+    """Per-slice result dicts and the number of true lesions in them"""
+    rng = np.random.default_rng(seed)
+    per_slice = [[] for _ in range(slices)]
+
+    lesions = slices // lesion_every
+    for _ in range(lesions):
+        start = int(rng.integers(0, slices - 16))
+        length = int(rng.integers(3, 16))
+        center = rng.uniform(80, 430, 2)
+        size = rng.uniform(20, 60)
+        for z in range(start, start + length):
+            if rng.random() < 0.1:
+                continue  # missed on this slice
+            jitter = rng.normal(0, 2, 4)
+            box = np.r_[center - size / 2, center + size / 2] + jitter
+            per_slice[z].append((box, rng.uniform(0.5, 0.95)))
+
+    for z in rng.integers(0, slices, slices // 10):
+        corner = rng.uniform(0, 480, 2)
+        per_slice[z].append((np.r_[corner, corner + 20], rng.uniform(0.1, 0.4)))
+
+    results = [
+        {
+            "filename": "synthetic.dcm",
+            "slice_index": z,
+            "status": "success",
+            "detections": [
+                {"class_id": 0, "class_name": "tumor", "confidence": float(conf),
+                 "bbox_xyxy": box.tolist()}
+                for box, conf in boxes
+            ],
+        }
+        for z, boxes in enumerate(per_slice)
+    ]
+    return results, lesions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slices", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--lesion-every", type=int, default=25, help="One true lesion per N slices")
+    parser.add_argument("--min-slices", type=int, default=2)
+    parser.add_argument("--conf", type=float, default=0.45)
+    args = parser.parse_args()
+
+    print(f"{'slices':>7} | {'boxes':>7} | {'ms':>8} | {'us/slice':>8} | {'found':>6} | {'true':>6}")
+    for slices in args.slices:
+        results, true_lesions = make_study(slices, args.lesion_every)
+        boxes = sum(len(r["detections"]) for r in results)
+        start = time.perf_counter()
+        lesions = aggregate_volume(results, min_slices=args.min_slices, min_confidence=args.conf)
+        elapsed = time.perf_counter() - start
+        print(f"{slices:>7} | {boxes:>7} | {elapsed * 1000:>8.1f} | "
+              f"{elapsed / slices * 1e6:>8.1f} | {len(lesions):>6} | {true_lesions:>6}")
+
+
+if __name__ == "__main__":
+    main()
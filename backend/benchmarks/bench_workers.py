@@ -0,0 +1,80 @@
+"""
+Measure images/sec against the number of inference worker processes.
+
+Batches of decoded test images are pushed through ProcessWorkerPool from as
+many dispatcher threads as there are workers. The in-process (thread mode)
+baseline runs last, because the parent must not run inference before forking.
+
+    python backend/benchmarks/bench_workers.py --workers 1 2 4
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import file_fingerprint  # noqa: E402
+from engines import load_engine  # noqa: E402
+from decoding import decode_to_array  # noqa: E402
+from workers import ProcessWorkerPool  # noqa: E402
+
+MODEL_PATH = "./backend/models/model_yolov8s.pt"
+DEFAULT_IMAGE = os.path.join("notebook-test", "test-image.jpg")
+
+
+def throughput(infer, batch: list, batches: int, threads: int) -> float:
+    """Images/sec when `threads` dispatchers each send batches concurrently"""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: infer(batch), range(batches)))
+        elapsed = time.perf_counter() - start
+    return len(batch) * batches / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--image", default=DEFAULT_IMAGE)
+    parser.add_argument("--engine", default="torch")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--batches", type=int, default=16)
+    parser.add_argument("--torch-threads", type=int, default=1)
+    parser.add_argument("--decode-size", type=int, default=640)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        array = decode_to_array(f.read(), args.decode_size).array
+    batch = [array] * args.batch_size
+
+    model = load_engine(
+        MODEL_PATH, args.engine,
+        cache_dir="./backend/models/exports", model_version=file_fingerprint(MODEL_PATH),
+    )
+
+    print(f"batch size {args.batch_size}, {args.batches} batches, "
+          f"{args.torch_threads} torch thread(s) per worker")
+    print(f"{'workers':>7} | {'img/s':>8} | {'scaling':>7}")
+    base = None
+    for count in args.workers:
+        pool = ProcessWorkerPool(
+            model, num_workers=count, max_batch_size=args.batch_size,
+            image_side=args.decode_size, predict_args={"conf": 0.25},
+            torch_threads=args.torch_threads,
+        )
+        pool.start()
+        try:
+            throughput(pool.infer, batch, count, count)  # settle
+            rate = throughput(pool.infer, batch, args.batches, count)
+        finally:
+            pool.shutdown()
+        base = base or rate
+        print(f"{count:>7} | {rate:>8.2f} | {rate / base:>6.2f}x")
+
+    rate = throughput(lambda images: model(images, conf=0.25, verbose=False), batch, args.batches, 1)
+    print(f"{'thread':>7} | {rate:>8.2f} | {rate / base:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
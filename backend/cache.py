@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(path: str) -> str:
+    """Short content hash of a file, used as a model version"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+# ============================
+# Result Cache
+# ============================
+class ResultCache:
+    """
+    Content-addressed cache of inference results.
+
+    Entries are keyed by a hash of the raw image bytes plus the inference
+    parameters, so the same image processed by the same model with the same
+    settings is never decoded or inferred twice. The in-memory tier is an LRU
+    bounded by entry count and TTL; the optional disk tier stores one JSON
+    file per entry and survives restarts.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.disk_dir = disk_dir or None
+        self._entries = OrderedDict()
+        # Lookups come from both the event loop and executor threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            logger.info(f"Result cache disk tier at: {self.disk_dir}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self.disk_dir is not None
+
+    @staticmethod
+    def make_key(image_bytes: bytes, *params) -> str:
+        """Hash of the image content and every parameter that affects the result"""
+        digest = hashlib.sha256(image_bytes)
+        for param in params:
+            digest.update(b"\0" + str(param).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._memory_put(key, value, now)
+        return value
+
+    def put(self, key: str, value: dict):
+        if not self.enabled:
+            return
+        now = time.time()
+        self._memory_put(key, value, now)
+        self._disk_put(key, value, now)
+
+    def _memory_put(self, key: str, value: dict, stored_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str, now: float) -> Optional[dict]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable cache entry {path}: {e}")
+            return None
+
+        if now - entry["stored_at"] > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["value"]
+
+    def _disk_put(self, key: str, value: dict, stored_at: float):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk_dir": self.disk_dir,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,50 @@
+import io
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class DecodedImage(NamedTuple):
+    """Model-ready pixels plus what is needed to map boxes back"""
+    array: np.ndarray                 # HxWx3 uint8, BGR, C-contiguous
+    original_size: Tuple[int, int]    # (width, height) of the uploaded image
+    scale: Tuple[float, float]        # original / decoded, per axis
+    tile_origins: Optional[np.ndarray] = None   # (T, 2) x, y of each tile when tiled
+
+
+# ============================
+# Fast-Path Decoding
+# ============================
+def decode_to_array(image_bytes: bytes, target_size: int = 640) -> DecodedImage:
+    """
+    Decode an image straight to an array no larger than the model input size.
+
+    JPEGs are decoded at a reduced DCT scale (1/2, 1/4 or 1/8) via draft mode,
+    so a large scanner export never materializes at full resolution. The
+    remaining resize keeps the aspect ratio; the model's letterboxing then
+    has nothing left to downscale. `target_size=0` keeps full resolution.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    original_size = image.size
+
+    if target_size and max(original_size) > target_size:
+        # thumbnail() applies draft() for JPEGs and reduces in integer steps
+        # before the final resample, and never upscales
+        image.thumbnail((target_size, target_size), Image.BILINEAR, reducing_gap=2.0)
+
+    image = image.convert("RGB")
+
+    # Ultralytics treats arrays as BGR (OpenCV order)
+    array = np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+
+    scale = (
+        original_size[0] / image.size[0],
+        original_size[1] / image.size[1],
+    )
+    return DecodedImage(array, original_size, scale)
+
+def scale_boxes(xyxy: np.ndarray, scale: Tuple[float, float]) -> np.ndarray:
+    """Map (N, 4) boxes from decoded-image to original-image coordinates"""
+    sx, sy = scale
+    return xyxy * np.array([sx, sy, sx, sy], dtype=xyxy.dtype)
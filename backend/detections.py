@@ -0,0 +1,125 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class Detections(NamedTuple):
+    """Detections of one image as plain arrays (cheap to pickle, filter and cache)"""
+    xyxy: np.ndarray   # (N, 4) float32
+    conf: np.ndarray   # (N,) float32
+    cls: np.ndarray    # (N,) int32
+
+
+# ============================
+# Result Conversion
+# ============================
+def from_result(result) -> Detections:
+    """Convert one ultralytics Result into arrays, one device transfer per tensor"""
+    boxes = result.boxes
+    return Detections(
+        boxes.xyxy.cpu().numpy().astype(np.float32, copy=False),
+        boxes.conf.cpu().numpy().astype(np.float32, copy=False),
+        boxes.cls.cpu().numpy().astype(np.int32),
+    )
+
+
+# ============================
+# Threshold Filtering
+# ============================
+class Thresholds(NamedTuple):
+    """Per-request filtering of raw detections"""
+    conf: float
+    iou: Optional[float]   # None: keep the NMS done at inference time
+    max_det: int
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """IoU of one (4,) box against (N, 4) boxes"""
+    top_left = np.maximum(box[:2], boxes[:, :2])
+    bottom_right = np.minimum(box[2:], boxes[:, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+    area = np.prod(box[2:] - box[:2])
+    areas = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def nms(xyxy: np.ndarray, conf: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy NMS; returns kept indices, highest confidence first"""
+    order = np.argsort(-conf, kind="stable")
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        order = rest[box_iou(xyxy[best], xyxy[rest]) <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def pairwise_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, M) IoU matrix of (N, 4) boxes against (M, 4) boxes"""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def matrix_nms(xyxy: np.ndarray, conf: np.ndarray, iou_threshold: float,
+               max_boxes: int = 4096) -> np.ndarray:
+    """
+    NMS without a Python loop; returns kept indices, highest confidence first.
+
+    A box is dropped if it overlaps any higher-scoring box, even one that was
+    itself dropped ("Fast NMS"), which can remove slightly more than greedy
+    NMS in long chains of overlaps. Falls back to greedy NMS above
+    `max_boxes`, where the N x N matrix gets too large.
+    """
+    if len(conf) > max_boxes:
+        return nms(xyxy, conf, iou_threshold)
+    order = np.argsort(-conf, kind="stable")
+    ious = np.triu(pairwise_iou(xyxy[order], xyxy[order]), k=1)
+    return order[~(ious > iou_threshold).any(axis=0)]
+
+
+def class_offsets(xyxy: np.ndarray, cls: np.ndarray) -> np.ndarray:
+    """Shift each class into its own region so one NMS pass is class-aware"""
+    return cls[:, None].astype(np.float32) * (float(xyxy.max()) + 1.0)
+
+
+def filter_detections(detections: Detections, thresholds: Thresholds) -> Detections:
+    """
+    Apply a request's thresholds to detections produced at a lower floor.
+
+    Raising conf and tightening iou only ever remove boxes, so any stricter
+    setting is answered from the same forward pass.
+    """
+    mask = detections.conf >= thresholds.conf
+    xyxy, conf, cls = detections.xyxy[mask], detections.conf[mask], detections.cls[mask]
+
+    if thresholds.iou is not None and len(conf) > 1:
+        keep = nms(xyxy + class_offsets(xyxy, cls), conf, thresholds.iou)
+    else:
+        keep = np.argsort(-conf, kind="stable")
+    keep = keep[:thresholds.max_det]
+    return Detections(xyxy[keep], conf[keep], cls[keep])
+
+
+# ============================
+# Cache Serialization
+# ============================
+def to_dict(detections: Detections) -> dict:
+    """JSON-safe form of detections (for the on-disk cache tier)"""
+    return {
+        "xyxy": detections.xyxy.tolist(),
+        "conf": detections.conf.tolist(),
+        "cls": detections.cls.tolist(),
+    }
+
+
+def from_dict(data: dict) -> Detections:
+    return Detections(
+        np.asarray(data["xyxy"], dtype=np.float32).reshape(-1, 4),
+        np.asarray(data["conf"], dtype=np.float32),
+        np.asarray(data["cls"], dtype=np.int32),
+    )
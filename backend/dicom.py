@@ -0,0 +1,208 @@
+import io
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from decoding import DecodedImage
+
+# Optional: without pydicom the API keeps serving JPEG/PNG and rejects DICOM
+try:
+    import pydicom
+except ImportError:
+    pydicom = None
+
+DICOM_EXTENSIONS = (".dcm", ".dicom")
+DICOM_CONTENT_TYPES = ("application/dicom",)
+# (7FE0,0010) PixelData as its little-endian tag bytes
+PIXEL_DATA_TAG = b"\xe0\x7f\x10\x00"
+IMPLICIT_VR_LITTLE_ENDIAN = "1.2.840.10008.1.2"
+# Transfer syntaxes whose pixel data is stored raw and can be memory-mapped
+UNCOMPRESSED_SYNTAXES = (
+    "1.2.840.10008.1.2",     # Implicit VR Little Endian
+    "1.2.840.10008.1.2.1",   # Explicit VR Little Endian
+)
+
+
+class DicomUnavailableError(RuntimeError):
+    """Raised when a DICOM file arrives but pydicom is not installed"""
+
+
+def is_dicom(data: bytes) -> bool:
+    """DICOM Part 10 files carry 'DICM' after a 128-byte preamble"""
+    return len(data) >= 132 and data[128:132] == b"DICM"
+
+def is_dicom_file(path: str) -> bool:
+    with open(path, "rb") as f:
+        return is_dicom(f.read(132))
+
+def looks_like_dicom(filename: str, content_type: Optional[str] = None) -> bool:
+    return (content_type in DICOM_CONTENT_TYPES
+            or (filename or "").lower().endswith(DICOM_EXTENSIONS))
+
+
+# ============================
+# Windowing
+# ============================
+def window_frames(frames: np.ndarray, center: Optional[float], width: Optional[float],
+                  slope: float = 1.0, intercept: float = 0.0, invert: bool = False) -> np.ndarray:
+    """
+    Map stored values of one frame (H, W) or a stack (N, H, W) to uint8.
+
+    Applies the modality rescale, then the VOI window; without a window in
+    the header each frame is stretched over its own min..max range.
+    """
+    values = frames.astype(np.float32)
+    if slope != 1.0 or intercept != 0.0:
+        values = values * np.float32(slope) + np.float32(intercept)
+
+    if center is None or width is None:
+        low = values.min(axis=(-2, -1), keepdims=True)
+        high = values.max(axis=(-2, -1), keepdims=True)
+    else:
+        low = np.float32(center - width / 2)
+        high = np.float32(center + width / 2)
+
+    scaled = (values - low) * (np.float32(255.0) / np.maximum(high - low, np.float32(1e-6)))
+    out = np.clip(scaled, 0, 255).astype(np.uint8)
+    return 255 - out if invert else out
+
+
+def _pixel_data_offset(fileobj, implicit_vr: bool, expected_bytes: int) -> Optional[int]:
+    """
+    File offset of the raw PixelData value, or None if it can't be mapped.
+
+    `fileobj` must be positioned where pydicom stopped before the pixels,
+    i.e. at the start of the PixelData element. The element header is parsed
+    here rather than taken from pydicom, whose offset attributes differ
+    between major versions.
+    """
+    start = fileobj.tell()
+    header = fileobj.read(8 if implicit_vr else 12)
+    if len(header) < len(PIXEL_DATA_TAG) or header[:4] != PIXEL_DATA_TAG:
+        return None
+    if implicit_vr:
+        length = int.from_bytes(header[4:8], "little")
+    else:
+        # Explicit VR OB/OW: tag, VR, 2 reserved bytes, 4-byte length
+        length = int.from_bytes(header[8:12], "little")
+    # Undefined length means encapsulated (compressed) frames
+    if length == 0xFFFFFFFF or length < expected_bytes:
+        return None
+    return start + len(header)
+
+def _first(value) -> Optional[float]:
+    """Header values may be multi-valued (one per window); use the first"""
+    if value is not None and not isinstance(value, (str, bytes)) and hasattr(value, "__len__"):
+        value = value[0] if len(value) else None
+    return None if value is None else float(value)
+
+
+# ============================
+# DICOM Series
+# ============================
+class DicomSeries:
+    """
+    Frames of one DICOM file (single- or multi-frame), extracted lazily.
+
+    Uncompressed little-endian pixel data is never read up front: it is
+    memory-mapped from disk (or viewed in place for an in-memory upload) at
+    the offset of the PixelData value, so one frame is touched at a time. Compressed transfer syntaxes fall back to pydicom's
+    decoder, which decodes all frames on first access.
+    """
+
+    def __init__(self, source: Union[str, bytes]):
+        if pydicom is None:
+            raise DicomUnavailableError("DICOM support requires pydicom (pip install pydicom)")
+        self.source = source
+        fileobj = open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+        with fileobj:
+            # Only the header is parsed; the file is left at the PixelData element
+            ds = pydicom.dcmread(fileobj, stop_before_pixels=True)
+            self._init_header(ds)
+            self._frames = self._map_frames(ds, fileobj)
+
+    def _init_header(self, ds):
+        self.rows = int(ds.Rows)
+        self.columns = int(ds.Columns)
+        self.num_frames = int(getattr(ds, "NumberOfFrames", 1) or 1)
+        self.samples = int(getattr(ds, "SamplesPerPixel", 1))
+        self.window = (
+            _first(getattr(ds, "WindowCenter", None)),
+            _first(getattr(ds, "WindowWidth", None)),
+            float(getattr(ds, "RescaleSlope", 1.0) or 1.0),
+            float(getattr(ds, "RescaleIntercept", 0.0) or 0.0),
+            getattr(ds, "PhotometricInterpretation", "") == "MONOCHROME1",
+        )
+
+    def _map_frames(self, ds, fileobj) -> Optional[np.ndarray]:
+        """Frames viewed in place for raw little-endian greyscale data, else None"""
+        syntax = str(ds.file_meta.TransferSyntaxUID)
+        bits = int(getattr(ds, "BitsAllocated", 0))
+        if syntax not in UNCOMPRESSED_SYNTAXES or self.samples != 1 or bits not in (8, 16, 32):
+            return None
+
+        signed = int(getattr(ds, "PixelRepresentation", 0)) == 1
+        dtype = np.dtype(f"<{'i' if signed else 'u'}{bits // 8}")
+        shape = (self.num_frames, self.rows, self.columns)
+        offset = _pixel_data_offset(
+            fileobj, syntax == IMPLICIT_VR_LITTLE_ENDIAN, int(np.prod(shape)) * dtype.itemsize
+        )
+        if offset is None:
+            return None
+        if isinstance(self.source, str):
+            return np.memmap(self.source, dtype=dtype, mode="r", offset=offset, shape=shape)
+        return np.frombuffer(
+            self.source, dtype=dtype, count=int(np.prod(shape)), offset=offset
+        ).reshape(shape)
+
+    def _decoded_frames(self) -> np.ndarray:
+        """Compressed or colour data: let pydicom decode the whole file once"""
+        if self._frames is None:
+            fileobj = self.source if isinstance(self.source, str) else io.BytesIO(self.source)
+            pixels = pydicom.dcmread(fileobj).pixel_array
+            if self.samples > 1:
+                # Colour frames are reduced to luminance like the greyscale ones
+                pixels = pixels.mean(axis=-1)
+            self._frames = pixels.reshape(self.num_frames, self.rows, self.columns)
+        return self._frames
+
+    def frame(self, index: int) -> np.ndarray:
+        """Stored values of one frame (a view, not a copy, when memory-mapped)"""
+        return self._decoded_frames()[index]
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def decode(self, index: int, target_size: int = 640) -> DecodedImage:
+        """Window one frame and size it for the model like decode_to_array does"""
+        image = Image.fromarray(window_frames(self.frame(index), *self.window))
+        original_size = image.size
+        if target_size and max(original_size) > target_size:
+            image.thumbnail((target_size, target_size), Image.BILINEAR)
+
+        # Greyscale: the same plane in all three channels is valid BGR
+        array = np.ascontiguousarray(np.repeat(np.asarray(image)[:, :, None], 3, axis=2))
+        scale = (original_size[0] / image.size[0], original_size[1] / image.size[1])
+        return DecodedImage(array, original_size, scale)
+
+
+class DicomSlice(NamedTuple):
+    """One frame of a series, in place of raw image bytes in the inference path"""
+    series: DicomSeries
+    index: int
+
+    def pixels(self) -> np.ndarray:
+        """Stored frame values, hashed for the result cache instead of file bytes"""
+        return np.ascontiguousarray(self.series.frame(self.index))
+
+    def decode(self, target_size: int = 640) -> DecodedImage:
+        return self.series.decode(self.index, target_size)
+
+
+def frame_count(path: str) -> int:
+    """Frames in a DICOM file, reading only its header"""
+    if pydicom is None:
+        raise DicomUnavailableError("DICOM support requires pydicom (pip install pydicom)")
+    ds = pydicom.dcmread(path, stop_before_pixels=True)
+    return int(getattr(ds, "NumberOfFrames", 1) or 1)
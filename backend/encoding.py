@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+
+# Both encoders are optional: without them the API falls back to the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+# One record per image with packed little-endian arrays instead of detection dicts
+COLUMNAR = "application/vnd.brain-tumor.columnar+msgpack"
+# Many msgpack clients still send the older, unregistered name
+MSGPACK_ALIASES = (MSGPACK, "application/x-msgpack")
+
+
+# ============================
+# Content Negotiation
+# ============================
+def negotiate_format(accept: str) -> str:
+    """Pick the response media type from the Accept header (JSON by default)"""
+    accept = accept.lower()
+    if msgpack is not None:
+        if COLUMNAR in accept:
+            return COLUMNAR
+        if any(alias in accept for alias in MSGPACK_ALIASES):
+            return MSGPACK
+    return JSON
+
+
+# ============================
+# Encoders
+# ============================
+def encode_json(payload) -> bytes:
+    """Compact JSON, through orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def to_columnar(payload: dict) -> dict:
+    """
+    Replace each result's list of detection dicts with packed arrays.
+
+    `boxes` holds N*4 float32 values (x1, y1, x2, y2 per row), `conf` N
+    float32 and `class_id` N int32, all little-endian; class names are sent
+    once per response in `class_names`, keyed by the class id as a string
+    (msgpack clients reject int map keys by default). Per-image `image_id`s
+    are dropped.
+    """
+    class_names = {}
+    results = []
+    for result in payload.get("results", []):
+        detections = result.get("detections", [])
+        record = {key: value for key, value in result.items() if key not in ("detections", "image_id")}
+        record["boxes"] = np.asarray(
+            [d["bbox_xyxy"] for d in detections], dtype="<f4"
+        ).reshape(-1, 4).tobytes()
+        record["conf"] = np.asarray([d["confidence"] for d in detections], dtype="<f4").tobytes()
+        record["class_id"] = np.asarray([d["class_id"] for d in detections], dtype="<i4").tobytes()
+        for d in detections:
+            class_names[str(d["class_id"])] = d["class_name"]
+        results.append(record)
+    return {**payload, "results": results, "class_names": class_names}
+
+def encode(payload: dict, media_type: str) -> bytes:
+    """Serialize a response payload for a negotiated media type"""
+    if media_type == COLUMNAR:
+        return msgpack.packb(to_columnar(payload), use_bin_type=True)
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return encode_json(payload)
@@ -0,0 +1,71 @@
+import os
+import shutil
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Export arguments per engine; "torch" serves the .pt weights directly
+ENGINE_EXPORTS = {
+    "torch": None,
+    "onnx": {"format": "onnx", "dynamic": True},
+    "openvino": {"format": "openvino", "dynamic": True},
+    "openvino-int8": {"format": "openvino", "int8": True},
+}
+
+
+# ============================
+# Inference Engines
+# ============================
+def available_engines() -> list:
+    return list(ENGINE_EXPORTS)
+
+def artifact_path(cache_dir: str, model_version: str, engine: str) -> str:
+    """Where the exported model for an engine is cached"""
+    return os.path.join(cache_dir, model_version, engine)
+
+def export_model(model_path: str, engine: str, cache_dir: str, model_version: str,
+                 imgsz: int = 640, int8_data: str = None) -> str:
+    """
+    Export the .pt weights for `engine` once and return the cached artifact.
+
+    Artifacts are cached per model version, so replacing the weights file
+    triggers a fresh export instead of serving a stale one.
+    """
+    target_dir = artifact_path(cache_dir, model_version, engine)
+    if os.path.isdir(target_dir) and os.listdir(target_dir):
+        # ONNX exports are a single file, OpenVINO exports are a directory
+        return os.path.join(target_dir, os.listdir(target_dir)[0])
+
+    export_args = dict(ENGINE_EXPORTS[engine], imgsz=imgsz)
+    if export_args.get("int8") and int8_data:
+        export_args["data"] = int8_data
+
+    from ultralytics import YOLO
+
+    logger.info(f"Exporting {model_path} for the {engine} engine (one-time)...")
+    exported = YOLO(model_path).export(**export_args)
+
+    os.makedirs(target_dir, exist_ok=True)
+    destination = os.path.join(target_dir, os.path.basename(os.path.normpath(exported)))
+    shutil.move(str(exported), destination)
+    logger.info(f"Cached {engine} export at: {destination}")
+    return destination
+
+def load_engine(model_path: str, engine: str, cache_dir: str, model_version: str,
+                imgsz: int = 640, int8_data: str = None):
+    """Load the model for the selected engine, exporting it first if needed"""
+    if engine not in ENGINE_EXPORTS:
+        raise ValueError(
+            f"Unknown inference engine '{engine}'. Choose one of: {', '.join(ENGINE_EXPORTS)}"
+        )
+
+    # Imported here so the API can start serving before torch is loaded
+    from ultralytics import YOLO
+
+    if engine == "torch":
+        return YOLO(model_path)
+
+    artifact = export_model(model_path, engine, cache_dir, model_version, imgsz, int8_data)
+    # Exported models carry class names in their metadata, so the output
+    # schema (boxes, confidences, names) is the same as the PyTorch model
+    return YOLO(artifact, task="detect")
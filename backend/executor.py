@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the inference admission queue cannot take more work"""
+
+
+# ============================
+# Inference Executor
+# ============================
+class InferenceExecutor:
+    """
+    Run blocking inference work on a dedicated thread pool.
+
+    Work is admitted up front (one slot per file of a request) so a request is
+    either accepted or rejected before any image is processed; a multi-frame
+    file reserves its remaining frames when it is expanded.
+    Admission state is only touched from the event loop, so no lock is needed.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="inference",
+        )
+        self._pending = 0
+
+    @property
+    def capacity(self) -> int:
+        """Images that can be running or waiting at the same time"""
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        """Images currently admitted (running or queued)"""
+        return self._pending
+
+    def reserve(self, count: int = 1):
+        """Reserve `count` slots, raising QueueFullError if they don't fit"""
+        if self._pending + count > self.capacity:
+            raise QueueFullError(
+                f"Inference queue is full ({self._pending}/{self.capacity} pending)"
+            )
+        self._pending += count
+
+    def release(self, count: int = 1):
+        self._pending -= count
+
+    async def run(self, func, *args):
+        """Run `func(*args)` on the inference pool without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, func, *args)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_size": self.max_queue,
+            "pending": self._pending,
+        }
+
+    def shutdown(self):
+        logger.info("Shutting down inference executor")
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,351 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import logging
+import tarfile
+import zipfile
+import threading
+from typing import List, Optional
+
+from dicom import DicomSeries, DicomSlice, frame_count, looks_like_dicom
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    error       TEXT
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id      TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    filename    TEXT NOT NULL,
+    path        TEXT,
+    slice_index INTEGER,
+    status      TEXT NOT NULL,
+    result      TEXT,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS job_items_status ON job_items (job_id, status);
+"""
+
+
+# ============================
+# Job Store (SQLite)
+# ============================
+class JobStore:
+    """
+    Persistent job and per-image result storage.
+
+    Job status is one of queued / running / completed / failed. Each image of
+    a job is an item that is `pending` until processed, then `success` or
+    `error` with its result JSON, so finished work survives restarts.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # One shared connection, used from the event loop and executor threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(job_items)")]
+        if "slice_index" not in columns:
+            # Databases created before DICOM support
+            self._conn.execute("ALTER TABLE job_items ADD COLUMN slice_index INTEGER")
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def create_job(self, job_id: str, items: List[dict]):
+        """Insert a queued job with its items (filename, path, slice_index, status, result)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, status, created_at, updated_at) VALUES (?, 'queued', ?, ?)",
+                    (job_id, now, now),
+                )
+                self._conn.executemany(
+                    "INSERT INTO job_items (job_id, seq, filename, path, slice_index, status, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (job_id, seq, item["filename"], item.get("path"), item.get("slice_index"),
+                         item["status"],
+                         json.dumps(item["result"]) if item.get("result") else None)
+                        for seq, item in enumerate(items)
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (status, error, time.time(), job_id),
+        )
+
+    def pending_items(self, job_id: str, limit: int) -> List[sqlite3.Row]:
+        return self._execute(
+            "SELECT seq, filename, path, slice_index FROM job_items WHERE job_id = ? AND status = 'pending' "
+            "ORDER BY seq LIMIT ?",
+            (job_id, limit),
+        )
+
+    def save_results(self, job_id: str, results: List[tuple]):
+        """Store (seq, result) pairs for processed items"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE job_items SET status = ?, result = ?, path = NULL WHERE job_id = ? AND seq = ?",
+                [(result["status"], json.dumps(result), job_id, seq) for seq, result in results],
+            )
+            self._conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+            )
+            self._conn.execute("COMMIT")
+
+    def path_in_use(self, job_id: str, path: str) -> bool:
+        """Whether pending items still read this file (frames of one DICOM series)"""
+        return bool(self._execute(
+            "SELECT 1 FROM job_items WHERE job_id = ? AND path = ? AND status = 'pending' LIMIT 1",
+            (job_id, path),
+        ))
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        if not rows:
+            return None
+        counts = dict(self._execute(
+            "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+        ))
+        job = dict(rows[0])
+        total = sum(counts.values())
+        processed = total - counts.get("pending", 0)
+        job.update({
+            "total": total,
+            "processed": processed,
+            "successful": counts.get("success", 0),
+            "failed": counts.get("error", 0),
+            "progress": processed / total if total else 1.0,
+        })
+        return job
+
+    def get_results(self, job_id: str, offset: int, limit: int) -> List[dict]:
+        """Processed items in submission order"""
+        rows = self._execute(
+            "SELECT seq, result FROM job_items WHERE job_id = ? AND status != 'pending' "
+            "ORDER BY seq LIMIT ? OFFSET ?",
+            (job_id, limit, offset),
+        )
+        return [{"index": row["seq"], **json.loads(row["result"])} for row in rows]
+
+    def unfinished_jobs(self) -> List[str]:
+        rows = self._execute(
+            "SELECT job_id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+        )
+        return [row["job_id"] for row in rows]
+
+
+# ============================
+# Upload Spooling
+# ============================
+def is_archive(filename: str) -> bool:
+    return (filename or "").lower().endswith(ARCHIVE_EXTENSIONS)
+
+def _rejected(filename: str, reason: str) -> dict:
+    return {
+        "filename": filename,
+        "status": "error",
+        "result": {"filename": filename, "detections": [], "detection_count": 0,
+                   "status": "error", "error": reason},
+    }
+
+def _spool_member(source, filename: str, size: int, job_dir: str, seq: int,
+                  max_bytes: int, max_dicom_bytes: int) -> List[dict]:
+    """
+    Copy one file to the job directory, or describe why it was rejected.
+
+    A DICOM file becomes one item per frame, all reading the same spooled file.
+    """
+    dicom = looks_like_dicom(filename)
+    if not (dicom or filename.lower().endswith(IMAGE_EXTENSIONS)):
+        return [_rejected(filename, "Unsupported file type")]
+    limit = max_dicom_bytes if dicom else max_bytes
+    if size > limit:
+        return [_rejected(filename, f"File size exceeds {limit // (1024 * 1024)}MB")]
+
+    path = os.path.join(job_dir, f"{seq:06d}{os.path.splitext(filename)[1].lower()}")
+    with open(path, "wb") as out:
+        shutil.copyfileobj(source, out, 1024 * 1024)
+    if not dicom:
+        return [{"filename": filename, "path": path, "status": "pending"}]
+
+    try:
+        frames = frame_count(path)
+    except Exception as e:
+        os.remove(path)
+        return [_rejected(filename, f"Unreadable DICOM file: {e}")]
+    return [
+        {"filename": filename, "path": path, "slice_index": index, "status": "pending"}
+        for index in range(frames)
+    ]
+
+def spool_upload(fileobj, filename: str, job_dir: str, first_seq: int, max_bytes: int,
+                 max_dicom_bytes: Optional[int] = None) -> List[dict]:
+    """
+    Write an uploaded image, or every image inside a zip/tar archive, to disk.
+
+    Archive members are written under sequence-numbered names, so member paths
+    never decide where files land. DICOM files (single or multi-frame) are
+    accepted up to `max_dicom_bytes` and expand to one item per slice.
+    """
+    max_dicom_bytes = max_dicom_bytes or max_bytes
+    items = []
+    if filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                if info.is_dir():
+                    continue
+                with archive.open(info) as member:
+                    items.extend(_spool_member(
+                        member, info.filename, info.file_size, job_dir,
+                        first_seq + len(items), max_bytes, max_dicom_bytes,
+                    ))
+    elif is_archive(filename):
+        with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                member = archive.extractfile(info)
+                items.extend(_spool_member(
+                    member, info.name, info.size, job_dir,
+                    first_seq + len(items), max_bytes, max_dicom_bytes,
+                ))
+    else:
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        items.extend(_spool_member(
+            fileobj, filename, size, job_dir, first_seq, max_bytes, max_dicom_bytes
+        ))
+    return items
+
+
+# ============================
+# Background Job Runner
+# ============================
+class JobRunner:
+    """
+    Process queued jobs in the background, one chunk of images at a time.
+
+    Progress is written to the store after every chunk, so a restart resumes
+    each unfinished job from its first pending image.
+    """
+
+    def __init__(self, store: Optional[JobStore], jobs_dir: str, process_batch, runner, chunk_size: int):
+        # process_batch: sync callable, list of (bytes or DicomSlice, filename) -> list of result dicts
+        # runner: async callable used to run blocking work off the event loop
+        self.store = store
+        self.jobs_dir = jobs_dir
+        self.process_batch = process_batch
+        self.runner = runner
+        self.chunk_size = chunk_size
+        self._queue = None
+        self._task = None
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def start(self):
+        """Start the worker and re-queue jobs left unfinished by a restart"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        for job_id in self.store.unfinished_jobs():
+            logger.info(f"Resuming job {job_id}")
+            self._queue.put_nowait(job_id)
+        self._task = asyncio.get_running_loop().create_task(self._worker())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def submit(self, job_id: str):
+        self._queue.put_nowait(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                self.store.set_status(job_id, "failed", str(e))
+
+    async def _process_job(self, job_id: str):
+        self.store.set_status(job_id, "running")
+        start = time.perf_counter()
+        while True:
+            items = self.store.pending_items(job_id, self.chunk_size)
+            if not items:
+                break
+            await self.runner(self._process_chunk, job_id, items)
+
+        self.store.set_status(job_id, "completed")
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        logger.info(f"Job {job_id} completed in {time.perf_counter() - start:.1f}s")
+
+    def _process_chunk(self, job_id: str, items: List[sqlite3.Row]):
+        """Read, infer and store one chunk (runs on an executor thread)"""
+        results = []
+        batch = []
+        series = {}
+        for item in items:
+            try:
+                if item["slice_index"] is not None:
+                    # Slices are memory-mapped from the series file, not read whole
+                    if item["path"] not in series:
+                        series[item["path"]] = DicomSeries(item["path"])
+                    source = DicomSlice(series[item["path"]], item["slice_index"])
+                else:
+                    with open(item["path"], "rb") as f:
+                        source = f.read()
+                batch.append((item["seq"], source, item["filename"]))
+            except Exception as e:
+                results.append((item["seq"], _rejected(item["filename"], str(e))["result"]))
+
+        if batch:
+            outputs = self.process_batch([(source, filename) for _, source, filename in batch])
+            results.extend((seq, output) for (seq, _, _), output in zip(batch, outputs))
+        del batch, series
+
+        self.store.save_results(job_id, results)
+        for path in {item["path"] for item in items}:
+            if self.store.path_in_use(job_id, path):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,237 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownModelError(KeyError):
+    """Raised when a request names a model that is not configured"""
+
+
+def estimate_footprint(model, path: str) -> int:
+    """Bytes held by a loaded model (parameters + buffers, or artifact size)"""
+    try:
+        module = model.model
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        # Exported engines (ONNX/OpenVINO) don't expose torch tensors
+        if os.path.isdir(path):
+            return sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(path) for name in names
+            )
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def parse_model_specs(spec: str, fallback_name: str, fallback_path: str) -> Dict[str, str]:
+    """Parse 'name=path,name=path' (MODEL_REGISTRY) into an ordered dict"""
+    specs = OrderedDict()
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, path = item.split("=", 1)
+            specs[name.strip()] = path.strip()
+    if not specs:
+        specs[fallback_name] = fallback_path
+    return specs
+
+
+# ============================
+# Model Entry
+# ============================
+class ModelEntry:
+    """
+    One loaded version of a named model.
+
+    Requests check an entry out for their whole lifetime. An entry replaced by
+    a hot-swap or evicted by the registry is retired: it stops receiving new
+    requests and is closed once the last in-flight request releases it.
+    """
+
+    def __init__(self, name: str, path: str, version: str, model, footprint_bytes: int,
+                 close=None):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.model = model
+        self.footprint_bytes = footprint_bytes
+        # Ultralytics predictors are not thread-safe: one forward pass at a time
+        self.lock = threading.Lock()
+        # Set by the loader in process serving mode
+        self.pool = None
+        # Load/warm-up phase durations in seconds, filled in by the loader
+        self.timings = {}
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self._close = close
+        self._in_flight = 0
+        self._retired = False
+        self._state_lock = threading.Lock()
+
+    @property
+    def names(self) -> dict:
+        return self.model.names
+
+    def _checkout(self):
+        with self._state_lock:
+            self._in_flight += 1
+            self.last_used = time.time()
+
+    def release(self):
+        with self._state_lock:
+            self._in_flight -= 1
+            should_close = self._retired and self._in_flight == 0
+        if should_close:
+            self._shutdown()
+
+    def retire(self):
+        with self._state_lock:
+            self._retired = True
+            should_close = self._in_flight == 0
+        if should_close:
+            self._shutdown()
+
+    def _shutdown(self):
+        logger.info(f"Unloading model {self.name} (version {self.version})")
+        if self._close is not None:
+            self._close(self)
+        self.model = None
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "version": self.version,
+            "memory_mb": round(self.footprint_bytes / 1024 / 1024, 1),
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "in_flight": self._in_flight,
+            "timings": {phase: round(seconds, 3) for phase, seconds in self.timings.items()},
+        }
+
+
+# ============================
+# Model Registry
+# ============================
+class ModelRegistry:
+    """
+    Named YOLO variants loaded lazily and evicted LRU under a memory budget.
+
+    `loader(name, path)` builds a ModelEntry (load, warm-up). The default
+    model is never evicted. `swap()` loads a new version completely before
+    publishing it, so requests never wait on, or fail because of, a swap.
+    """
+
+    def __init__(self, specs: Dict[str, str], default: str, loader, memory_budget_bytes: int):
+        self.specs = OrderedDict(specs)
+        self.default = default
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries = OrderedDict()   # name -> ModelEntry, least recently used first
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def resolve(self, name: Optional[str]) -> str:
+        name = name or self.default
+        if name not in self.specs:
+            raise UnknownModelError(name)
+        return name
+
+    def try_checkout(self, name: Optional[str] = None) -> Optional[ModelEntry]:
+        """Check out an already loaded model without blocking, else None"""
+        name = self.resolve(name)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                entry._checkout()
+            return entry
+
+    def checkout(self, name: Optional[str] = None) -> ModelEntry:
+        """Check out a model, loading it first if needed (may block for seconds)"""
+        name = self.resolve(name)
+        while True:
+            entry = self.try_checkout(name)
+            if entry is not None:
+                return entry
+            self._load(name)
+
+    def _load(self, name: str):
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        # One loader per name; concurrent callers wait for it instead of loading twice
+        with load_lock:
+            with self._lock:
+                if name in self._entries:
+                    return
+                path = self.specs[name]
+            entry = self.loader(name, path)
+            self._publish(entry)
+
+    def swap(self, name: str, path: Optional[str] = None) -> ModelEntry:
+        """Load a new version of `name` (optionally from a new path) and publish it atomically"""
+        path = path or self.specs.get(name)
+        if path is None:
+            raise UnknownModelError(name)
+        entry = self.loader(name, path)
+        with self._lock:
+            self.specs[name] = path
+        self._publish(entry)
+        logger.info(f"Hot-swapped model {name} to version {entry.version}")
+        return entry
+
+    def _publish(self, entry: ModelEntry):
+        with self._lock:
+            replaced = self._entries.pop(entry.name, None)
+            self._entries[entry.name] = entry
+            evicted = self._evict_over_budget(keep=entry.name)
+        # Retire outside the registry lock: closing may wait on worker processes
+        for old in ([replaced] if replaced is not None else []) + evicted:
+            old.retire()
+
+    def _evict_over_budget(self, keep: str) -> list:
+        evicted = []
+        total = sum(entry.footprint_bytes for entry in self._entries.values())
+        for name in list(self._entries):
+            if total <= self.memory_budget_bytes:
+                break
+            if name in (keep, self.default):
+                continue
+            entry = self._entries.pop(name)
+            total -= entry.footprint_bytes
+            evicted.append(entry)
+            logger.info(f"Evicting model {name} to stay within the memory budget")
+        return evicted
+
+    def worker_stats(self) -> list:
+        """Process-pool stats of every loaded model that has one"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return [
+            {"name": entry.name, "workers": entry.pool.stats()}
+            for entry in entries if entry.pool is not None
+        ]
+
+    def close(self):
+        """Retire every loaded model (server shutdown)"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.retire()
+
+    def info(self) -> dict:
+        with self._lock:
+            loaded = [entry.info() for entry in self._entries.values()]
+            configured = dict(self.specs)
+        return {
+            "default": self.default,
+            "configured": configured,
+            "loaded": loaded,
+            "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 1),
+            "memory_used_mb": round(sum(entry["memory_mb"] for entry in loaded), 1),
+        }
@@ -0,0 +1,378 @@
+"""
+Score a directory or zip/tar archive of scans offline, without the HTTP API.
+
+Files are read, decoded and inferred in a pipeline with bounded queues,
+reusing the backend's model loading and process_images (batched forward
+passes, DICOM frames, tiling). Results go to JSONL or Parquet, and a
+checkpoint of completed files lets an interrupted run resume where it
+stopped. Run from the repository root so the relative MODEL_PATH resolves:
+
+    python backend/score.py /data/studies --output scores.jsonl
+    python backend/score.py studies.tar.gz --output scores.parquet --format parquet --processes 4
+"""
+import os
+import sys
+import json
+import time
+import queue
+import tarfile
+import zipfile
+import argparse
+import threading
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dicom import DICOM_EXTENSIONS  # noqa: E402
+from jobs import IMAGE_EXTENSIONS  # noqa: E402
+
+SCORED_EXTENSIONS = IMAGE_EXTENSIONS + DICOM_EXTENSIONS
+
+
+class WorkItem(NamedTuple):
+    """One image to score: a whole file, or one frame of a DICOM file"""
+    name: str       # path relative to the input, or archive member name
+    source: object  # bytes or DicomSlice
+    parts: int      # images the file expands to (all must finish to checkpoint it)
+
+
+# ============================
+# Input Enumeration
+# ============================
+def is_scored(name: str) -> bool:
+    return name.lower().endswith(SCORED_EXTENSIONS)
+
+def iter_inputs(path: str) -> Iterator[Tuple[str, Union[bytes, str]]]:
+    """
+    (name, source) of every image/DICOM file in a directory or archive, in a stable order.
+
+    Files in a directory are passed by path, so DICOM series are memory-mapped
+    rather than read; archive members are read as bytes.
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                if is_scored(filename):
+                    full = os.path.join(root, filename)
+                    yield os.path.relpath(full, path), full
+    elif path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                if not info.is_dir() and is_scored(info.filename):
+                    yield info.filename, archive.read(info)
+    else:
+        # Tar members are read in stored order (compressed tars can't seek)
+        with tarfile.open(path, mode="r:*") as archive:
+            for info in archive:
+                if info.isfile() and is_scored(info.name):
+                    yield info.name, archive.extractfile(info).read()
+
+
+# ============================
+# Output Writers
+# ============================
+class JsonlWriter:
+    """Appends one JSON line per result"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "ab")
+        self._buffer = []
+
+    def write(self, records: List[dict]):
+        self._buffer.extend(records)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def flush(self):
+        from encoding import encode_json
+        self._file.write(b"".join(encode_json(record) + b"\n" for record in self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes a Parquet dataset directory, one part file per flush"""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Parquet output requires pyarrow (pip install pyarrow)")
+        self._pa, self._pq = pa, pq
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        detection = pa.struct([
+            ("class_id", pa.int32()),
+            ("class_name", pa.string()),
+            ("confidence", pa.float32()),
+            ("bbox_xyxy", pa.list_(pa.float32())),
+        ])
+        self.schema = pa.schema([
+            ("filename", pa.string()),
+            ("slice_index", pa.int32()),
+            ("status", pa.string()),
+            ("error", pa.string()),
+            ("width", pa.int32()),
+            ("height", pa.int32()),
+            ("model_version", pa.string()),
+            ("detection_count", pa.int32()),
+            ("detections", pa.list_(detection)),
+        ])
+        self._buffer = []
+
+    def write(self, records: List[dict]):
+        for record in records:
+            size = record.get("image_size") or {}
+            self._buffer.append({
+                "filename": record["filename"],
+                "slice_index": record.get("slice_index"),
+                "status": record["status"],
+                "error": record.get("error"),
+                "width": size.get("width"),
+                "height": size.get("height"),
+                "model_version": record.get("model_version"),
+                "detection_count": record["detection_count"],
+                "detections": record["detections"],
+            })
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        table = self._pa.Table.from_pylist(self._buffer, schema=self.schema)
+        part = os.path.join(self.path, f"part-{time.time_ns()}.parquet")
+        self._pq.write_table(table, part + ".tmp")
+        os.replace(part + ".tmp", part)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+
+class Checkpoint:
+    """Names of fully scored input files, one per line, appended after their results"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def add(self, names: List[str]):
+        if names:
+            self._file.write("".join(f"{name}\n" for name in names))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.done.update(names)
+
+    def close(self):
+        self._file.close()
+
+
+# ============================
+# Pipeline
+# ============================
+def read_stage(backend, path: str, done: set, work: queue.Queue, results: queue.Queue,
+               stats: dict):
+    """Read files, expand DICOM series into frames and feed the bounded work queue"""
+    try:
+        inputs = iter_inputs(path)
+        while True:
+            with backend.STAGE_LATENCY.time(stage="file_read"):
+                entry = next(inputs, None)
+            if entry is None:
+                break
+            name, data = entry
+            if name in done:
+                stats["skipped"] += 1
+                continue
+
+            failed = []
+            # Offline scoring has no per-request frame limit: long series are scored whole
+            sources = backend.expand_upload(data, name, failed, max_frames=None)
+            del data
+            if not sources:
+                reason = failed[0]["reason"] if failed else "No images in file"
+                error = backend.build_error(name, ValueError(reason))
+                results.put([(WorkItem(name, None, 1), error)])
+                continue
+            for source in sources:
+                work.put(WorkItem(name, source, len(sources)))
+    finally:
+        work.put(None)
+
+def infer_stage(backend, work: queue.Queue, results: queue.Queue, batch_size: int,
+                model_name: Optional[str], thresholds, tiling):
+    """Collect up to batch_size images from the queue and score them in one call"""
+    try:
+        while True:
+            item = work.get()
+            if item is None:
+                work.put(None)  # let the other workers see the end too
+                break
+            batch = [item]
+            while len(batch) < batch_size:
+                try:
+                    item = work.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    work.put(None)
+                    break
+                batch.append(item)
+
+            outputs = backend.process_images(
+                [(item.source, item.name) for item in batch], model_name, thresholds, tiling
+            )
+            results.put(list(zip(batch, outputs)))
+    finally:
+        results.put(None)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="Directory, .zip or .tar[.gz|.bz2|.xz] archive")
+    parser.add_argument("--output", required=True, help="JSONL file or Parquet dataset directory")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default=None,
+                        help="Defaults from the output extension")
+    parser.add_argument("--checkpoint", help="Completed-files list (default: <output>.done)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Images per model call")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Decode/dispatch threads (default: 2, or --processes)")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Inference worker processes (SERVING_MODE=process); 0 = in-process")
+    parser.add_argument("--queue-size", type=int, default=64, help="Images read ahead of inference")
+    parser.add_argument("--flush-every", type=int, default=256, help="Results per output flush")
+    parser.add_argument("--engine", default=None, help="Inference engine (INFERENCE_ENGINE)")
+    parser.add_argument("--model", default=None, help="Registered model name")
+    parser.add_argument("--conf", type=float, default=None)
+    parser.add_argument("--iou", type=float, default=None)
+    parser.add_argument("--max-det", type=int, default=None)
+    parser.add_argument("--tiled", action="store_true", help="Tile large images")
+    parser.add_argument("--report", help="Also write the final report as JSON here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    workers = args.workers or max(2, args.processes)
+
+    # The backend reads its configuration at import time
+    os.environ["MAX_BATCH_SIZE"] = str(args.batch_size)
+    if args.processes:
+        os.environ["SERVING_MODE"] = "process"
+        os.environ["INFERENCE_PROCESSES"] = str(args.processes)
+    if args.engine:
+        os.environ["INFERENCE_ENGINE"] = args.engine
+
+    import backend
+
+    start = time.perf_counter()
+    backend.load_model()
+    load_seconds = time.perf_counter() - start
+    thresholds = backend.make_thresholds(args.conf, args.iou, args.max_det)
+    tiling = backend.tiling_for(True if args.tiled else None)
+
+    writer = ParquetWriter(args.output) if output_format == "parquet" else JsonlWriter(args.output)
+    checkpoint = Checkpoint(args.checkpoint or args.output.rstrip("/") + ".done")
+    if checkpoint.done:
+        print(f"Resuming: {len(checkpoint.done)} file(s) already scored")
+
+    work = queue.Queue(maxsize=args.queue_size)
+    results = queue.Queue(maxsize=workers * 4)
+    stats = {"skipped": 0}
+    threads = [threading.Thread(
+        target=read_stage, args=(backend, args.input, checkpoint.done, work, results, stats),
+        name="score-reader", daemon=True,
+    )] + [threading.Thread(
+        target=infer_stage,
+        args=(backend, work, results, args.batch_size, args.model, thresholds, tiling),
+        name=f"score-worker-{i}", daemon=True,
+    ) for i in range(workers)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    # Rows of a multi-frame file are held back until every frame is scored, so a
+    # flush (or an interrupt) never writes part of a file the resumed run redoes
+    partial = {}
+    completed = []
+    images = errors = files = 0
+    finished_workers = 0
+    try:
+        while finished_workers < workers:
+            batch = results.get()
+            if batch is None:
+                finished_workers += 1
+                continue
+            for item, output in batch:
+                images += 1
+                errors += output["status"] != "success"
+                rows = partial.setdefault(item.name, [])
+                rows.append(dict(output, filename=item.name))
+                if len(rows) == item.parts:
+                    writer.write(partial.pop(item.name))
+                    completed.append(item.name)
+            if len(writer) >= args.flush_every:
+                # Results are durable before their files are marked done
+                writer.flush()
+                checkpoint.add(completed)
+                files += len(completed)
+                completed = []
+    except KeyboardInterrupt:
+        print("Interrupted; saving progress (rerun the same command to resume)")
+    finally:
+        writer.close()
+        checkpoint.add(completed)
+        files += len(completed)
+        checkpoint.close()
+        backend.model_registry.close()
+
+    elapsed = time.perf_counter() - started
+    stages = {
+        stage: {"total_s": round(total, 3), "mean_ms": round(total / count * 1000, 3), "count": count}
+        for (stage,), (count, total) in sorted(backend.STAGE_LATENCY.totals().items()) if count
+    }
+    report = {
+        "input": args.input,
+        "output": args.output,
+        "files": files,
+        "files_skipped": stats["skipped"],
+        "images": images,
+        "errors": errors,
+        "model_load_s": round(load_seconds, 3),
+        "elapsed_s": round(elapsed, 3),
+        "images_per_sec": round(images / elapsed, 2) if elapsed else 0.0,
+        "batch_size": args.batch_size,
+        "workers": workers,
+        "processes": args.processes,
+        "stages": stages,
+    }
+
+    print(f"Scored {images} image(s) from {files} file(s) in {elapsed:.1f}s "
+          f"({report['images_per_sec']} img/s), {errors} error(s), "
+          f"{stats['skipped']} file(s) skipped from the checkpoint")
+    print(f"{'stage':>14} | {'total s':>8} | {'mean ms':>8} | {'count':>7}")
+    for stage, timing in stages.items():
+        print(f"{stage:>14} | {timing['total_s']:>8.2f} | {timing['mean_ms']:>8.2f} | {timing['count']:>7}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Filtering cached raw detections matches running the model at the request's thresholds"""
+import numpy as np
+import pytest
+
+from detections import Detections, Thresholds, class_offsets, filter_detections, nms
+
+# Stand-ins for the backend defaults: raw detections are kept from this floor up
+CONFIDENCE_FLOOR = 0.05
+INFERENCE_IOU = 0.7
+MAX_DETECTIONS = 300
+
+
+def candidates(count: int, seed: int) -> Detections:
+    """Pre-NMS candidate boxes, clustered so that many of them overlap"""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(50, 450, (count // 4 + 1, 2))[rng.integers(0, count // 4 + 1, count)]
+    centers += rng.normal(0, 8, (count, 2))
+    sizes = rng.uniform(20, 60, (count, 2))
+    xyxy = np.hstack([centers - sizes / 2, centers + sizes / 2]).astype(np.float32)
+    conf = rng.uniform(0.0, 1.0, count).astype(np.float32)
+    cls = rng.integers(0, 3, count).astype(np.int32)
+    return Detections(xyxy, conf, cls)
+
+
+def run_model(boxes: Detections, conf: float, iou: float, max_det: int) -> Detections:
+    """What the model returns at these settings: conf cut, class-aware NMS, top max_det"""
+    mask = boxes.conf >= conf
+    xyxy, scores, cls = boxes.xyxy[mask], boxes.conf[mask], boxes.cls[mask]
+    keep = nms(xyxy + class_offsets(xyxy, cls), scores, iou)[:max_det] if len(scores) else np.zeros(0, int)
+    return Detections(xyxy[keep], scores[keep], cls[keep])
+
+
+def raw(boxes: Detections) -> Detections:
+    """What the backend caches: one pass at the floor"""
+    return run_model(boxes, CONFIDENCE_FLOOR, INFERENCE_IOU, MAX_DETECTIONS)
+
+
+def assert_same(a: Detections, b: Detections):
+    assert a.xyxy.tolist() == b.xyxy.tolist()
+    assert a.conf.tolist() == b.conf.tolist()
+    assert a.cls.tolist() == b.cls.tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("conf", [CONFIDENCE_FLOOR, 0.25, 0.5, 0.8, 0.99])
+def test_conf_cut_matches_a_run_at_that_conf(seed, conf):
+    boxes = candidates(200, seed)
+    filtered = filter_detections(raw(boxes), Thresholds(conf, None, MAX_DETECTIONS))
+    assert_same(filtered, run_model(boxes, conf, INFERENCE_IOU, MAX_DETECTIONS))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_det", [1, 3, 10])
+def test_max_det_keeps_the_most_confident(seed, max_det):
+    boxes = candidates(200, seed)
+    filtered = filter_detections(raw(boxes), Thresholds(0.25, None, max_det))
+    assert len(filtered.conf) == max_det
+    assert_same(filtered, run_model(boxes, 0.25, INFERENCE_IOU, max_det))
+
+
+def test_lower_iou_re_runs_nms_per_class():
+    xyxy = np.array([[0, 0, 100, 100], [10, 0, 110, 100], [10, 0, 110, 100], [300, 300, 350, 350]], np.float32)
+    cached = Detections(xyxy, np.array([0.9, 0.8, 0.7, 0.6], np.float32), np.array([0, 0, 1, 0], np.int32))
+    # IoU of the first two boxes is 0.82: both survive 0.9, the second goes at 0.5
+    assert len(filter_detections(cached, Thresholds(0.5, 0.9, MAX_DETECTIONS)).conf) == 4
+    filtered = filter_detections(cached, Thresholds(0.5, 0.5, MAX_DETECTIONS))
+    # The class-1 box overlaps too, but NMS never suppresses across classes
+    assert filtered.conf.tolist() == pytest.approx([0.9, 0.7, 0.6])
+
+
+@pytest.mark.parametrize("iou", [0.3, 0.5])
+def test_lower_iou_matches_a_run_at_that_iou_without_chains(iou):
+    # Well-separated clusters: every suppressed box overlaps its cluster's best box most
+    xyxy = np.array([
+        [0, 0, 100, 100], [5, 5, 105, 105], [20, 20, 120, 120],
+        [300, 300, 360, 360], [310, 300, 370, 360],
+    ], np.float32)
+    boxes = Detections(xyxy, np.array([0.9, 0.8, 0.6, 0.7, 0.5], np.float32), np.zeros(5, np.int32))
+    filtered = filter_detections(raw(boxes), Thresholds(0.25, iou, MAX_DETECTIONS))
+    assert_same(filtered, run_model(boxes, 0.25, iou, MAX_DETECTIONS))
+
+
+@pytest.mark.xfail(strict=True, reason="a box dropped at INFERENCE_IOU cannot come back at a lower iou")
+def test_lower_iou_chain_differs_from_a_run_at_that_iou():
+    # A-B overlap 0.6, B-C 0.8, A-C barely: at 0.7 C is dropped by B; at 0.5 B goes and C would stay
+    xyxy = np.array([[0, 0, 100, 100], [25, 0, 125, 100], [35, 0, 135, 100]], np.float32)
+    boxes = Detections(xyxy, np.array([0.9, 0.8, 0.7], np.float32), np.zeros(3, np.int32))
+    filtered = filter_detections(raw(boxes), Thresholds(0.25, 0.5, MAX_DETECTIONS))
+    assert_same(filtered, run_model(boxes, 0.25, 0.5, MAX_DETECTIONS))
+
+
+def test_floor_boundary():
+    xyxy = np.array([[0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50]], np.float32)
+    cached = Detections(xyxy, np.array([CONFIDENCE_FLOOR, 0.051, 0.8], np.float32), np.zeros(3, np.int32))
+    # The floor itself is inclusive: a request at the floor gets every cached box
+    assert len(filter_detections(cached, Thresholds(CONFIDENCE_FLOOR, None, MAX_DETECTIONS)).conf) == 3
+    # Just above it, boxes at the floor go and everything above stays
+    assert filter_detections(cached, Thresholds(0.0505, None, MAX_DETECTIONS)).conf.tolist() == pytest.approx([0.8, 0.051])
+    assert filter_detections(cached, Thresholds(0.8, None, MAX_DETECTIONS)).conf.tolist() == pytest.approx([0.8])
+
+
+def test_empty_detections():
+    empty = Detections(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32))
+    assert len(filter_detections(empty, Thresholds(0.5, 0.5, 10)).conf) == 0
@@ -0,0 +1,95 @@
+"""DICOM ingestion against synthetic series written with pydicom (no PACS needed)"""
+import io
+
+import numpy as np
+import pytest
+
+pydicom = pytest.importorskip("pydicom")
+
+from pydicom.dataset import FileDataset, FileMetaDataset  # noqa: E402
+from pydicom.uid import (  # noqa: E402
+    ExplicitVRLittleEndian, ImplicitVRLittleEndian, MRImageStorage, generate_uid,
+)
+
+from dicom import DicomSeries, DicomSlice, frame_count, is_dicom, window_frames  # noqa: E402
+
+
+def make_volume(frames: int, rows: int, columns: int) -> np.ndarray:
+    rng = np.random.default_rng(frames * rows + columns)
+    return rng.integers(0, 4096, (frames, rows, columns)).astype("<u2")
+
+
+def write_series(target, volume: np.ndarray, syntax=ExplicitVRLittleEndian, **attributes):
+    """Write a multi-frame MR file to a path or file object"""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = MRImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = syntax
+
+    ds = FileDataset("synthetic.dcm", {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = MRImageStorage
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Modality = "MR"
+    ds.NumberOfFrames, ds.Rows, ds.Columns = volume.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 12
+    ds.HighBit = 11
+    ds.PixelRepresentation = 0
+    for name, value in attributes.items():
+        setattr(ds, name, value)
+    ds.PixelData = volume.tobytes()
+    ds.save_as(target, enforce_file_format=True)
+
+
+def series_bytes(volume: np.ndarray, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    write_series(buffer, volume, **kwargs)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("syntax", [ExplicitVRLittleEndian, ImplicitVRLittleEndian])
+def test_file_frames_are_memory_mapped(tmp_path, syntax):
+    volume = make_volume(6, 40, 48)
+    path = str(tmp_path / "series.dcm")
+    write_series(path, volume, syntax=syntax)
+
+    series = DicomSeries(path)
+    assert isinstance(series._frames, np.memmap)
+    assert len(series) == frame_count(path) == 6
+    for index in range(len(series)):
+        np.testing.assert_array_equal(series.frame(index), volume[index])
+
+
+def test_upload_bytes_are_viewed_in_place():
+    volume = make_volume(3, 32, 32)
+    data = series_bytes(volume)
+    assert is_dicom(data)
+
+    series = DicomSeries(data)
+    assert series._frames is not None and not series._frames.flags.owndata
+    np.testing.assert_array_equal(series.frame(2), volume[2])
+    np.testing.assert_array_equal(DicomSlice(series, 1).pixels(), volume[1])
+
+
+def test_decode_windows_and_sizes_each_slice():
+    volume = make_volume(2, 100, 200)
+    series = DicomSeries(series_bytes(volume, WindowCenter=2048, WindowWidth=4096))
+    assert series.window[:2] == (2048.0, 4096.0)
+
+    decoded = DicomSlice(series, 1).decode(target_size=50)
+    assert decoded.original_size == (200, 100)
+    assert decoded.array.shape == (25, 50, 3)
+    assert decoded.scale == (4.0, 4.0)
+
+
+def test_window_frames_maps_to_uint8():
+    frames = np.array([[[0, 1000], [2000, 4000]]], dtype=np.uint16)
+    windowed = window_frames(frames, center=1000, width=2000)
+    np.testing.assert_array_equal(windowed, [[[0, 127], [255, 255]]])
+    np.testing.assert_array_equal(window_frames(frames, None, None, invert=True)[0, 0], [255, 192])
+
+
+def test_not_dicom():
+    assert not is_dicom(b"\xff\xd8\xff" + b"\0" * 200)
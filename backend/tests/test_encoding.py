@@ -0,0 +1,36 @@
+"""Response encodings decode with stock msgpack settings"""
+import numpy as np
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+from encoding import COLUMNAR, MSGPACK, encode, negotiate_format  # noqa: E402
+
+PAYLOAD = {
+    "results": [
+        {
+            "image_id": "0",
+            "filename": "scan.jpg",
+            "detections": [
+                {"bbox_xyxy": [1.0, 2.0, 3.0, 4.0], "confidence": 0.9, "class_id": 1, "class_name": "tumor"},
+                {"bbox_xyxy": [5.0, 6.0, 7.0, 8.0], "confidence": 0.7, "class_id": 0, "class_name": "no_tumor"},
+            ],
+        }
+    ]
+}
+
+
+def test_columnar_unpacks_with_strict_map_keys():
+    body = msgpack.unpackb(encode(PAYLOAD, COLUMNAR))
+    result = body["results"][0]
+    boxes = np.frombuffer(result["boxes"], dtype="<f4").reshape(-1, 4)
+    class_ids = np.frombuffer(result["class_id"], dtype="<i4")
+    assert boxes.tolist() == [[1, 2, 3, 4], [5, 6, 7, 8]]
+    assert [body["class_names"][str(c)] for c in class_ids] == ["tumor", "no_tumor"]
+    assert "image_id" not in result
+
+
+def test_negotiate_format():
+    assert negotiate_format("application/x-msgpack") == MSGPACK
+    assert negotiate_format(COLUMNAR) == COLUMNAR
+    assert negotiate_format("*/*") == "application/json"
@@ -0,0 +1,43 @@
+"""ONNX export gives the same detections as the PyTorch model (needs the weights)"""
+import os
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_PATH = os.path.join(REPO_ROOT, "backend", "models", "model_yolov8s.pt")
+TEST_IMAGE = os.path.join(REPO_ROOT, "notebook-test", "test-image.jpg")
+
+# Same boxes (matched by IoU), same classes and close confidences
+CONF = 0.25
+MIN_IOU = 0.9
+MAX_CONF_DIFF = 0.05
+
+pytest.importorskip("ultralytics")
+pytest.importorskip("onnxruntime")
+pytestmark = pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="model weights not present")
+
+from PIL import Image  # noqa: E402
+
+from cache import file_fingerprint  # noqa: E402
+from detections import from_result, pairwise_iou  # noqa: E402
+from engines import load_engine  # noqa: E402
+
+
+def predict(engine: str, cache_dir: str):
+    model = load_engine(MODEL_PATH, engine, cache_dir=cache_dir, model_version=file_fingerprint(MODEL_PATH))
+    image = Image.open(TEST_IMAGE).convert("RGB")
+    return from_result(model([image], conf=CONF, verbose=False)[0])
+
+
+def test_onnx_matches_torch(tmp_path):
+    reference = predict("torch", str(tmp_path))
+    candidate = predict("onnx", str(tmp_path))
+
+    assert len(candidate.conf) == len(reference.conf)
+    if not len(reference.conf):
+        return
+    ious = pairwise_iou(reference.xyxy, candidate.xyxy)
+    best = ious.argmax(axis=1)
+    assert (ious[range(len(best)), best] >= MIN_IOU).all()
+    assert (candidate.cls[best] == reference.cls).all()
+    assert abs(candidate.conf[best] - reference.conf).max() <= MAX_CONF_DIFF
@@ -0,0 +1,48 @@
+"""Tile layout, config validation and cross-tile merging (no model needed)"""
+import numpy as np
+import pytest
+
+from detections import Detections
+from tiling import TileConfig, fit_to_budget, merge_tiles, tile_grid
+
+
+def detections(*boxes, conf=0.9, cls=0) -> Detections:
+    xyxy = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    return Detections(xyxy, np.full(len(xyxy), conf, np.float32), np.full(len(xyxy), cls, np.int32))
+
+
+@pytest.mark.parametrize("fields", [
+    dict(tile_size=640, overlap=640, max_tiles=16),
+    dict(tile_size=640, overlap=-1, max_tiles=16),
+    dict(tile_size=640, overlap=128, max_tiles=0),
+    dict(tile_size=0, overlap=0, max_tiles=16),
+])
+def test_invalid_config_is_rejected(fields):
+    with pytest.raises(ValueError):
+        TileConfig(min_side=1280, **fields).validate()
+
+
+def test_budget_and_grid():
+    config = TileConfig(640, 128, 4, 1280).validate()
+    side = fit_to_budget(4000, 4000, config)
+    origins = tile_grid(side, side, config)
+    assert 0 < side < 4000 and len(origins) <= config.max_tiles
+    assert fit_to_budget(1000, 1000, config) == 0
+
+
+def test_seam_stub_is_merged_into_full_box():
+    # Two tiles side by side; the lesion spans x 600..700 across their seam
+    origins = np.array([[0, 0], [512, 0]])
+    stub = detections([600, 100, 640, 160], conf=0.95)
+    full = detections([88, 100, 188, 160], conf=0.9)
+    merged = merge_tiles([stub, full], origins, 640, 0.7)
+    assert merged.xyxy.tolist() == [[600, 100, 700, 160]]
+
+
+def test_box_on_image_border_and_other_classes_survive():
+    origins = np.array([[0, 0], [512, 0]])
+    stub = detections([600, 100, 640, 160], cls=1)
+    # The full box is another class, and the second box ends on the image border (x 1152)
+    right = detections([88, 100, 188, 160], [560, 0, 640, 50])
+    merged = merge_tiles([stub, right], origins, 640, 0.7)
+    assert len(merged.conf) == 3
@@ -0,0 +1,111 @@
+"""Linking per-slice boxes into lesions and summarizing their 3D extent"""
+import numpy as np
+import pytest
+
+from volume import SliceDetections, aggregate_volume, link_slices, summarize_lesions
+
+NAMES = {0: "tumor", 1: "cyst"}
+
+
+def series(*boxes) -> SliceDetections:
+    """`boxes` are (slice_index, (x1, y1, x2, y2), conf, class_id) tuples"""
+    slice_index, xyxy, conf, cls = zip(*boxes)
+    return SliceDetections(
+        np.asarray(slice_index, dtype=np.int64),
+        np.asarray(xyxy, dtype=np.float32),
+        np.asarray(conf, dtype=np.float32),
+        np.asarray(cls, dtype=np.int32),
+    )
+
+
+def test_links_across_a_skipped_slice():
+    detections = series(
+        (3, (10, 10, 50, 50), 0.9, 0),
+        (5, (12, 10, 52, 50), 0.8, 0),   # slice 4 has no detection
+    )
+    labels = link_slices(detections, max_skip=1)
+    assert labels[0] == labels[1]
+    # Without skipping, the gap splits the lesion
+    labels = link_slices(detections, max_skip=0)
+    assert labels[0] != labels[1]
+
+
+def test_links_past_an_unrelated_box_on_the_skipped_slice():
+    detections = series(
+        (3, (10, 10, 50, 50), 0.9, 0),
+        (4, (200, 200, 240, 240), 0.7, 0),
+        (5, (12, 10, 52, 50), 0.8, 0),
+    )
+    labels = link_slices(detections, max_skip=1)
+    assert labels[0] == labels[2] != labels[1]
+
+
+def test_non_overlapping_boxes_on_adjacent_slices_stay_separate():
+    detections = series(
+        (0, (10, 10, 50, 50), 0.9, 0),
+        (1, (60, 60, 100, 100), 0.9, 0),
+        (2, (10, 10, 50, 50), 0.9, 1),   # same place, other class
+    )
+    labels = link_slices(detections, max_skip=0)
+    assert len(set(labels.tolist())) == 3
+
+
+def test_below_iou_threshold_stays_separate():
+    # IoU of these two boxes is 1/3
+    detections = series((0, (0, 0, 40, 40), 0.9, 0), (1, (20, 0, 60, 40), 0.9, 0))
+    labels = link_slices(detections, iou_threshold=0.3)
+    assert labels[0] == labels[1]
+    labels = link_slices(detections, iou_threshold=0.4)
+    assert labels[0] != labels[1]
+
+
+def test_summary_reports_slice_range_and_peak_confidence():
+    detections = series(
+        (7, (10, 10, 50, 50), 0.6, 0),
+        (7, (14, 12, 48, 49), 0.5, 0),   # a second box on the same slice
+        (8, (11, 9, 51, 52), 0.95, 0),
+        (9, (12, 10, 52, 50), 0.7, 0),
+        (2, (300, 300, 340, 340), 0.99, 1),
+    )
+    lesions = summarize_lesions(detections, link_slices(detections), NAMES)
+    assert [lesion["class_name"] for lesion in lesions] == ["cyst", "tumor"]
+
+    tumor = lesions[1]
+    assert (tumor["slice_start"], tumor["slice_end"]) == (7, 9)
+    assert tumor["num_slices"] == 3
+    assert tumor["num_detections"] == 4
+    assert tumor["peak_slice"] == 8
+    assert tumor["max_confidence"] == pytest.approx(0.95)
+    assert tumor["mean_confidence"] == pytest.approx((0.6 + 0.95 + 0.7 + 0.5) / 4)
+    assert tumor["bbox_xyxy"] == [10.0, 9.0, 52.0, 52.0]
+
+    cyst = lesions[0]
+    assert (cyst["slice_start"], cyst["slice_end"], cyst["peak_slice"]) == (2, 2, 2)
+
+
+def test_min_slices_drops_single_slice_findings():
+    detections = series((0, (10, 10, 50, 50), 0.9, 0), (1, (10, 10, 50, 50), 0.8, 0),
+                        (5, (200, 200, 240, 240), 0.99, 0))
+    lesions = summarize_lesions(detections, link_slices(detections), NAMES, min_slices=2)
+    assert [(lesion["slice_start"], lesion["slice_end"]) for lesion in lesions] == [(0, 1)]
+
+
+def test_aggregate_volume_groups_dicom_frames_per_file():
+    def frame(filename, slice_index, bbox, conf):
+        detection = {"bbox_xyxy": bbox, "confidence": conf, "class_id": 0, "class_name": "tumor"}
+        return {"filename": filename, "slice_index": slice_index, "status": "success", "detections": [detection]}
+
+    results = [
+        frame("a.dcm", 0, [10, 10, 50, 50], 0.9),
+        frame("a.dcm", 1, [10, 10, 50, 50], 0.8),
+        frame("b.dcm", 0, [10, 10, 50, 50], 0.7),
+    ]
+    lesions = aggregate_volume(results)
+    assert [(lesion["series"], lesion["num_slices"]) for lesion in lesions] == [("a.dcm", 2), ("b.dcm", 1)]
+    assert [lesion["lesion_id"] for lesion in lesions] == [0, 1]
+
+
+def test_empty_series():
+    empty = series((0, (0, 0, 1, 1), 0.5, 0))
+    empty = SliceDetections(*(array[:0] for array in empty))
+    assert summarize_lesions(empty, link_slices(empty), NAMES) == []
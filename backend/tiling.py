@@ -0,0 +1,147 @@
+import io
+import math
+from typing import List, NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from decoding import DecodedImage, decode_to_array
+from detections import Detections, class_offsets, matrix_nms
+
+
+class TileConfig(NamedTuple):
+    """How large images are split for tiled inference"""
+    tile_size: int   # side of each square tile, in decoded pixels
+    overlap: int     # minimum pixels shared by neighbouring tiles
+    max_tiles: int   # budget per image; larger images are downscaled until they fit
+    min_side: int    # images whose long side is at most this are not tiled
+
+    def validate(self) -> "TileConfig":
+        """Return the config, or raise ValueError if it cannot produce a tile grid"""
+        if self.tile_size < 1:
+            raise ValueError(f"tile_size must be at least 1, got {self.tile_size}")
+        if not 0 <= self.overlap < self.tile_size:
+            raise ValueError(
+                f"overlap must be at least 0 and smaller than tile_size ({self.tile_size}), got {self.overlap}"
+            )
+        if self.max_tiles < 1:
+            raise ValueError(f"max_tiles must be at least 1, got {self.max_tiles}")
+        return self
+
+
+# A box within this many pixels of a tile edge that another tile overlaps may be cut off
+SEAM_MARGIN = 2
+# A cut-off box is a duplicate if this share of it lies inside a larger box from another tile
+SEAM_COVERAGE = 0.7
+
+
+# ============================
+# Tile Layout
+# ============================
+def tiles_along(length: int, tile_size: int, overlap: int) -> int:
+    """Tiles needed to cover `length` pixels with at least `overlap` shared"""
+    if length <= tile_size:
+        return 1
+    return math.ceil((length - overlap) / (tile_size - overlap))
+
+def tile_grid(width: int, height: int, config: TileConfig) -> np.ndarray:
+    """(T, 2) x, y origins of evenly spaced tiles; edge tiles end on the border"""
+    axes = []
+    for length in (width, height):
+        count = tiles_along(length, config.tile_size, config.overlap)
+        axes.append(np.round(np.linspace(0, max(length - config.tile_size, 0), count)).astype(np.int64))
+    xs, ys = np.meshgrid(*axes)
+    return np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+def fit_to_budget(width: int, height: int, config: TileConfig) -> int:
+    """Long side to decode at so the grid stays within max_tiles (0 = full size)"""
+    scale = 1.0
+    while (tiles_along(int(width * scale), config.tile_size, config.overlap)
+           * tiles_along(int(height * scale), config.tile_size, config.overlap)) > config.max_tiles:
+        scale *= 0.9
+    return 0 if scale == 1.0 else int(max(width, height) * scale)
+
+
+# ============================
+# Split & Merge
+# ============================
+def decode_tiled(image_bytes: bytes, config: TileConfig, fallback_size: int) -> DecodedImage:
+    """
+    Decode an image for tiled inference, or whole if it is small enough.
+
+    Large images are decoded at full resolution (or as close to it as the
+    tile budget allows) and carry their tile origins; the rest are decoded
+    to `fallback_size` as usual.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        width, height = image.size
+    if max(width, height) <= config.min_side:
+        return decode_to_array(image_bytes, fallback_size)
+
+    decoded = decode_to_array(image_bytes, fit_to_budget(width, height, config))
+    height, width = decoded.array.shape[:2]
+    return decoded._replace(tile_origins=tile_grid(width, height, config))
+
+def split_tiles(image: DecodedImage, tile_size: int) -> List[np.ndarray]:
+    """Crop the tiles of a tiled image (contiguous copies, ready for the model)"""
+    return [
+        np.ascontiguousarray(image.array[y:y + tile_size, x:x + tile_size])
+        for x, y in image.tile_origins.tolist()
+    ]
+
+def clipped_at_seam(xyxy: np.ndarray, origins: np.ndarray, tile_size: int) -> np.ndarray:
+    """
+    Mask of (N, 4) tile-local boxes that touch an edge shared with another tile.
+
+    `origins` holds each box's tile origin. Edges on the image border are not
+    seams: a box there really ends where the image does.
+    """
+    extent = origins.max(axis=0) + tile_size
+    near_start = (xyxy[:, :2] <= SEAM_MARGIN) & (origins > 0)
+    near_end = (xyxy[:, 2:] >= tile_size - SEAM_MARGIN) & (origins + tile_size < extent)
+    return (near_start | near_end).any(axis=1)
+
+def merge_tiles(results: List[Detections], origins: np.ndarray, tile_size: int, iou: float) -> Detections:
+    """
+    Shift per-tile detections into image coordinates and drop cross-tile duplicates.
+
+    Objects in an overlap are found by several tiles. A box cut off at a seam
+    overlaps the full box from the neighbouring tile too little for IoU to
+    catch (a 40px stub of a 100px lesion has IoU 0.4), so boxes touching a
+    seam are first dropped when they lie mostly inside a larger box from
+    another tile. One class-aware matrix NMS over the rest keeps the most
+    confident of each remaining duplicate.
+    """
+    counts = [len(result.conf) for result in results]
+    if not sum(counts):
+        return Detections(
+            np.zeros((0, 4), dtype=np.float32),
+            np.zeros(0, dtype=np.float32),
+            np.zeros(0, dtype=np.int32),
+        )
+
+    box_origins = np.repeat(origins, counts, axis=0)
+    local = np.concatenate([result.xyxy for result in results])
+    xyxy = local + np.tile(box_origins, 2).astype(np.float32)
+    conf = np.concatenate([result.conf for result in results])
+    cls = np.concatenate([result.cls for result in results])
+    shifted = xyxy + class_offsets(xyxy, cls)
+
+    candidates = np.flatnonzero(clipped_at_seam(local, box_origins, tile_size))
+    keep = np.ones(len(conf), dtype=bool)
+    if len(candidates):
+        tile = np.repeat(np.arange(len(counts)), counts)
+        area = np.prod(xyxy[:, 2:] - xyxy[:, :2], axis=1)
+        top_left = np.maximum(shifted[candidates, None, :2], shifted[None, :, :2])
+        bottom_right = np.minimum(shifted[candidates, None, 2:], shifted[None, :, 2:])
+        inside = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+        covered = (
+            (inside > SEAM_COVERAGE * np.maximum(area[candidates, None], 1e-9))
+            & (area[None, :] > area[candidates, None])
+            & (tile[None, :] != tile[candidates, None])
+        ).any(axis=1)
+        keep[candidates[covered]] = False
+
+    kept = np.flatnonzero(keep)
+    kept = kept[matrix_nms(shifted[kept], conf[kept], iou)]
+    return Detections(xyxy[kept], conf[kept], cls[kept])
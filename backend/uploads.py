@@ -0,0 +1,77 @@
+import os
+import tempfile
+from typing import List
+
+from fastapi import UploadFile
+
+# Read uploads in 1MB chunks so oversized files are rejected early
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised as soon as an upload is known to exceed the size limit"""
+
+
+# ============================
+# Chunked Upload Reading
+# ============================
+async def read_upload(file: UploadFile, max_bytes: int,
+                      chunk_size: int = UPLOAD_CHUNK_SIZE) -> bytes:
+    """
+    Read an upload in chunks, stopping as soon as it passes `max_bytes`.
+
+    The multipart parser has already spooled large parts to a temporary file,
+    so the declared size lets most oversized files be rejected without
+    reading a single byte into memory.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"File size exceeds {max_bytes // (1024 * 1024)}MB")
+
+    chunks = []
+    total = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLargeError(f"File size exceeds {max_bytes // (1024 * 1024)}MB")
+        chunks.append(chunk)
+
+    return b"".join(chunks)
+
+async def spool_to_file(file: UploadFile, max_bytes: int, suffix: str = "",
+                        chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """
+    Copy an upload to a named temporary file in chunks and return its path.
+
+    Large DICOM series are memory-mapped from this file instead of being held
+    in memory. The caller removes it (see remove_files) once it is done.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"File size exceeds {max_bytes // (1024 * 1024)}MB")
+
+    total = 0
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as out:
+        try:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadTooLargeError(f"File size exceeds {max_bytes // (1024 * 1024)}MB")
+                out.write(chunk)
+        except BaseException:
+            out.close()
+            os.remove(out.name)
+            raise
+    return out.name
+
+def remove_files(paths: List[str]):
+    """Delete spooled files; memory-mapped views of them stay valid until released"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from detections import pairwise_iou
+
+
+class SliceDetections(NamedTuple):
+    """All detections of one series as flat arrays, one row per box"""
+    slice_index: np.ndarray   # (N,) int64
+    xyxy: np.ndarray          # (N, 4) float32
+    conf: np.ndarray          # (N,) float32
+    cls: np.ndarray           # (N,) int32
+
+
+# ============================
+# Flattening
+# ============================
+def flatten(results: List[dict], positions: List[int]) -> SliceDetections:
+    """Per-slice result dicts (successful ones) to arrays; `positions` are their slice numbers"""
+    counts = [len(r["detections"]) if r.get("status") == "success" else 0 for r in results]
+    detections = [d for r, count in zip(results, counts) if count for d in r["detections"]]
+    return SliceDetections(
+        np.repeat(np.asarray(positions, dtype=np.int64), counts),
+        np.asarray([d["bbox_xyxy"] for d in detections], dtype=np.float32).reshape(-1, 4),
+        np.asarray([d["confidence"] for d in detections], dtype=np.float32),
+        np.asarray([d["class_id"] for d in detections], dtype=np.int32),
+    )
+
+
+# ============================
+# Linking
+# ============================
+def _components(count: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Connected-component label per node (union-find, near-linear in edges)"""
+    parent = list(range(count))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a, b in zip(sources.tolist(), targets.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    _, labels = np.unique([find(node) for node in range(count)], return_inverse=True)
+    return labels
+
+def link_slices(detections: SliceDetections, iou_threshold: float = 0.3,
+                max_skip: int = 1) -> np.ndarray:
+    """
+    Label each box with the lesion it belongs to.
+
+    Every box is linked to its best-overlapping box of the same class on each
+    of the next `max_skip + 1` slices that have detections, when their IoU
+    reaches `iou_threshold`. Only neighbouring slices are compared, so the
+    work grows with the number of slices, not with its square.
+    """
+    count = len(detections.conf)
+    if not count:
+        return np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(detections.slice_index, kind="stable")
+    slices = detections.slice_index[order]
+    xyxy = detections.xyxy[order]
+    cls = detections.cls[order]
+    positions, starts = np.unique(slices, return_index=True)
+    ends = np.r_[starts[1:], count]
+
+    sources, targets = [], []
+    for k in range(len(positions)):
+        here = np.arange(starts[k], ends[k])
+        for j in range(k + 1, len(positions)):
+            if positions[j] - positions[k] > max_skip + 1:
+                break
+            there = np.arange(starts[j], ends[j])
+            ious = pairwise_iou(xyxy[here], xyxy[there])
+            ious[cls[here][:, None] != cls[there][None, :]] = 0.0
+            best = ious.argmax(axis=1)
+            linked = ious[np.arange(len(here)), best] >= iou_threshold
+            sources.append(here[linked])
+            targets.append(there[best[linked]])
+
+    labels_sorted = _components(
+        count,
+        np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64),
+        np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64),
+    )
+    labels = np.empty(count, dtype=np.int64)
+    labels[order] = labels_sorted
+    return labels
+
+
+# ============================
+# Lesion Summaries
+# ============================
+def summarize_lesions(detections: SliceDetections, labels: np.ndarray, names: Dict[int, str],
+                      min_slices: int = 1) -> List[dict]:
+    """3D extent and confidence of each linked group, most confident first"""
+    if not len(labels):
+        return []
+
+    # Group by lesion, most confident box first within each group
+    order = np.lexsort((-detections.conf, labels))
+    grouped = labels[order]
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    counts = np.diff(np.r_[starts, len(grouped)])
+    slices = detections.slice_index[order]
+    xyxy = detections.xyxy[order]
+    conf = detections.conf[order]
+
+    # Distinct slices per lesion (a lesion may have two boxes on one slice)
+    stride = int(slices.max()) + 1
+    pairs = np.unique(grouped * stride + slices)
+    slice_counts = np.bincount(pairs // stride, minlength=len(starts))[grouped[starts]]
+
+    first = np.minimum.reduceat(slices, starts)
+    last = np.maximum.reduceat(slices, starts)
+    x1 = np.minimum.reduceat(xyxy[:, 0], starts)
+    y1 = np.minimum.reduceat(xyxy[:, 1], starts)
+    x2 = np.maximum.reduceat(xyxy[:, 2], starts)
+    y2 = np.maximum.reduceat(xyxy[:, 3], starts)
+    mean_conf = np.add.reduceat(conf, starts) / counts
+    class_ids = detections.cls[order][starts]
+
+    lesions = [
+        {
+            "class_id": int(class_id),
+            "class_name": names.get(int(class_id), str(class_id)),
+            "slice_start": int(z0),
+            "slice_end": int(z1),
+            "num_slices": int(n_slices),
+            "num_detections": int(n_boxes),
+            "peak_slice": int(peak),
+            "max_confidence": float(max_conf),
+            "mean_confidence": float(mean),
+            "bbox_xyxy": [float(a), float(b), float(c), float(d)],
+        }
+        for class_id, z0, z1, n_slices, n_boxes, peak, max_conf, mean, a, b, c, d in zip(
+            class_ids, first, last, slice_counts, counts, slices[starts], conf[starts],
+            mean_conf, x1, y1, x2, y2,
+        )
+        if n_slices >= min_slices
+    ]
+    lesions.sort(key=lambda lesion: -lesion["max_confidence"])
+    return lesions
+
+
+def aggregate_volume(results: List[dict], iou_threshold: float = 0.3, max_skip: int = 1,
+                     min_slices: int = 1, min_confidence: float = 0.0) -> List[dict]:
+    """
+    Link per-slice results into per-lesion findings.
+
+    Results with a `slice_index` (DICOM frames) are grouped per file; other
+    results form one series ordered by their `index` (submission order), so
+    a zip of slice images is treated as one volume.
+    """
+    series = OrderedDict()
+    names = {}
+    for position, result in enumerate(results):
+        if "slice_index" in result:
+            key, slice_number = result["filename"], result["slice_index"]
+        else:
+            key, slice_number = None, result.get("index", position)
+        series.setdefault(key, ([], []))
+        series[key][0].append(result)
+        series[key][1].append(slice_number)
+        for detection in result.get("detections", []):
+            names[detection["class_id"]] = detection["class_name"]
+
+    lesions = []
+    for key, (series_results, positions) in series.items():
+        detections = flatten(series_results, positions)
+        if min_confidence > 0:
+            keep = detections.conf >= min_confidence
+            detections = SliceDetections(*(array[keep] for array in detections))
+        labels = link_slices(detections, iou_threshold, max_skip)
+        for lesion in summarize_lesions(detections, labels, names, min_slices):
+            lesions.append({"series": key, **lesion})
+
+    for lesion_id, lesion in enumerate(lesions):
+        lesion["lesion_id"] = lesion_id
+    return lesions
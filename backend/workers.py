@@ -0,0 +1,204 @@
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+
+from detections import Detections, from_result
+
+logger = logging.getLogger(__name__)
+
+
+# ============================
+# Worker Process
+# ============================
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to the parent's buffer without making this process its owner"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # Python < 3.13 registers attached segments for cleanup too, which
+        # would unlink the parent's buffer when this worker exits
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+def _worker_main(worker_id: int, model, conn, shm_name: str, predict_args: dict,
+                 warmup_shape: tuple, torch_threads: int):
+    """
+    Inference loop of one worker process.
+
+    The model object was loaded by the parent before fork, so its weights are
+    shared copy-on-write. Images arrive in the shared-memory buffer; only
+    their offsets/shapes and the small detection arrays cross the pipe.
+    """
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    shm = _attach_shared_memory(shm_name)
+
+    start = time.perf_counter()
+    model([np.zeros(warmup_shape, dtype=np.uint8)], verbose=False, **predict_args)
+    conn.send(("ready", time.perf_counter() - start))
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+
+        layouts, inline_images = message
+        images = inline_images or [
+            np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+            for offset, shape in layouts
+        ]
+        try:
+            results = model(images, verbose=False, **predict_args)
+            conn.send(("ok", [tuple(from_result(result)) for result in results]))
+        except Exception as e:
+            conn.send(("error", f"worker {worker_id}: {e}"))
+        finally:
+            # Views into the buffer must not outlive this request
+            del images
+
+    shm.close()
+
+
+# ============================
+# Process Worker Pool
+# ============================
+class _WorkerHandle:
+    """Parent-side end of one worker: its process, pipe and input buffer"""
+
+    def __init__(self, worker_id: int, process, conn, shm: shared_memory.SharedMemory):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.shm = shm
+
+
+class ProcessWorkerPool:
+    """
+    Dispatch decoded images to N inference processes forked after model load.
+
+    Each worker owns one shared-memory input buffer large enough for a full
+    batch at the decode size. A batch is copied into an idle worker's buffer
+    once and read there in place; arrays that don't fit (e.g. full-resolution
+    decoding) fall back to being pickled through the pipe.
+    """
+
+    def __init__(self, model, num_workers: int, max_batch_size: int, image_side: int,
+                 predict_args: dict, torch_threads: int = 1):
+        self.model = model
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.image_side = image_side
+        # Keyword arguments of every forward pass (conf, iou, max_det)
+        self.predict_args = dict(predict_args)
+        self.torch_threads = torch_threads
+        self.buffer_bytes = max_batch_size * image_side * image_side * 3
+        self.warmup_seconds = {}
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        # Fork (not spawn) is what lets workers share the loaded weights
+        self._context = multiprocessing.get_context("fork")
+
+    def start(self):
+        """Fork the workers and wait until each has warmed up"""
+        for worker_id in range(self.num_workers):
+            handle = self._spawn(worker_id)
+            self._workers.append(handle)
+            self._idle.put(handle)
+        logger.info(
+            f"Started {self.num_workers} inference worker process(es), "
+            f"{self.buffer_bytes / 1024 / 1024:.1f} MB shared buffer each"
+        )
+
+    def _spawn(self, worker_id: int) -> _WorkerHandle:
+        shm = shared_memory.SharedMemory(create=True, size=self.buffer_bytes)
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.model, child_conn, shm.name, self.predict_args,
+                  (self.image_side, self.image_side, 3), self.torch_threads),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        status, seconds = parent_conn.recv()
+        self.warmup_seconds[worker_id] = seconds
+        return _WorkerHandle(worker_id, process, parent_conn, shm)
+
+    def _respawn(self, handle: _WorkerHandle) -> _WorkerHandle:
+        logger.error(f"Inference worker {handle.worker_id} died; restarting it")
+        handle.process.join(timeout=1)
+        handle.shm.close()
+        handle.shm.unlink()
+        replacement = self._spawn(handle.worker_id)
+        with self._lock:
+            self._workers[self._workers.index(handle)] = replacement
+        return replacement
+
+    def _pack(self, handle: _WorkerHandle, images: List[np.ndarray]) -> tuple:
+        """Copy images into the worker's buffer; returns (layouts, inline images)"""
+        if sum(image.nbytes for image in images) > self.buffer_bytes:
+            return [], images
+
+        layouts = []
+        offset = 0
+        for image in images:
+            view = np.ndarray(image.shape, dtype=np.uint8, buffer=handle.shm.buf, offset=offset)
+            view[...] = image
+            layouts.append((offset, image.shape))
+            offset += image.nbytes
+        return layouts, []
+
+    def infer(self, images: List[np.ndarray]) -> List[Detections]:
+        """Run one batch on the next idle worker (blocking; call from a thread)"""
+        handle = self._idle.get()
+        try:
+            handle.conn.send(self._pack(handle, images))
+            status, payload = handle.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            handle = self._respawn(handle)
+            raise RuntimeError("Inference worker crashed while processing the batch")
+        finally:
+            self._idle.put(handle)
+
+        if status != "ok":
+            raise RuntimeError(payload)
+        return [Detections(*arrays) for arrays in payload]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.num_workers,
+            "idle": self._idle.qsize(),
+            "buffer_mb": round(self.buffer_bytes / 1024 / 1024, 2),
+            "warmup_seconds": {
+                worker_id: round(seconds, 3) for worker_id, seconds in self.warmup_seconds.items()
+            },
+        }
+
+    def shutdown(self):
+        for handle in self._workers:
+            try:
+                handle.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for handle in self._workers:
+            handle.process.join(timeout=5)
+            if handle.process.is_alive():
+                handle.process.terminate()
+            handle.shm.close()
+            handle.shm.unlink()
+        self._workers = []
@@ -0,0 +1,91 @@
+"""
+Compare the NumPy overlay renderer with per-detection PIL drawing.
+
+For each detection count, synthetic scans are annotated with draw_bboxes
+(copy + one rectangle/textbbox/text call set per box) and with
+draw_overlay. The table reports the median time per image (label masks
+are cached after the first run, as on a Streamlit rerun) and the mean
+absolute pixel difference between the two outputs, which should be 0.
+The last rows time a whole batch through annotate_batch, serially and on
+a process pool.
+
+    python frontend/benchmarks/bench_overlay.py --detections 1 10 100 1000 --side 1024
+    python frontend/benchmarks/bench_overlay.py --batch 64 --processes 4
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from overlay import annotate_batch, draw_overlay  # noqa: E402
+from rendering import draw_bboxes, encode_jpeg  # noqa: E402
+
+
+def make_scan(side: int, seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    pixels = np.clip(rng.normal(60, 20, (side, side)), 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels).convert("RGB")
+
+
+def make_detections(count: int, side: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0, side * 0.9, (count, 2))
+    sizes = rng.uniform(side * 0.02, side * 0.1, (count, 2))
+    return [
+        {"class_name": "tumor", "confidence": float(conf), "bbox_xyxy": [*corner, *(corner + size)]}
+        for corner, size, conf in zip(corners, sizes, rng.uniform(0.3, 1.0, count))
+    ]
+
+
+def median_ms(func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--detections", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--side", type=int, default=1024)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=32, help="Images per annotate_batch run")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    image = make_scan(args.side)
+    print(f"{'boxes':>6} | {'PIL ms':>8} | {'numpy ms':>8} | {'speedup':>7} | {'mean |diff|':>11}")
+    for count in args.detections:
+        detections = make_detections(count, args.side)
+        pil_ms = median_ms(lambda: draw_bboxes(image.copy(), detections, args.threshold), args.repeats)
+        numpy_ms = median_ms(lambda: draw_overlay(image, detections, args.threshold), args.repeats)
+
+        reference = np.asarray(draw_bboxes(image.copy(), detections, args.threshold), dtype=np.int16)
+        diff = np.abs(reference - draw_overlay(image, detections, args.threshold)).mean()
+        print(f"{count:>6} | {pil_ms:>8.2f} | {numpy_ms:>8.2f} | {pil_ms / numpy_ms:>6.1f}x | {diff:>11.3f}")
+
+    # Whole batches: decode, annotate and encode, as for a report
+    items = [
+        (encode_jpeg(make_scan(args.side, seed), quality=95), make_detections(20, args.side, seed))
+        for seed in range(args.batch)
+    ]
+    print(f"\nBatch of {args.batch} images ({args.side}px, 20 boxes each):")
+    for processes in (0, args.processes):
+        start = time.perf_counter()
+        annotate_batch(items, args.threshold, processes=processes)
+        elapsed = time.perf_counter() - start
+        label = "serial" if not processes else f"{processes} processes"
+        print(f"{label:>14}: {elapsed:6.2f}s ({args.batch / elapsed:6.1f} img/s)")
+
+
+if __name__ == "__main__":
+    main()
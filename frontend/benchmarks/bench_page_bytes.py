@@ -0,0 +1,90 @@
+"""
+Measure image bytes sent to the browser per results page, full-size vs. display-size.
+
+Synthetic scans with a few boxes each are rendered the way the results page
+does it: the boxed image plus up to three zoomed regions per result. The
+full-size path models the previous behaviour (full-resolution PIL images,
+which Streamlit encodes as quality-100 JPEG); the display path downscales
+before drawing and encodes at display quality.
+
+    python frontend/benchmarks/bench_page_bytes.py --sides 1024 2048 4096 --page-size 5
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rendering import crop_zoom, draw_bboxes, encode_jpeg, fit_to_display, scale_detections  # noqa: E402
+
+# Streamlit's encoding of PIL images passed to st.image
+STREAMLIT_JPEG_QUALITY = 100
+
+
+def make_scan(side: int, seed: int) -> tuple:
+    """A scan look-alike and a few detections on it"""
+    rng = np.random.default_rng(seed)
+    y, x = np.ogrid[0:side, 0:side]
+    head = ((y - side / 2) / (side * 0.42)) ** 2 + ((x - side / 2) / (side * 0.36)) ** 2 <= 1
+    pixels = np.clip(rng.normal(40, 15, (side, side)) + head * 90, 0, 255).astype(np.uint8)
+    image = Image.fromarray(pixels).convert("RGB")
+
+    detections = []
+    for _ in range(int(rng.integers(1, 4))):
+        corner = rng.uniform(0.2, 0.6, 2) * side
+        size = rng.uniform(0.05, 0.15) * side
+        detections.append({
+            "class_name": "tumor",
+            "confidence": float(rng.uniform(0.5, 0.99)),
+            "bbox_xyxy": [*corner, *(corner + size)],
+        })
+    return image, detections
+
+
+def full_size(image, detections) -> list:
+    boxed = draw_bboxes(image.copy(), detections, 0.0)
+    crops = [crop_zoom(image, d["bbox_xyxy"]) for d in detections[:3]]
+    return [encode_jpeg(img, quality=STREAMLIT_JPEG_QUALITY) for img in [boxed] + crops]
+
+
+def display_size(image, detections, max_side: int, zoom_side: int) -> list:
+    small, scale = fit_to_display(image, max_side)
+    boxed = draw_bboxes(small.copy(), scale_detections(detections, scale), 0.0)
+    crops = [fit_to_display(crop_zoom(image, d["bbox_xyxy"]), zoom_side)[0] for d in detections[:3]]
+    return [encode_jpeg(img) for img in [boxed] + crops]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sides", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument("--page-size", type=int, default=5, help="Results per page")
+    parser.add_argument("--max-side", type=int, default=800, help="DISPLAY_MAX_SIDE")
+    parser.add_argument("--zoom-side", type=int, default=320, help="ZOOM_MAX_SIDE")
+    args = parser.parse_args()
+
+    print(f"{'side':>5} | {'full KB/page':>12} | {'full ms':>8} | "
+          f"{'display KB/page':>15} | {'display ms':>10} | {'ratio':>6}")
+    for side in args.sides:
+        scans = [make_scan(side, seed) for seed in range(args.page_size)]
+
+        start = time.perf_counter()
+        full = sum(len(data) for image, dets in scans for data in full_size(image, dets))
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        small = sum(
+            len(data) for image, dets in scans
+            for data in display_size(image, dets, args.max_side, args.zoom_side)
+        )
+        small_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{side:>5} | {full / 1024:>12.0f} | {full_ms:>8.0f} | "
+              f"{small / 1024:>15.0f} | {small_ms:>10.0f} | {full / small:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
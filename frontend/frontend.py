@@ -165,10 +165,20 @@
 
 import streamlit as st
 import requests
-from PIL import Image, ImageDraw, ImageFont
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PIL import Image
 import io
-import pandas as pd
+import os
+import math
 import time
+import hashlib
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from overlay import draw_overlay
+from rendering import crop_zoom, encode_jpeg, fit_to_display, scale_detections
+from result_store import ResultStore
 
 # ==========================
 # App Configuration
@@ -180,6 +190,31 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ==========================
+# Upload Settings
+# ==========================
+# Files per /predict request (the backend accepts at most 20) and requests in flight
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", "4"))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "60"))
+
+# Display-size images, thumbnails and drawn overlays kept across reruns (keyed by file hash)
+IMAGE_CACHE_ENTRIES = int(os.getenv("IMAGE_CACHE_ENTRIES", "64"))
+OVERLAY_CACHE_ENTRIES = int(os.getenv("OVERLAY_CACHE_ENTRIES", "128"))
+# Full-resolution images (zoom crops, the full-resolution toggle) are large; keep few, briefly
+FULL_IMAGE_CACHE_ENTRIES = int(os.getenv("FULL_IMAGE_CACHE_ENTRIES", "4"))
+FULL_IMAGE_CACHE_TTL = int(os.getenv("FULL_IMAGE_CACHE_TTL", "300"))
+THUMBNAIL_SIZE = 256
+
+# Images are sent to the browser at display size; full resolution only on request
+DISPLAY_MAX_SIDE = int(os.getenv("DISPLAY_MAX_SIDE", "800"))
+ZOOM_MAX_SIDE = int(os.getenv("ZOOM_MAX_SIDE", "320"))
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "5"))
+
+# Results persisted across sessions, keyed by image hash and model version
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "./frontend_results.db")
+HISTORY_PAGE_SIZE = 10
+
 # ==========================
 # Custom CSS Styling
 # ==========================
@@ -279,12 +314,24 @@ st.markdown("""
 # ==========================
 # Session State Initialization
 # ==========================
-if 'results_history' not in st.session_state:
-    st.session_state.results_history = []
 if 'total_processed' not in st.session_state:
     st.session_state.total_processed = 0
 if 'total_detections' not in st.session_state:
     st.session_state.total_detections = 0
+if 'file_digests' not in st.session_state:
+    st.session_state.file_digests = {}
+if 'api_results' not in st.session_state:
+    st.session_state.api_results = {}
+
+# ==========================
+# Result Store
+# ==========================
+@st.cache_resource
+def get_result_store(db_path):
+    """One SQLite store per app process, shared by all sessions"""
+    return ResultStore(db_path)
+
+result_store = get_result_store(RESULT_STORE_PATH)
 
 # ==========================
 # Header
@@ -334,11 +381,13 @@ with st.sidebar:
     st.subheader("📊 Session Statistics")
     st.metric("Images Processed", st.session_state.total_processed)
     st.metric("Tumors Detected", st.session_state.total_detections)
+    st.caption(f"🗂️ {result_store.count()} result(s) stored across sessions")
+    show_history = st.checkbox("Show Result History", value=False)
     
     if st.button("🗑️ Clear History"):
-        st.session_state.results_history = []
         st.session_state.total_processed = 0
         st.session_state.total_detections = 0
+        st.session_state.api_results = {}
         st.rerun()
     
     st.divider()
@@ -403,6 +452,84 @@ with col4:
 
 st.markdown("<br>", unsafe_allow_html=True)
 
+# ==========================
+# Helper Functions: Caching
+# ==========================
+def file_digest(uploaded_file):
+    """Content hash of an upload, computed once per file per session"""
+    key = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    if key not in st.session_state.file_digests:
+        st.session_state.file_digests[key] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return st.session_state.file_digests[key]
+
+# cache_resource hands back the same object without copying; callers must not mutate it.
+# Arguments starting with "_" are not hashed: the digest already identifies the bytes.
+@st.cache_resource(max_entries=FULL_IMAGE_CACHE_ENTRIES, ttl=FULL_IMAGE_CACHE_TTL, show_spinner=False)
+def load_image(digest, _data):
+    """Decoded full-resolution RGB image"""
+    return Image.open(io.BytesIO(_data)).convert("RGB")
+
+@st.cache_resource(max_entries=IMAGE_CACHE_ENTRIES, show_spinner=False)
+def load_display_image(digest, _data, max_side=DISPLAY_MAX_SIDE):
+    """Display-size RGB image and its scale, decoded at reduced scale where the format allows it"""
+    image = Image.open(io.BytesIO(_data))
+    scale = min(1.0, max_side / max(image.size))
+    image.draft("RGB", (max_side, max_side))
+    image, _ = fit_to_display(image.convert("RGB"), max_side)
+    return image, scale
+
+@st.cache_resource(max_entries=IMAGE_CACHE_ENTRIES, show_spinner=False)
+def load_thumbnail(digest, _data, max_side=THUMBNAIL_SIZE):
+    """Small preview, decoded at reduced scale where the format allows it"""
+    image = Image.open(io.BytesIO(_data))
+    image.draft("RGB", (max_side, max_side))
+    image = image.convert("RGB")
+    image.thumbnail((max_side, max_side))
+    return image
+
+def thumbnail_jpeg(digest, data):
+    """Preview thumbnail as JPEG bytes, for previews and the result store"""
+    return encode_jpeg(load_thumbnail(digest, data), quality=80)
+
+@st.cache_resource(max_entries=IMAGE_CACHE_ENTRIES, show_spinner=False)
+def display_jpeg(digest, _data, max_side=DISPLAY_MAX_SIDE):
+    """The image without boxes, downscaled and encoded for display"""
+    image, _ = load_display_image(digest, _data, max_side)
+    return encode_jpeg(image)
+
+@st.cache_resource(max_entries=OVERLAY_CACHE_ENTRIES, show_spinner=False)
+def render_overlay(digest, model_version, confidence_threshold, _data, _detections,
+                   max_side=DISPLAY_MAX_SIDE):
+    """The image with its boxes drawn at this threshold, as display JPEG bytes"""
+    if max_side:
+        # Boxes are drawn on the downscaled copy, so lines and labels stay legible
+        image, scale = load_display_image(digest, _data, max_side)
+        detections = scale_detections(_detections, scale)
+    else:
+        image = load_image(digest, _data)
+        detections = _detections
+    return encode_jpeg(Image.fromarray(draw_overlay(image, detections, confidence_threshold)))
+
+@st.cache_resource(max_entries=OVERLAY_CACHE_ENTRIES, show_spinner=False)
+def zoom_jpeg(digest, bbox, _data, max_side=ZOOM_MAX_SIDE):
+    """A detection's region cut from the full-resolution image, sized for display"""
+    image, _ = fit_to_display(crop_zoom(load_image(digest, _data), bbox), max_side)
+    return encode_jpeg(image)
+
+def send_image(data, caption, meter):
+    """st.image for encoded bytes, counting what is sent to the browser"""
+    st.image(data, caption=caption, use_column_width=True)
+    meter["images"] += 1
+    meter["bytes"] += len(data)
+
+def new_meter():
+    return {"images": 0, "bytes": 0}
+
+def report_meter(meter, label):
+    """Caption with the image payload of this page"""
+    if meter["images"]:
+        st.caption(f"📦 {label}: {meter['images']} image(s), {meter['bytes'] / 1024:.0f} KB sent")
+
 # ==========================
 # File Upload Section
 # ==========================
@@ -423,80 +550,14 @@ if uploaded_files:
     if len(uploaded_files) <= 5:
         st.markdown("**Preview:**")
         cols = st.columns(min(len(uploaded_files), 5))
+        preview_meter = new_meter()
         for idx, (col, file) in enumerate(zip(cols, uploaded_files)):
             with col:
-                img = Image.open(file)
-                st.image(img, caption=file.name, use_column_width=True)
+                send_image(thumbnail_jpeg(file_digest(file), file.getvalue()), file.name, preview_meter)
 
 # ==========================
 # Helper Functions
 # ==========================
-def draw_bboxes(image, detections, confidence_threshold=0.5):
-    """Draw bounding boxes with improved styling"""
-    draw = ImageDraw.Draw(image, "RGBA")
-
-    for det in detections:
-        if det['confidence'] < confidence_threshold:
-            continue
-            
-        x1, y1, x2, y2 = map(int, det["bbox_xyxy"])
-        label = f"{det['class_name']}"
-        confidence = f"{det['confidence']:.1%}"
-
-        # Color based on confidence
-        if det['confidence'] >= 0.8:
-            box_color = (255, 0, 0, 255)      # Red - High confidence
-            fill_color = (255, 0, 0, 40)
-        elif det['confidence'] >= 0.6:
-            box_color = (255, 165, 0, 255)    # Orange - Medium confidence
-            fill_color = (255, 165, 0, 40)
-        else:
-            box_color = (255, 255, 0, 255)    # Yellow - Low confidence
-            fill_color = (255, 255, 0, 40)
-
-        # Draw bounding box
-        draw.rectangle(
-            [(x1, y1), (x2, y2)],
-            fill=fill_color,
-            outline=box_color,
-            width=4
-        )
-
-        # Label with confidence
-        label_text = f"{label} {confidence}"
-        
-        # Calculate text size
-        text_bbox = draw.textbbox((x1, y1), label_text)
-        text_w = text_bbox[2] - text_bbox[0]
-        text_h = text_bbox[3] - text_bbox[1]
-
-        # Draw label background
-        draw.rectangle(
-            [(x1, y1 - text_h - 8), (x1 + text_w + 12, y1)],
-            fill=(0, 0, 0, 220)
-        )
-
-        # Draw label text
-        draw.text(
-            (x1 + 6, y1 - text_h - 6),
-            label_text,
-            fill=(255, 255, 255, 255)
-        )
-
-    return image
-
-def crop_zoom(image, bbox, padding=50):
-    """Crop and zoom into detected region"""
-    x1, y1, x2, y2 = map(int, bbox)
-    w, h = image.size
-
-    x1 = max(0, x1 - padding)
-    y1 = max(0, y1 - padding)
-    x2 = min(w, x2 + padding)
-    y2 = min(h, y2 + padding)
-
-    return image.crop((x1, y1, x2, y2))
-
 def get_detection_summary(detections, confidence_threshold):
     """Generate detection summary"""
     filtered = [d for d in detections if d['confidence'] >= confidence_threshold]
@@ -507,6 +568,169 @@ def get_detection_summary(detections, confidence_threshold):
     avg_conf = sum(d['confidence'] for d in filtered) / len(filtered)
     return f"{len(filtered)} tumor(s) detected (avg. confidence: {avg_conf:.1%})", "positive"
 
+def render_result(idx, result, digest, image_bytes, confidence_threshold, show_zoom, show_details,
+                  meter):
+    """Render one image's detections, or its error, from cached image work"""
+    st.markdown(f"### 📷 Image {idx + 1}: {result['filename']}")
+    
+    if result.get("status") == "error":
+        st.error(f"❌ Could not process this image: {result.get('error', 'unknown error')}")
+        st.markdown("---")
+        return
+    
+    # Get detection summary
+    summary, status = get_detection_summary(
+        result["detections"],
+        confidence_threshold
+    )
+    
+    # Status badge
+    badge_class = "badge-positive" if status == "positive" else "badge-negative"
+    st.markdown(
+        f'<span class="detection-badge {badge_class}">{summary}</span>',
+        unsafe_allow_html=True
+    )
+    
+    if result["detections"]:
+        # Filter by confidence
+        filtered_detections = [
+            d for d in result["detections"]
+            if d['confidence'] >= confidence_threshold
+        ]
+        
+        if filtered_detections:
+            # Full resolution is only encoded and sent when asked for
+            full_resolution = st.toggle("Full resolution", key=f"full_{idx}_{digest}")
+            
+            # Draw bounding boxes (cached per threshold)
+            image_with_boxes = render_overlay(
+                digest,
+                result.get("model_version"),
+                confidence_threshold,
+                image_bytes,
+                result["detections"],
+                max_side=None if full_resolution else DISPLAY_MAX_SIDE
+            )
+            
+            if show_zoom:
+                col1, col2 = st.columns([2, 1])
+                
+                with col1:
+                    send_image(image_with_boxes, "🔍 Detection Result (Full Image)", meter)
+                
+                with col2:
+                    for det_idx, det in enumerate(filtered_detections[:3]):
+                        zoom_img = zoom_jpeg(digest, tuple(det["bbox_xyxy"]), image_bytes)
+                        send_image(
+                            zoom_img,
+                            f"Tumor #{det_idx + 1} (Confidence: {det['confidence']:.1%})",
+                            meter
+                        )
+            else:
+                send_image(image_with_boxes, "Detection Result", meter)
+            
+            # Show detection details
+            if show_details:
+                st.markdown("**Detection Details:**")
+                df = pd.DataFrame(filtered_detections)
+                df['confidence'] = df['confidence'].apply(lambda x: f"{x:.2%}")
+                df = df[['class_name', 'confidence', 'bbox_xyxy']]
+                df.columns = ['Class', 'Confidence', 'Bounding Box (x1,y1,x2,y2)']
+                st.dataframe(df, use_container_width=True, hide_index=True)
+        else:
+            send_image(
+                display_jpeg(digest, image_bytes),
+                "No detections above confidence threshold",
+                meter
+            )
+    else:
+        send_image(display_jpeg(digest, image_bytes), "No Tumors Detected", meter)
+    
+    st.markdown("---")
+
+# ==========================
+# Helper Functions: Upload
+# ==========================
+@st.cache_resource
+def get_session(pool_size):
+    """One pooled HTTP session per app process, shared across reruns"""
+    session = requests.Session()
+    # Busy backends answer 503 with Retry-After; connection errors are retried too.
+    # Read timeouts are not: the backend may still be inferring the chunk we'd re-send.
+    retry = Retry(
+        total=3,
+        read=False,
+        status_forcelist=(503,),
+        allowed_methods=frozenset({"POST"}),
+        backoff_factor=0.5,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_model_version(api_url):
+    """Version of the backend's default model, or None if it can't be asked"""
+    info_url = api_url.rsplit("/predict", 1)[0] + "/model/info"
+    try:
+        response = get_session(UPLOAD_CONCURRENCY).get(info_url, timeout=5)
+        response.raise_for_status()
+        return response.json()["model_version"]
+    except (requests.exceptions.RequestException, KeyError, ValueError):
+        return None
+
+def make_chunks(positions, chunk_size):
+    """Upload positions split into requests of at most chunk_size files"""
+    return [positions[start:start + chunk_size] for start in range(0, len(positions), chunk_size)]
+
+def post_chunk(session, api_url, files):
+    """Send one chunk of (name, bytes, type) files to /predict (runs in a worker thread)"""
+    response = session.post(
+        api_url,
+        files=[("files", file) for file in files],
+        # Ask for every detection the model kept (not the backend's 0.80
+        # default): the slider then re-filters cached results locally
+        params={"conf": 0.0},
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+def match_results(chunk, names, payload):
+    """Map a chunk's results back to upload positions; rejected files become errors"""
+    positions = {}
+    for idx in chunk:
+        positions.setdefault(names[idx], []).append(idx)
+    
+    matched = {}
+    for result in payload["results"]:
+        pending = positions.get(result["filename"])
+        if pending:
+            matched[pending.pop(0)] = result
+    for failed in payload.get("failed_files", []):
+        pending = positions.get(failed["filename"])
+        if pending:
+            matched[pending.pop(0)] = {
+                "filename": failed["filename"],
+                "status": "error",
+                "error": failed["reason"],
+                "detections": []
+            }
+    return matched
+
+def describe_error(error):
+    """User-facing message for a failed chunk request"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return "⏱️ Request timed out. Please try again."
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "❌ Failed to connect to backend API. Please check if the server is running."
+    if isinstance(error, requests.exceptions.HTTPError):
+        return f"❌ API Error: {error.response.status_code} - {error.response.text}"
+    return f"❌ An error occurred: {str(error)}"
+
 # ==========================
 # Detection Button
 # ==========================
@@ -524,141 +748,206 @@ else:
 # ==========================
 # Processing & Results
 # ==========================
-if run_detection and uploaded_files:
-    progress_bar = st.progress(0, text="Initializing detection...")
-    
-    with st.spinner("Processing images..."):
-        files = [
-            ("files", (file.name, file.getvalue(), file.type))
-            for file in uploaded_files
+if uploaded_files:
+    names = [file.name for file in uploaded_files]
+    digests = [file_digest(file) for file in uploaded_files]
+    cached_results = st.session_state.api_results
+    # Results stay on screen across reruns (e.g. moving the slider) once known
+    show_results = run_detection or any(digest in cached_results for digest in digests)
+else:
+    show_results = False
+
+if show_results:
+    pending = []
+    if run_detection:
+        model_version = fetch_model_version(API_URL)
+        # Results from another model version are not reused
+        pending = [
+            idx for idx, digest in enumerate(digests)
+            if digest not in cached_results
+            or (model_version and cached_results[digest].get("model_version") != model_version)
         ]
+        if pending and model_version:
+            # Images seen in earlier sessions come from the result store
+            stored = result_store.get_many([digests[idx] for idx in pending], model_version)
+            cached_results.update(stored)
+            pending = [idx for idx in pending if digests[idx] not in stored]
+    
+    # Only images without a known result go to the backend
+    progress_bar = st.progress(0, text=f"Uploading {len(pending)} image(s)...") if pending else None
+    status_box = st.empty()
+    
+    st.markdown("---")
+    st.markdown("## 📊 Detection Results")
+    
+    # Only one page of results is rendered (and sent to the browser) per run
+    result_pages = math.ceil(len(uploaded_files) / RESULTS_PAGE_SIZE)
+    result_page = st.number_input(
+        f"Results page (of {result_pages})",
+        min_value=1,
+        max_value=result_pages,
+        value=1,
+        step=1
+    ) if result_pages > 1 else 1
+    page_start = (result_page - 1) * RESULTS_PAGE_SIZE
+    page_indices = range(page_start, min(page_start + RESULTS_PAGE_SIZE, len(uploaded_files)))
+    
+    # One slot per image keeps upload order while chunks finish in any order
+    slots = {idx: st.container() for idx in page_indices}
+    meter_box = st.empty()
+    results_meter = new_meter()
+    file_bytes = [file.getvalue() for file in uploaded_files]
+    
+    shown = []
+    unanswered = 0
+    
+    def show(idx, result):
+        """Render a result into its slot if it is on the current page"""
+        if idx in slots:
+            with slots[idx]:
+                render_result(
+                    idx,
+                    result,
+                    digests[idx],
+                    file_bytes[idx],
+                    confidence_threshold,
+                    show_zoom,
+                    show_details,
+                    results_meter
+                )
+        shown.append(result)
+    
+    pending_set = set(pending)
+    for idx, digest in enumerate(digests):
+        if digest in cached_results and idx not in pending_set:
+            show(idx, cached_results[digest])
+    
+    if pending:
+        session = get_session(UPLOAD_CONCURRENCY)
+        completed = 0
         
-        progress_bar.progress(30, text="Sending to API...")
-        
-        try:
-            response = requests.post(API_URL, files=files, timeout=60)
-            progress_bar.progress(70, text="Processing results...")
+        with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(
+                    post_chunk,
+                    session,
+                    API_URL,
+                    [(names[idx], file_bytes[idx], uploaded_files[idx].type) for idx in chunk]
+                ): chunk
+                for chunk in make_chunks(pending, UPLOAD_CHUNK_SIZE)
+            }
             
-            if response.status_code == 200:
-                results = response.json()
-                progress_bar.progress(100, text="Complete!")
-                time.sleep(0.5)
-                progress_bar.empty()
+            # Render each chunk's images as soon as its response arrives
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    matched = match_results(chunk, names, future.result())
+                    error_message = "❌ No result returned for this image."
+                except Exception as e:
+                    matched = {}
+                    error_message = describe_error(e)
                 
-                # Update statistics
-                st.session_state.total_processed += results['count']
-                total_det = sum(len(r['detections']) for r in results['results'])
-                st.session_state.total_detections += total_det
-                
-                st.success(f"✅ Successfully processed {results['count']} image(s)")
-                
-                # ==========================
-                # Display Results
-                # ==========================
-                st.markdown("---")
-                st.markdown("## 📊 Detection Results")
-                
-                for idx, result in enumerate(results["results"]):
-                    with st.container():
-                        st.markdown(f"### 📷 Image {idx + 1}: {result['filename']}")
-                        
-                        # Load original image
-                        original_image = Image.open(
-                            io.BytesIO(uploaded_files[idx].getvalue())
-                        ).convert("RGB")
-                        
-                        # Get detection summary
-                        summary, status = get_detection_summary(
-                            result["detections"],
-                            confidence_threshold
+                to_store = []
+                for idx in chunk:
+                    result = matched.get(idx)
+                    if result is None:
+                        if idx in slots:
+                            with slots[idx]:
+                                st.markdown(f"### 📷 Image {idx + 1}: {names[idx]}")
+                                st.error(error_message)
+                                st.markdown("---")
+                        unanswered += 1
+                        continue
+                    if result.get("status") != "error":
+                        cached_results[digests[idx]] = result
+                        to_store.append(
+                            (digests[idx], result, thumbnail_jpeg(digests[idx], file_bytes[idx]))
                         )
-                        
-                        # Status badge
-                        badge_class = "badge-positive" if status == "positive" else "badge-negative"
-                        st.markdown(
-                            f'<span class="detection-badge {badge_class}">{summary}</span>',
-                            unsafe_allow_html=True
-                        )
-                        
-                        if result["detections"]:
-                            # Filter by confidence
-                            filtered_detections = [
-                                d for d in result["detections"]
-                                if d['confidence'] >= confidence_threshold
-                            ]
-                            
-                            if filtered_detections:
-                                # Draw bounding boxes
-                                image_with_boxes = draw_bboxes(
-                                    original_image.copy(),
-                                    result["detections"],
-                                    confidence_threshold
-                                )
-                                
-                                if show_zoom:
-                                    col1, col2 = st.columns([2, 1])
-                                    
-                                    with col1:
-                                        st.image(
-                                            image_with_boxes,
-                                            caption="🔍 Detection Result (Full Image)",
-                                            use_column_width=True
-                                        )
-                                    
-                                    with col2:
-                                        for det_idx, det in enumerate(filtered_detections[:3]):
-                                            zoom_img = crop_zoom(
-                                                original_image,
-                                                det["bbox_xyxy"]
-                                            )
-                                            st.image(
-                                                zoom_img,
-                                                caption=f"Tumor #{det_idx + 1} (Confidence: {det['confidence']:.1%})",
-                                                use_column_width=True
-                                            )
-                                else:
-                                    st.image(
-                                        image_with_boxes,
-                                        caption="Detection Result",
-                                        use_column_width=True
-                                    )
-                                
-                                # Show detection details
-                                if show_details:
-                                    st.markdown("**Detection Details:**")
-                                    df = pd.DataFrame(filtered_detections)
-                                    df['confidence'] = df['confidence'].apply(lambda x: f"{x:.2%}")
-                                    df = df[['class_name', 'confidence', 'bbox_xyxy']]
-                                    df.columns = ['Class', 'Confidence', 'Bounding Box (x1,y1,x2,y2)']
-                                    st.dataframe(df, use_container_width=True, hide_index=True)
-                            else:
-                                st.image(
-                                    original_image,
-                                    caption="No detections above confidence threshold",
-                                    use_column_width=True
-                                )
-                        else:
-                            st.image(
-                                original_image,
-                                caption="No Tumors Detected",
-                                use_column_width=True
-                            )
-                        
-                        st.markdown("---")
-                        
-            else:
-                progress_bar.empty()
-                st.error(f"❌ API Error: {response.status_code} - {response.text}")
+                    show(idx, result)
+                result_store.put_many(to_store)
+                
+                completed += len(chunk)
+                progress_bar.progress(
+                    int(completed / len(pending) * 100),
+                    text=f"Processed {completed}/{len(pending)} image(s)..."
+                )
+        
+        progress_bar.empty()
+    
+    with meter_box:
+        report_meter(results_meter, f"Results page {result_page}")
+    
+    if run_detection:
+        processed = sum(1 for result in shown if result.get("status") != "error")
+        failed = len(shown) - processed + unanswered
+        total_det = sum(
+            1 for result in shown for d in result["detections"]
+            if d['confidence'] >= confidence_threshold
+        )
+        
+        # Update statistics
+        st.session_state.total_processed += processed
+        st.session_state.total_detections += total_det
+        
+        reused = len(uploaded_files) - len(pending)
+        reused_note = f" ({reused} from cache)" if reused else ""
+        if failed:
+            status_box.warning(
+                f"⚠️ Processed {processed} image(s){reused_note}; {failed} could not be processed"
+            )
+        else:
+            status_box.success(f"✅ Successfully processed {processed} image(s){reused_note}")
+
+# ==========================
+# Result History
+# ==========================
+if show_history:
+    st.markdown("---")
+    st.markdown("## 🗂️ Result History")
+    
+    stored_count = result_store.count()
+    if not stored_count:
+        st.info("No stored results yet.")
+    else:
+        # Only one page of rows (with their small thumbnails) is read at a time
+        pages = math.ceil(stored_count / HISTORY_PAGE_SIZE)
+        page = st.number_input(
+            f"Page (of {pages})",
+            min_value=1,
+            max_value=pages,
+            value=1,
+            step=1
+        )
+        
+        history_meter = new_meter()
+        for row in result_store.page(HISTORY_PAGE_SIZE, (page - 1) * HISTORY_PAGE_SIZE):
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                if row["thumbnail"]:
+                    send_image(row["thumbnail"], None, history_meter)
+            with col2:
+                result = row["result"]
+                summary, _ = get_detection_summary(result["detections"], confidence_threshold)
+                stored_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created_at"]))
+                st.markdown(f"**{row['filename']}** · {summary}")
+                st.caption(f"Stored {stored_at} · model {row['model_version']}")
                 
-        except requests.exceptions.Timeout:
-            progress_bar.empty()
-            st.error("⏱️ Request timed out. Please try again.")
-        except requests.exceptions.ConnectionError:
-            progress_bar.empty()
-            st.error("❌ Failed to connect to backend API. Please check if the server is running.")
-        except Exception as e:
-            progress_bar.empty()
-            st.error(f"❌ An error occurred: {str(e)}")
+                filtered_detections = [
+                    d for d in result["detections"]
+                    if d['confidence'] >= confidence_threshold
+                ]
+                if filtered_detections and show_details:
+                    df = pd.DataFrame(filtered_detections)
+                    df['confidence'] = df['confidence'].apply(lambda x: f"{x:.2%}")
+                    df = df[['class_name', 'confidence', 'bbox_xyxy']]
+                    df.columns = ['Class', 'Confidence', 'Bounding Box (x1,y1,x2,y2)']
+                    st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        report_meter(history_meter, f"History page {page}")
+        
+        if st.button("🗑️ Delete Stored Results"):
+            result_store.clear()
+            st.rerun()
 
 # ==========================
 # Footer
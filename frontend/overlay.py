@@ -0,0 +1,133 @@
+import io
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from rendering import encode_jpeg, fit_to_display, scale_detections
+
+# Same scheme as draw_bboxes: yellow < 0.6 <= orange < 0.8 <= red
+CONFIDENCE_BINS = (0.6, 0.8)
+PALETTE = np.array([[255, 255, 0], [255, 165, 0], [255, 0, 0]], dtype=np.int32)
+FILL_ALPHA = 40
+LABEL_ALPHA = 220
+LINE_WIDTH = 4
+
+_FONT = ImageFont.load_default()
+_DRAW = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+# ==========================
+# Label Glyphs
+# ==========================
+@lru_cache(maxsize=4096)
+def _label(text):
+    """
+    Coverage mask of a label as ImageDraw.text renders it, plus its placement.
+
+    Returns (mask, shift_x, shift_y, text_w, text_h): the mask is pasted at
+    (x - shift_x, y - shift_y) for text drawn at (x, y); text_w/text_h are
+    the textbbox size draw_bboxes uses to lay out the tag.
+    """
+    left, top, right, bottom = _DRAW.textbbox((0, 0), text, font=_FONT)
+    shift_x, shift_y = max(-left, 0), max(-top, 0)
+    canvas = Image.new("L", (max(right + shift_x, 1), max(bottom + shift_y, 1)))
+    ImageDraw.Draw(canvas).text((shift_x, shift_y), text, fill=255, font=_FONT)
+    return np.asarray(canvas, dtype=np.int32), shift_x, shift_y, right - left, bottom - top
+
+
+# ==========================
+# Compositing
+# ==========================
+def _blend(region, color, alpha):
+    """Pillow's integer blend of `color` over `region` with 0-255 alpha (in place)"""
+    if region.size == 0:
+        return
+    value = region.astype(np.int32) * (255 - alpha) + color * alpha + 128
+    region[...] = ((value >> 8) + value) >> 8
+
+def _clip(image, x0, y0, x1, y1):
+    """View of the inclusive rectangle, clipped to the image"""
+    height, width = image.shape[:2]
+    return image[max(y0, 0):max(min(y1 + 1, height), 0), max(x0, 0):max(min(x1 + 1, width), 0)]
+
+def _draw_box(image, x1, y1, x2, y2, color, line_width):
+    """Translucent fill and opaque outline, as ImageDraw.rectangle draws them"""
+    w = line_width
+    # The outline covers the fill's border, so only the interior is blended
+    _blend(_clip(image, x1 + w, y1 + w, x2 - w, y2 - w), color, FILL_ALPHA)
+    _clip(image, x1, y1, x2, y1 + w - 1)[...] = color
+    _clip(image, x1, y2 - w + 1, x2, y2)[...] = color
+    # PIL draws each side as a line from row y1 + w towards row y2 - w + 1,
+    # end row excluded; on boxes shorter than 2 * w that line runs upwards
+    start, stop = y1 + w, y2 - w + 1
+    top, bottom = (start, stop - 1) if stop >= start else (stop + 1, start)
+    _clip(image, x1, top, x1 + w - 1, bottom)[...] = color
+    _clip(image, x2 - w + 1, top, x2, bottom)[...] = color
+
+def _draw_label(image, text, x1, y1):
+    """Black translucent tag with white text, laid out like draw_bboxes"""
+    mask, shift_x, shift_y, text_w, text_h = _label(text)
+    _blend(_clip(image, x1, y1 - text_h - 8, x1 + text_w + 12, y1), 0, LABEL_ALPHA)
+
+    # White text: the glyph coverage is the blend alpha of every pixel
+    x0, y0 = x1 + 6 - shift_x, y1 - text_h - 6 - shift_y
+    height, width = image.shape[:2]
+    mh, mw = mask.shape
+    top, left = max(y0, 0), max(x0, 0)
+    bottom, right = min(y0 + mh, height), min(x0 + mw, width)
+    if top >= bottom or left >= right:
+        return
+    coverage = mask[top - y0:bottom - y0, left - x0:right - x0, None]
+    _blend(image[top:bottom, left:right], 255, coverage)
+
+def draw_overlay(image, detections, confidence_threshold=0.5, line_width=LINE_WIDTH):
+    """
+    Annotated copy of an RGB image (array or PIL), pixel-identical to draw_bboxes.
+
+    Each box touches only its own slices of one array copy, with Pillow's
+    blending arithmetic; label masks are rendered once per distinct label.
+    """
+    out = np.array(image, dtype=np.uint8)
+    for det in detections:
+        if det['confidence'] < confidence_threshold:
+            continue
+        x1, y1, x2, y2 = map(int, det["bbox_xyxy"])
+        if x2 < x1 or y2 < y1:
+            continue
+        color = PALETTE[np.searchsorted(CONFIDENCE_BINS, det['confidence'], side="right")]
+        _draw_box(out, x1, y1, x2, y2, color, line_width)
+        _draw_label(out, f"{det['class_name']} {det['confidence']:.1%}", x1, y1)
+    return out
+
+
+# ==========================
+# Batch Annotation
+# ==========================
+def annotate(image_bytes, detections, confidence_threshold=0.5, max_side=None, quality=85):
+    """Decode, optionally downscale, annotate and encode one image as JPEG bytes"""
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    if max_side:
+        image, scale = fit_to_display(image, max_side)
+        detections = scale_detections(detections, scale)
+    return encode_jpeg(Image.fromarray(draw_overlay(image, detections, confidence_threshold)), quality)
+
+def _annotate_item(item, **options):
+    image_bytes, detections = item
+    return annotate(image_bytes, detections, **options)
+
+def annotate_batch(items, confidence_threshold=0.5, max_side=None, quality=85, processes=0,
+                   chunksize=4):
+    """
+    Annotated JPEG bytes for (image_bytes, detections) pairs, in order.
+
+    With processes > 0 the images are spread over a process pool; only
+    encoded bytes cross process boundaries.
+    """
+    work = partial(_annotate_item, confidence_threshold=confidence_threshold,
+                   max_side=max_side, quality=quality)
+    if not processes:
+        return [work(item) for item in items]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(work, items, chunksize=chunksize))
@@ -0,0 +1,104 @@
+import io
+
+from PIL import Image, ImageDraw
+
+# Streamlit sends PIL images as maximum-quality JPEG; display copies use this
+DISPLAY_JPEG_QUALITY = 85
+
+
+# ==========================
+# Box Drawing
+# ==========================
+def draw_bboxes(image, detections, confidence_threshold=0.5):
+    """Draw bounding boxes with improved styling"""
+    draw = ImageDraw.Draw(image, "RGBA")
+
+    for det in detections:
+        if det['confidence'] < confidence_threshold:
+            continue
+            
+        x1, y1, x2, y2 = map(int, det["bbox_xyxy"])
+        label = f"{det['class_name']}"
+        confidence = f"{det['confidence']:.1%}"
+
+        # Color based on confidence
+        if det['confidence'] >= 0.8:
+            box_color = (255, 0, 0, 255)      # Red - High confidence
+            fill_color = (255, 0, 0, 40)
+        elif det['confidence'] >= 0.6:
+            box_color = (255, 165, 0, 255)    # Orange - Medium confidence
+            fill_color = (255, 165, 0, 40)
+        else:
+            box_color = (255, 255, 0, 255)    # Yellow - Low confidence
+            fill_color = (255, 255, 0, 40)
+
+        # Draw bounding box
+        draw.rectangle(
+            [(x1, y1), (x2, y2)],
+            fill=fill_color,
+            outline=box_color,
+            width=4
+        )
+
+        # Label with confidence
+        label_text = f"{label} {confidence}"
+        
+        # Calculate text size
+        text_bbox = draw.textbbox((x1, y1), label_text)
+        text_w = text_bbox[2] - text_bbox[0]
+        text_h = text_bbox[3] - text_bbox[1]
+
+        # Draw label background
+        draw.rectangle(
+            [(x1, y1 - text_h - 8), (x1 + text_w + 12, y1)],
+            fill=(0, 0, 0, 220)
+        )
+
+        # Draw label text
+        draw.text(
+            (x1 + 6, y1 - text_h - 6),
+            label_text,
+            fill=(255, 255, 255, 255)
+        )
+
+    return image
+
+def crop_zoom(image, bbox, padding=50):
+    """Crop and zoom into detected region"""
+    x1, y1, x2, y2 = map(int, bbox)
+    w, h = image.size
+
+    x1 = max(0, x1 - padding)
+    y1 = max(0, y1 - padding)
+    x2 = min(w, x2 + padding)
+    y2 = min(h, y2 + padding)
+
+    return image.crop((x1, y1, x2, y2))
+
+
+# ==========================
+# Display Sizing
+# ==========================
+def fit_to_display(image, max_side):
+    """Downscale so the longest side is at most max_side; returns (image, scale)"""
+    width, height = image.size
+    scale = min(1.0, max_side / max(width, height))
+    if scale == 1.0:
+        return image, scale
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return image.resize(size, Image.BILINEAR, reducing_gap=2.0), scale
+
+def scale_detections(detections, scale):
+    """Copies of the detections with boxes in display coordinates"""
+    if scale == 1.0:
+        return detections
+    return [
+        {**det, "bbox_xyxy": [value * scale for value in det["bbox_xyxy"]]}
+        for det in detections
+    ]
+
+def encode_jpeg(image, quality=DISPLAY_JPEG_QUALITY):
+    """JPEG bytes as sent to the browser"""
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
@@ -0,0 +1,95 @@
+import json
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    digest          TEXT NOT NULL,
+    model_version   TEXT NOT NULL,
+    filename        TEXT NOT NULL,
+    detection_count INTEGER NOT NULL,
+    max_confidence  REAL,
+    created_at      REAL NOT NULL,
+    result          TEXT NOT NULL,
+    thumbnail       BLOB,
+    PRIMARY KEY (digest, model_version)
+);
+CREATE INDEX IF NOT EXISTS results_created ON results (created_at);
+"""
+
+# Columns for history listings: everything one page of the view shows, in one query
+PAGE_COLUMNS = "digest, model_version, filename, created_at, result, thumbnail"
+
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH = 500
+
+
+# ============================
+# Result Store (SQLite)
+# ============================
+class ResultStore:
+    """
+    Detection results persisted across sessions.
+
+    Results are keyed by image content hash and model version, so a known
+    image is never sent to the backend again until the model changes. Each
+    row keeps a small JPEG thumbnail for the history view.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # One shared connection, used from every Streamlit session thread
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_many(self, digests: list, model_version: str) -> dict:
+        """Stored results for these images under one model version, by digest"""
+        found = {}
+        for start in range(0, len(digests), LOOKUP_BATCH):
+            batch = digests[start:start + LOOKUP_BATCH]
+            rows = self._execute(
+                f"SELECT digest, result FROM results WHERE model_version = ? "
+                f"AND digest IN ({', '.join('?' * len(batch))})",
+                (model_version, *batch),
+            )
+            found.update((row["digest"], json.loads(row["result"])) for row in rows)
+        return found
+
+    def put_many(self, entries: list):
+        """Store (digest, result, thumbnail_jpeg) triples; the version comes from each result"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (digest, model_version, filename, detection_count, "
+                "max_confidence, created_at, result, thumbnail) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (digest, result["model_version"], result["filename"], len(result["detections"]),
+                     max((d["confidence"] for d in result["detections"]), default=None),
+                     now, json.dumps(result), thumbnail)
+                    for digest, result, thumbnail in entries
+                ],
+            )
+            self._conn.execute("COMMIT")
+
+    def count(self) -> int:
+        return self._execute("SELECT COUNT(*) AS n FROM results")[0]["n"]
+
+    def page(self, limit: int, offset: int = 0) -> list:
+        """One page of stored results (as dicts, `result` decoded), newest first"""
+        rows = self._execute(
+            f"SELECT {PAGE_COLUMNS} FROM results ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [{**dict(row), "result": json.loads(row["result"])} for row in rows]
+
+    def clear(self):
+        self._execute("DELETE FROM results")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Frontend modules import each other flat, as they do when run from frontend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+"""draw_overlay matches draw_bboxes pixel for pixel"""
+import numpy as np
+import pytest
+from PIL import Image
+
+from overlay import draw_overlay
+from rendering import draw_bboxes
+
+
+def assert_identical(base, detections, confidence_threshold=0.5):
+    reference = Image.fromarray(base.copy())
+    draw_bboxes(reference, detections, confidence_threshold)
+    np.testing.assert_array_equal(draw_overlay(Image.fromarray(base), detections, confidence_threshold),
+                                  np.asarray(reference))
+
+
+def random_detections(rng, count, width, height, max_side):
+    detections = []
+    for _ in range(count):
+        x1, y1 = rng.integers(-10, width), rng.integers(-10, height)
+        w, h = rng.integers(0, max_side, 2)
+        detections.append({
+            "bbox_xyxy": [float(x1), float(y1), float(x1 + w), float(y1 + h)],
+            "confidence": float(rng.uniform(0.3, 1.0)),
+            "class_id": 0,
+            "class_name": "tumor",
+        })
+    return detections
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_boxes(seed):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (160, 200, 3), dtype=np.uint8)
+    assert_identical(base, random_detections(rng, 10, 200, 160, 120))
+
+
+@pytest.mark.parametrize("side", range(0, 9))
+def test_boxes_thinner_than_twice_the_line_width(side):
+    # PIL's side strips spill past boxes narrower or shorter than 2 * line_width
+    base = np.full((80, 80, 3), 90, dtype=np.uint8)
+    detections = [
+        {"bbox_xyxy": [30, 30, 30 + side, 60], "confidence": 0.9, "class_id": 0, "class_name": "tumor"},
+        {"bbox_xyxy": [10, 70, 50, 70 + side], "confidence": 0.7, "class_id": 0, "class_name": "tumor"},
+        {"bbox_xyxy": [60, 40, 60 + side, 40 + side], "confidence": 0.55, "class_id": 0, "class_name": "tumor"},
+    ]
+    assert_identical(base, detections)
+
+
+def test_confidence_threshold():
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (120, 120, 3), dtype=np.uint8)
+    assert_identical(base, random_detections(rng, 20, 120, 120, 60), confidence_threshold=0.75)